@@ -0,0 +1,143 @@
+"""Partition maintenance for ``audit_logs``.
+
+``audit_logs`` is range partitioned by month on ``timestamp``. Partitions
+are named ``audit_logs_YYYY_MM`` and their bounds are in UTC. The
+scheduler leader runs ``maintain_audit_partitions`` daily, which:
+
+* creates partitions ``AUDIT_PARTITIONS_AHEAD`` months ahead, so inserts
+  never land in ``audit_logs_default``. If the scheduler fell behind and
+  the default partition already holds rows for a month, those rows are
+  moved into the new partition. A month that still fails is logged and
+  skipped, so archiving runs anyway;
+* detaches partitions older than ``AUDIT_RETENTION_MONTHS``, dumps each
+  to ``AUDIT_ARCHIVE_DIR/audit_logs_YYYY_MM.csv.gz`` and drops it.
+
+A partition is only dropped once its archive file is completely written.
+If the dump fails, the detached table stays and the next run retries.
+Queries that filter on ``timestamp`` are pruned to the partitions they
+need.
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+AUDIT_RETENTION_MONTHS = int(os.environ.get("AUDIT_RETENTION_MONTHS", "24"))
+AUDIT_PARTITIONS_AHEAD = int(os.environ.get("AUDIT_PARTITIONS_AHEAD", "3"))
+AUDIT_ARCHIVE_DIR = Path(os.environ.get("AUDIT_ARCHIVE_DIR", Path(__file__).parent / "archive" / "audit_logs"))
+AUDIT_MAINTENANCE_INTERVAL = float(os.environ.get("AUDIT_MAINTENANCE_INTERVAL", "86400"))  # seconds
+
+_PARTITION = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = _PARTITION.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def expired_partitions(names: List[str], today: date, retention_months: int = AUDIT_RETENTION_MONTHS) -> List[str]:
+    """Partitions whose whole month is older than the retention window."""
+    cutoff = add_months(today.replace(day=1), -retention_months)
+    months = {name: partition_month(name) for name in names}
+    return sorted(name for name, month in months.items() if month is not None and month < cutoff)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """UTC ``[start, end)`` of the partition holding ``month``."""
+    following = add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+        datetime(following.year, following.month, 1, tzinfo=timezone.utc),
+    )
+
+
+async def create_partition(connection, month: date) -> str:
+    """Create the partition for ``month``, first moving its rows out of ``audit_logs_default``."""
+    start, end = month_bounds(month)
+    async with connection.transaction():
+        stranded = await connection.fetchval('''
+            SELECT EXISTS (SELECT 1 FROM audit_logs_default WHERE timestamp >= $1 AND timestamp < $2)
+        ''', start, end)
+        if not stranded:
+            return await connection.fetchval("SELECT create_audit_log_partition($1)", month)
+        # CREATE ... PARTITION OF refuses while the default holds rows in range,
+        # so take the default out, create the partition and route the rows back.
+        logging.warning(f"audit_logs_default holds rows for {partition_name(month)}; moving them")
+        await connection.execute("ALTER TABLE audit_logs DETACH PARTITION audit_logs_default")
+        name = await connection.fetchval("SELECT create_audit_log_partition($1)", month)
+        await connection.execute('''
+            WITH moved AS (
+                DELETE FROM audit_logs_default WHERE timestamp >= $1 AND timestamp < $2 RETURNING *
+            )
+            INSERT INTO audit_logs SELECT * FROM moved
+        ''', start, end)
+        await connection.execute("ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default DEFAULT")
+    return name
+
+
+async def ensure_future_partitions(connection, today: date, ahead: int = AUDIT_PARTITIONS_AHEAD) -> List[str]:
+    current = today.replace(day=1)
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        try:
+            created.append(await create_partition(connection, month))
+        except Exception as e:
+            logging.error(f"Creating audit partition {partition_name(month)} failed: {e}")
+    return created
+
+
+async def archive_partition(connection, name: str, archive_dir: Path = AUDIT_ARCHIVE_DIR) -> Path:
+    """Detach ``name`` (if still attached), dump it to gzip, then drop it."""
+    attached = await connection.fetchval('''
+        SELECT EXISTS (
+            SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass($1) AND inhparent = 'audit_logs'::regclass
+        )
+    ''', name)
+    if attached:
+        await connection.execute(f'ALTER TABLE audit_logs DETACH PARTITION "{name}"')
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_dir / f"{name}.csv.gz"
+    partial = target.with_suffix(".gz.partial")
+    with gzip.open(partial, "wb") as archive:
+        await connection.copy_from_table(name, output=archive, format="csv", header=True)
+    os.replace(partial, target)
+    await connection.execute(f'DROP TABLE "{name}"')
+    logging.info(f"Archived {name} to {target}")
+    return target
+
+
+async def audit_partition_names(connection) -> List[str]:
+    # Attached partitions plus any detached by an earlier, interrupted run.
+    rows = await connection.fetch('''
+        SELECT relname FROM pg_class
+        WHERE relkind IN ('r', 'p') AND relname ~ '^audit_logs_[0-9]{4}_[0-9]{2}$'
+          AND relnamespace = current_schema()::regnamespace
+    ''')
+    return [row['relname'] for row in rows]
+
+
+async def maintain_audit_partitions(pool, today: Optional[date] = None) -> List[Path]:
+    today = today or datetime.now(timezone.utc).date()
+    async with pool.acquire() as connection:
+        await ensure_future_partitions(connection, today)
+        names = expired_partitions(await audit_partition_names(connection), today)
+        archived = []
+        for name in names:
+            try:
+                archived.append(await archive_partition(connection, name))
+            except Exception as e:
+                logging.error(f"Archiving {name} failed: {e}")
+        return archived
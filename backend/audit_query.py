@@ -0,0 +1,98 @@
+"""Audit log queries with keyset pagination.
+
+Entries are returned newest first, ordered by ``(timestamp, id)``. The
+page cursor holds the last entry's ``(timestamp, id)``, and the next page
+continues with a row comparison, ``(timestamp, id) < (...)``. Every page
+is therefore an index range scan, and late pages cost no more than the
+first. OFFSET would have to read and throw away every earlier row.
+
+Filtering by entity uses ``idx_audit_logs_entity`` and filtering by user
+uses ``idx_audit_logs_user``. Filters on ``details`` use JSONB
+containment (``@>``) through the GIN index. A time range prunes the
+monthly partitions.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_AUDIT_PAGE = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(timestamp: datetime, entry_id: uuid.UUID) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(entry_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, entry_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), uuid.UUID(entry_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def build_audit_query(
+    entity_type: Optional[str] = None,
+    entity_id: Optional[uuid.UUID] = None,
+    user_id: Optional[uuid.UUID] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    details: Optional[Dict[str, Any]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    values: List[Any] = []
+
+    def bind(value: Any, cast: str) -> str:
+        values.append(value)
+        return f"${len(values)}::{cast}"
+
+    if entity_type is not None:
+        clauses.append(f"entity_type = {bind(entity_type, 'text')}")
+    if entity_id is not None:
+        clauses.append(f"entity_id = {bind(entity_id, 'uuid')}")
+    if user_id is not None:
+        clauses.append(f"user_id = {bind(user_id, 'uuid')}")
+    if action is not None:
+        clauses.append(f"action = {bind(action, 'text')}")
+    if since is not None:
+        clauses.append(f"timestamp >= {bind(since, 'timestamptz')}")
+    if until is not None:
+        clauses.append(f"timestamp < {bind(until, 'timestamptz')}")
+    if details:
+        clauses.append(f"details @> {bind(json.dumps(details), 'jsonb')}")
+    if cursor is not None:
+        after_timestamp, after_id = decode_cursor(cursor)
+        clauses.append(f"(timestamp, id) < ({bind(after_timestamp, 'timestamptz')}, {bind(after_id, 'uuid')})")
+    where = " AND ".join(clauses) or "TRUE"
+    # One extra row tells us whether there is a next page.
+    limit_param = bind(min(limit, MAX_AUDIT_PAGE) + 1, "int")
+    query = f'''
+        SELECT id, user_id, user_email, action, entity_type, entity_id, details, ip_address, timestamp
+        FROM audit_logs
+        WHERE {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT {limit_param}
+    '''
+    return query, values
+
+
+def paginate(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    limit = min(limit, MAX_AUDIT_PAGE)
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = encode_cursor(page[-1]['timestamp'], page[-1]['id'])
+    for entry in page:
+        if isinstance(entry.get('details'), str):
+            entry['details'] = json.loads(entry['details'])
+    return {"entries": page, "next_cursor": next_cursor}
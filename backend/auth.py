@@ -0,0 +1,114 @@
+"""Password hashing and JWT verification kept off the event loop's hot path.
+
+bcrypt is deliberately slow, so hashing and verification run in a small
+dedicated thread pool (the bcrypt module releases the GIL while it works).
+Decoded access tokens are cached by digest for a short TTL, so repeat
+requests with the same bearer token skip signature verification entirely.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Security
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from passlib.context import CryptContext
+
+from lazy_imports import lazy_import
+
+jwt = lazy_import("jose.jwt")  # crypto backends load on first encode/decode
+
+# Security setup
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+security = HTTPBearer()
+SECRET_KEY = os.environ.get("SECRET_KEY", "default-secret-key")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+TOKEN_CACHE_TTL = float(os.environ.get("TOKEN_CACHE_TTL", "60"))  # seconds
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "4096"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify, plain_password, hashed_password)
+
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class TokenClaimsCache:
+    """LRU of validated token claims with a per-entry TTL capped at ``exp``."""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE, ttl_seconds: float = TOKEN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        # Never keep raw bearer tokens in memory longer than the request.
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.key_for(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, token: str, claims: Dict[str, Any]):
+        expires_at = time.time() + self.ttl_seconds
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self.key_for(token)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+token_claims_cache = TokenClaimsCache()
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Return validated claims, raising ``JWTError`` for bad or expired tokens."""
+    claims = token_claims_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_claims_cache.set(token, claims)
+    return claims
+
+
+async def get_token_claims(credentials: HTTPAuthorizationCredentials = Security(security)) -> Dict[str, Any]:
+    try:
+        return decode_access_token(credentials.credentials)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -0,0 +1,175 @@
+"""Periodic jobs run by the scheduler: interview reminders, analytics
+refresh and webhook delivery retries.
+
+Reminder and webhook jobs claim a batch of due rows with
+``FOR UPDATE SKIP LOCKED`` and keep claiming while batches come back full.
+Several workers can therefore drain the same backlog at once without
+handling any row twice. The claim is committed before any email or HTTP
+request goes out, and the outcome is recorded in a second short
+transaction, so no row lock or pooled connection is held across network
+I/O. A claimed reminder is marked sent; a claimed webhook is leased by
+pushing ``next_attempt_at`` past the time the batch can take.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict
+from zoneinfo import ZoneInfo
+
+from interview_scheduling import SCHEDULING_TIMEZONE
+from lazy_imports import lazy_import
+from metrics import observe_outbound
+
+httpx = lazy_import("httpx")  # loaded by the first webhook retry, not at boot
+
+REMINDER_INTERVAL = float(os.environ.get("INTERVIEW_REMINDER_INTERVAL", "60"))  # seconds
+ANALYTICS_REFRESH_INTERVAL = float(os.environ.get("ANALYTICS_REFRESH_INTERVAL", "900"))  # seconds
+WEBHOOK_RETRY_INTERVAL = float(os.environ.get("WEBHOOK_RETRY_INTERVAL", "15"))  # seconds
+REMINDER_LEAD_HOURS = float(os.environ.get("INTERVIEW_REMINDER_LEAD_HOURS", "24"))
+REMINDER_BATCH = int(os.environ.get("INTERVIEW_REMINDER_BATCH", "50"))
+WEBHOOK_BATCH = int(os.environ.get("WEBHOOK_RETRY_BATCH", "50"))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get("WEBHOOK_MAX_ATTEMPTS", "8"))
+WEBHOOK_TIMEOUT = 30  # seconds
+WEBHOOK_BACKOFF_BASE = 30  # seconds; doubles with each attempt
+WEBHOOK_BACKOFF_MAX = 6 * 3600
+# A batch is delivered concurrently, so it finishes within one timeout
+WEBHOOK_LEASE = timedelta(seconds=WEBHOOK_TIMEOUT * 2)
+SCHEDULING_ZONE = ZoneInfo(SCHEDULING_TIMEZONE)
+
+SendEmail = Callable[[str, str, str], Awaitable[bool]]
+
+REMINDER_TEMPLATE = (
+    "<p>Hi {name},</p><p>This is a reminder of your {interview_type} interview on "
+    "{when:%A %d %B at %I:%M %p %Z}.</p>"
+)
+
+
+def webhook_signature(secret: str, body: bytes) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def webhook_backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), WEBHOOK_BACKOFF_MAX))
+
+
+async def enqueue_webhook(connection, url: str, event: str, payload: Dict[str, Any]):
+    """Queue a webhook for delivery on the next scheduler tick."""
+    await connection.execute('''
+        INSERT INTO webhook_deliveries (url, event, payload) VALUES ($1, $2, $3::jsonb)
+    ''', url, event, json.dumps(payload, default=str))
+
+
+async def send_interview_reminders(pool, send_email: SendEmail) -> int:
+    sent = 0
+    while True:
+        # Claim and commit first; no transaction stays open while emails go out
+        async with pool.acquire() as connection:
+            due = await connection.fetch('''
+                WITH claimed AS (
+                    SELECT id FROM interviews
+                    WHERE reminder_sent_at IS NULL
+                      AND status IN ('scheduled', 'rescheduled')
+                      AND scheduled_date BETWEEN NOW() AND NOW() + make_interval(secs => $1)
+                    ORDER BY scheduled_date
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE interviews i SET reminder_sent_at = NOW()
+                FROM claimed, candidates c
+                WHERE i.id = claimed.id AND c.id = i.candidate_id
+                RETURNING i.id, i.scheduled_date, i.interview_type, c.email, c.full_name
+            ''', REMINDER_LEAD_HOURS * 3600, REMINDER_BATCH)
+        failed = []
+        for row in due:
+            if await send_email(row['email'], "Interview reminder", reminder_content(row)):
+                sent += 1
+            else:
+                failed.append(row['id'])
+        if failed:
+            # Leave them due so the next run tries again.
+            async with pool.acquire() as connection:
+                await connection.execute(
+                    "UPDATE interviews SET reminder_sent_at = NULL WHERE id = ANY($1::uuid[])", failed
+                )
+        if len(due) < REMINDER_BATCH or failed:
+            return sent
+
+
+def reminder_content(row) -> str:
+    return REMINDER_TEMPLATE.format(
+        name=row['full_name'], interview_type=row['interview_type'] or "upcoming",
+        when=row['scheduled_date'].astimezone(SCHEDULING_ZONE),
+    )
+
+
+async def refresh_pipeline_stats(pool):
+    async with pool.acquire() as connection:
+        await connection.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY candidate_pipeline_stats")
+
+
+async def retry_webhooks(pool, secret: str) -> int:
+    delivered = 0
+    async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT) as client:
+        while True:
+            # Lease the batch and commit, so no row lock or transaction is held
+            # during the POSTs. A worker that dies mid-batch leaves its rows to
+            # be retried once the lease runs out.
+            async with pool.acquire() as connection:
+                due = await connection.fetch('''
+                    WITH claimed AS (
+                        SELECT id FROM webhook_deliveries
+                        WHERE status = 'pending' AND next_attempt_at <= NOW()
+                        ORDER BY next_attempt_at
+                        LIMIT $1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    UPDATE webhook_deliveries w SET next_attempt_at = NOW() + $2
+                    FROM claimed
+                    WHERE w.id = claimed.id
+                    RETURNING w.id, w.url, w.event, w.payload::text AS body, w.attempts
+                ''', WEBHOOK_BATCH, WEBHOOK_LEASE)
+            errors = await asyncio.gather(*(_deliver(client, row, secret) for row in due))
+            async with pool.acquire() as connection:
+                async with connection.transaction():
+                    for row, error in zip(due, errors):
+                        attempts = row['attempts'] + 1
+                        if error is None:
+                            delivered += 1
+                            await connection.execute('''
+                                UPDATE webhook_deliveries
+                                SET status = 'delivered', attempts = $2, delivered_at = NOW(), last_error = NULL
+                                WHERE id = $1
+                            ''', row['id'], attempts)
+                        else:
+                            status = 'failed' if attempts >= WEBHOOK_MAX_ATTEMPTS else 'pending'
+                            await connection.execute('''
+                                UPDATE webhook_deliveries
+                                SET status = $2, attempts = $3, last_error = $4, next_attempt_at = NOW() + $5
+                                WHERE id = $1
+                            ''', row['id'], status, attempts, error, webhook_backoff(attempts))
+            if len(due) < WEBHOOK_BATCH:
+                return delivered
+
+
+async def _deliver(client: "httpx.AsyncClient", row, secret: str):
+    body = row['body'].encode()
+    started = time.perf_counter()
+    try:
+        response = await client.post(row['url'], content=body, headers={
+            "Content-Type": "application/json",
+            "X-Webhook-Event": row['event'],
+            "X-Webhook-Signature": webhook_signature(secret, body),
+            "X-Webhook-Id": str(row['id']),
+        })
+        response.raise_for_status()
+        observe_outbound("careers_webhook", started, ok=True)
+        return None
+    except httpx.HTTPError as e:
+        observe_outbound("careers_webhook", started, ok=False)
+        logging.error(f"Webhook delivery to {row['url']} failed: {e}")
+        return str(e)[:500]
@@ -0,0 +1,190 @@
+"""Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Each uvicorn worker keeps its own in-process caches. Writers call
+``publish``; every worker (including the writer) receives the notification
+on a dedicated listener connection once the write commits, and drops the
+key from the matching namespace. Keys travel as strings, so caches and the
+bus both go through ``cache_key``.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import asyncpg
+
+CHANNEL_PREFIX = "ats_cache_"
+# Postgres caps NOTIFY payloads at 8000 bytes; stay well below it.
+MAX_PAYLOAD_BYTES = 7000
+RECONNECT_DELAYS = [0.5, 1, 2, 5, 10]
+
+# Sentinel key meaning "drop the whole namespace".
+ALL_KEYS = "*"
+
+
+def channel_for(namespace: str) -> str:
+    return f"{CHANNEL_PREFIX}{namespace}"
+
+
+def cache_key(key: Hashable) -> str:
+    """Canonical string form of a key, e.g. a UUID and its str() are the same key."""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, tuple):
+        return json.dumps([cache_key(part) for part in key])
+    return str(key)
+
+
+class NamespacedCache:
+    """Small in-process TTL cache whose keys can be invalidated by the bus."""
+
+    def __init__(self, namespace: str, ttl_seconds: float = 300, max_entries: int = 1024):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        key = cache_key(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        key = cache_key(key)
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Oldest insertion goes first; dicts keep insertion order.
+            self._entries.pop(next(iter(self._entries)))
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl)
+
+    def invalidate(self, key: Hashable = ALL_KEYS):
+        key = cache_key(key)
+        if key == ALL_KEYS:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def new_worker_id() -> str:
+    return f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class InvalidationBus:
+    """Routes keyed invalidations between workers through Postgres NOTIFY."""
+
+    def __init__(self, dsn: Optional[str] = None):
+        self.dsn = dsn
+        self.worker_id = new_worker_id()
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def register(self, cache: NamespacedCache) -> NamespacedCache:
+        self.subscribe(cache.namespace, cache.invalidate)
+        return cache
+
+    def subscribe(self, namespace: str, handler: Callable[[str], None]):
+        handlers = self._handlers.setdefault(namespace, [])
+        handlers.append(handler)
+        if self._connection is not None and len(handlers) == 1:
+            asyncio.get_running_loop().create_task(self._listen(namespace))
+
+    async def connect(self, dsn: Optional[str] = None):
+        self.dsn = dsn or self.dsn
+        # The bus may have been built in a gunicorn master before the fork
+        # (preload_app); connect() runs in each worker, so it gets its own id.
+        self.worker_id = new_worker_id()
+        self._closing = False
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_terminated)
+        for namespace in self._handlers:
+            await self._listen(namespace)
+
+    async def close(self):
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def publish(self, connection, namespace: str, key: Any = ALL_KEYS):
+        """Publish an invalidation using ``connection`` (a pool or connection).
+
+        Pass the connection that performed the write when inside a
+        transaction: NOTIFY is delivered only on commit, so no worker drops
+        a key before the new value is visible. This worker then applies it
+        from its own notification too; dropping it earlier would let a
+        concurrent read cache the pre-commit value again. Outside a
+        transaction the write is already committed and the key is dropped
+        locally straight away.
+        """
+        key = cache_key(key)
+        payload = json.dumps({"key": key, "origin": self.worker_id})
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            key = ALL_KEYS
+            payload = json.dumps({"key": key, "origin": self.worker_id})
+        in_transaction = getattr(connection, "is_in_transaction", lambda: False)()
+        await connection.execute("SELECT pg_notify($1, $2)", channel_for(namespace), payload)
+        if not in_transaction:
+            self._dispatch(namespace, key)
+
+    async def _listen(self, namespace: str):
+        if self._connection is None:
+            return
+        await self._connection.add_listener(channel_for(namespace), self._on_notification)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logging.error(f"Ignoring malformed cache invalidation on {channel}: {payload!r}")
+            return
+        # Our own notifications are applied too (see publish); dropping a key twice is harmless.
+        self._dispatch(channel[len(CHANNEL_PREFIX):], message.get("key", ALL_KEYS))
+
+    def _dispatch(self, namespace: str, key: str):
+        for handler in self._handlers.get(namespace, []):
+            try:
+                handler(key)
+            except Exception as e:
+                logging.error(f"Cache invalidation handler for {namespace} failed: {e}")
+
+    def _on_terminated(self, connection):
+        self._connection = None
+        if self._closing:
+            return
+        # Notifications sent while we were disconnected are lost, so every
+        # subscribed namespace has to be treated as stale.
+        for namespace in self._handlers:
+            self._dispatch(namespace, ALL_KEYS)
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        attempt = 0
+        while not self._closing:
+            delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+                for namespace in self._handlers:
+                    self._dispatch(namespace, ALL_KEYS)
+                logging.info("Cache invalidation listener reconnected")
+                return
+            except Exception as e:
+                attempt += 1
+                logging.error(f"Cache invalidation listener reconnect failed: {e}")
@@ -0,0 +1,211 @@
+"""Canonical SQL shapes for advanced candidate search.
+
+Concatenating one clause per supplied filter gives a different statement
+for every filter combination, so Postgres re-parses and re-plans almost
+every search and asyncpg's statement cache churns. Here the statement
+text depends only on *which* filters are set (the shape key), never on
+their values:
+
+* every filter adds its clause only when supplied, so a prepared
+  statement's generic plan can still use the matching index. A guard
+  such as ``$n IS NULL OR col >= $n`` would hide the column from the
+  planner and force a sequential scan.
+* range filters bind both bounds and fall back to +/- infinity, so "min
+  only", "max only" and "both" all share one statement.
+
+Searches combine only a few filters, so in practice a handful of shapes
+cover almost all traffic. ``PreparedStatementCache`` keeps one prepared
+statement per shape and pooled connection, and counts hits so the reuse
+rate can be monitored.
+"""
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import asyncpg
+
+from query_stats import record_query
+
+# Bits of the shape key, in the order their clauses are emitted.
+SHAPE_LOCATIONS = 1 << 0
+SHAPE_VISA_STATUS = 1 << 1
+SHAPE_SPONSORSHIP = 1 << 2
+SHAPE_SCORE = 1 << 3
+SHAPE_SKILLS = 1 << 4
+SHAPE_STATUS = 1 << 5
+SHAPE_APPLIED = 1 << 6
+SHAPE_EXPERIENCE = 1 << 7
+SHAPE_RURAL = 1 << 8
+SHAPE_AVAILABILITY = 1 << 9
+SHAPE_RELOCATION = 1 << 10
+SHAPE_TEXT = 1 << 11
+
+
+def _values(items) -> List[Any]:
+    return [getattr(item, "value", item) for item in items]
+
+
+def build_search_clauses(filters) -> Tuple[str, List[Any], int]:
+    """Return the ``WHERE`` body, its bind values and the shape key."""
+    clauses: List[str] = []
+    values: List[Any] = []
+    shape = 0
+
+    def bind(value: Any, cast: str) -> str:
+        values.append(value)
+        return f"${len(values)}::{cast}"
+
+    if filters.locations:
+        shape |= SHAPE_LOCATIONS
+        clauses.append(f"location = ANY({bind(filters.locations, 'text[]')})")
+    if filters.visa_status:
+        shape |= SHAPE_VISA_STATUS
+        clauses.append(f"visa_status = ANY({bind(_values(filters.visa_status), 'text[]')})")
+    if filters.sponsorship_needed is not None:
+        shape |= SHAPE_SPONSORSHIP
+        clauses.append(f"sponsorship_needed = {bind(filters.sponsorship_needed, 'boolean')}")
+    if filters.min_score is not None or filters.max_score is not None:
+        shape |= SHAPE_SCORE
+        low = bind(filters.min_score, "float8")
+        high = bind(filters.max_score, "float8")
+        clauses.append(f"score BETWEEN COALESCE({low}, '-Infinity') AND COALESCE({high}, 'Infinity')")
+    if filters.required_skills:
+        shape |= SHAPE_SKILLS
+        # PostgreSQL array overlap
+        clauses.append(f"skills && {bind(filters.required_skills, 'text[]')}")
+    if filters.application_status:
+        shape |= SHAPE_STATUS
+        clauses.append(f"status = ANY({bind(_values(filters.application_status), 'text[]')})")
+    if filters.applied_after is not None or filters.applied_before is not None:
+        shape |= SHAPE_APPLIED
+        after = bind(filters.applied_after, "timestamptz")
+        before = bind(filters.applied_before, "timestamptz")
+        clauses.append(f"created_at BETWEEN COALESCE({after}, '-infinity') AND COALESCE({before}, 'infinity')")
+
+    if filters.min_experience_years is not None or filters.max_experience_years is not None:
+        shape |= SHAPE_EXPERIENCE
+        low = bind(filters.min_experience_years, "int")
+        high = bind(filters.max_experience_years, "int")
+        clauses.append(f"experience_years BETWEEN COALESCE({low}, -2147483648) AND COALESCE({high}, 2147483647)")
+    if filters.rural_experience is not None:
+        shape |= SHAPE_RURAL
+        clauses.append(f"rural_experience = {bind(filters.rural_experience, 'boolean')}")
+    if filters.available_from is not None:
+        shape |= SHAPE_AVAILABILITY
+        # A closed range gets the planner's narrow generic estimate; a bare ">= $n" is guessed at a third of the table
+        clauses.append(f"availability_start BETWEEN {bind(filters.available_from, 'timestamptz')} AND 'infinity'")
+    if filters.relocation_willing:
+        shape |= SHAPE_RELOCATION
+        clauses.append(f"relocation_willing = ANY({bind(_values(filters.relocation_willing), 'text[]')})")
+    if filters.search_query:
+        shape |= SHAPE_TEXT
+        pattern = bind(f"%{filters.search_query}%", "text")
+        clauses.append(
+            f"(full_name ILIKE {pattern} OR email ILIKE {pattern} OR notes ILIKE {pattern} OR "
+            f"resume_text ILIKE {pattern} OR childcare_cert ILIKE {pattern})"
+        )
+    return " AND ".join(clauses) or "TRUE", values, shape
+
+
+def build_search_query(filters) -> Tuple[str, List[Any]]:
+    """
+    Build the SQL and bind values for an advanced candidate search.
+    """
+    where, values, _ = build_search_clauses(filters)
+    return f"SELECT * FROM candidates WHERE {where}", values
+
+
+# Filter-sidebar facets returned with advanced search results.
+FACET_COLUMNS = ["location", "visa_status", "relocation_willing", "status"]
+
+
+def build_faceted_search_query(filters) -> Tuple[str, List[Any]]:
+    """
+    Build one statement returning the matching candidates plus per-facet
+    counts over the same matches. Facets come back as JSON in the
+    ``_facets`` column of the first row only; a search with no matches
+    still yields that one row, with NULL candidate columns.
+    """
+    where, values, _ = build_search_clauses(filters)
+    facet_label = " ".join(
+        f"WHEN GROUPING({column}) = 0 THEN '{column}'" for column in FACET_COLUMNS
+    )
+    query = f"""
+        WITH matched AS MATERIALIZED (
+            SELECT * FROM candidates WHERE {where}
+        ), grouped AS (
+            SELECT CASE {facet_label} END AS facet,
+                   COALESCE({", ".join(FACET_COLUMNS)}) AS value,
+                   COUNT(*) AS count
+            FROM matched
+            GROUP BY GROUPING SETS ({", ".join(f"({column})" for column in FACET_COLUMNS)})
+        ), facets AS (
+            SELECT COALESCE(jsonb_object_agg(facet, buckets), '{{}}'::jsonb) AS facets
+            FROM (
+                SELECT facet, jsonb_agg(jsonb_build_object('value', value, 'count', count)
+                                        ORDER BY count DESC, value) AS buckets
+                FROM grouped
+                GROUP BY facet
+            ) per_facet
+        )
+        SELECT CASE WHEN ROW_NUMBER() OVER () = 1 THEN facets.facets END AS _facets, matched.*
+        FROM facets LEFT JOIN matched ON TRUE
+    """
+    return query, values
+
+
+class PreparedStatementCache:
+    """Per-connection LRU of prepared statements keyed by query text."""
+
+    def __init__(self, max_per_connection: int = 64):
+        self.max_per_connection = max_per_connection
+        self.hits = 0
+        self.misses = 0
+        self._by_connection: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    async def fetch(self, connection, query: str, *args) -> List[asyncpg.Record]:
+        started = time.perf_counter()
+        try:
+            statement = await self._statement(connection, query)
+            rows = await statement.fetch(*args)
+        except asyncpg.InvalidCachedStatementError:
+            # The schema changed under the statement; prepare it afresh once.
+            self._statements(connection).pop(query, None)
+            statement = await self._statement(connection, query)
+            rows = await statement.fetch(*args)
+        # Prepared statements bypass the instrumented connection methods.
+        record_query(query, time.perf_counter() - started, len(rows))
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "connections": len(self._by_connection),
+            "statements": sum(len(s) for s in self._by_connection.values()),
+        }
+
+    def _statements(self, connection) -> "OrderedDict[str, Any]":
+        # Pool hands out a fresh proxy per acquire; key on the real connection.
+        raw = getattr(connection, "_con", None) or connection
+        statements = self._by_connection.get(raw)
+        if statements is None:
+            statements = self._by_connection[raw] = OrderedDict()
+        return statements
+
+    async def _statement(self, connection, query: str):
+        statements = self._statements(connection)
+        statement = statements.get(query)
+        if statement is not None:
+            self.hits += 1
+            statements.move_to_end(query)
+            return statement
+        self.misses += 1
+        statement = await connection.prepare(query)
+        statements[query] = statement
+        if len(statements) > self.max_per_connection:
+            statements.popitem(last=False)
+        return statement
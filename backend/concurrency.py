@@ -0,0 +1,216 @@
+"""Adaptive per-route-class concurrency limits with queue-based load shedding.
+
+Requests are grouped into classes (search, uploads, reports, crud). Each
+class gets its own limiter, so a burst of compliance reports can only use
+the report slots and never starves candidate CRUD. Limits follow a gradient
+rule: while observed latency stays near the best latency seen recently the
+limit grows, and as latency rises (the pool or CPU is saturating) it shrinks.
+Requests that find the queue full, or wait longer than the queue timeout,
+get ``503`` with ``Retry-After`` instead of piling up until nginx times out.
+
+On shutdown ``drain_limiters`` stops admitting requests: new ones are shed
+with ``Connection: close`` so clients retry on another worker, while those
+in flight or already queued run to completion before the pool is closed.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+LOAD_SHEDDING_ENABLED = os.environ.get("LOAD_SHEDDING_ENABLED", "true").lower() == "true"
+
+# name -> (initial limit, min limit, max limit, max queued, queue timeout seconds)
+ROUTE_CLASS_LIMITS: Dict[str, Tuple[int, int, int, int, float]] = {
+    "search": (8, 2, 32, 32, 5.0),
+    "uploads": (4, 1, 8, 8, 10.0),
+    "reports": (2, 1, 4, 4, 15.0),
+    "crud": (32, 8, 128, 128, 5.0),
+}
+
+# Checked in order; the first matching path fragment wins.
+ROUTE_CLASS_PATTERNS: List[Tuple[str, str]] = [
+    ("/upload", "uploads"),
+    ("/advanced-search", "search"),
+    ("/api/compliance/", "reports"),
+    ("/api/dashboard/", "reports"),
+    ("/api/", "crud"),
+]
+
+
+def classify_route(path: str) -> Optional[str]:
+    for fragment, route_class in ROUTE_CLASS_PATTERNS:
+        if fragment in path:
+            return route_class
+    return None
+
+
+class AdaptiveLimiter:
+    SMOOTHING = 0.2
+    TOLERANCE = 1.5  # latency may reach 1.5x the best before limits shrink
+    MIN_LATENCY_WINDOW = 60.0  # seconds before the best latency is re-learned
+    UPDATE_EVERY = 10  # samples between limit updates
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.shed = 0
+        self.draining = False
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._samples: List[float] = []
+        self._min_latency: Optional[float] = None
+        self._min_latency_reset_at = time.monotonic() + self.MIN_LATENCY_WINDOW
+        self.smoothed_latency = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.draining:
+            self.shed += 1
+            return False
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot we may have been given.
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                self._discard(waiter)
+            raise
+        if waiter.done():
+            return True
+        self._discard(waiter)
+        self.shed += 1
+        return False
+
+    def release(self, latency: Optional[float]):
+        self.in_flight -= 1
+        if latency is not None:
+            self._record(latency)
+        # Slots are handed directly to waiters so nobody can jump the queue.
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def drain(self):
+        """Stop admitting requests; those in flight or already queued still run."""
+        self.draining = True
+
+    async def wait_idle(self, poll_interval: float = 0.05):
+        while self.in_flight or self._waiters:
+            await asyncio.sleep(poll_interval)
+
+    def retry_after(self) -> int:
+        backlog = self.queued + self.in_flight
+        return max(1, math.ceil(self.smoothed_latency * backlog / max(self.limit, 1)))
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "shed": self.shed,
+            "draining": self.draining,
+            "latency_ms": round(self.smoothed_latency * 1000, 2),
+            "min_latency_ms": round((self._min_latency or 0) * 1000, 2),
+        }
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        waiter.cancel()
+
+    def _record(self, latency: float):
+        self.smoothed_latency = latency if not self.smoothed_latency else (
+            (1 - self.SMOOTHING) * self.smoothed_latency + self.SMOOTHING * latency
+        )
+        now = time.monotonic()
+        if self._min_latency is None or latency < self._min_latency or now >= self._min_latency_reset_at:
+            self._min_latency = latency
+            self._min_latency_reset_at = now + self.MIN_LATENCY_WINDOW
+        self._samples.append(latency)
+        if len(self._samples) >= self.UPDATE_EVERY:
+            self._update_limit()
+
+    def _update_limit(self):
+        recent = max(sorted(self._samples)[len(self._samples) // 2], 1e-6)
+        self._samples.clear()
+        gradient = max(0.5, min(1.0, self.TOLERANCE * self._min_latency / recent))
+        target = self.limit * gradient
+        if gradient >= 1.0:
+            # sqrt(limit) headroom lets the limit probe upward while latency is healthy.
+            # Adding it under load too would hold small limits near 4 whatever the latency.
+            target += math.sqrt(self.limit)
+        new_limit = (1 - self.SMOOTHING) * self.limit + self.SMOOTHING * target
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+
+def build_limiters(limits: Optional[Dict[str, Tuple[int, int, int, int, float]]] = None) -> Dict[str, AdaptiveLimiter]:
+    return {name: AdaptiveLimiter(name, *config) for name, config in (limits or ROUTE_CLASS_LIMITS).items()}
+
+
+async def drain_limiters(limiters: Dict[str, AdaptiveLimiter], timeout: float) -> bool:
+    """Drain every limiter and wait up to ``timeout`` seconds; False if requests were still running."""
+    for limiter in limiters.values():
+        limiter.drain()
+    try:
+        await asyncio.wait_for(asyncio.gather(*(limiter.wait_idle() for limiter in limiters.values())), timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app, limiters: Dict[str, AdaptiveLimiter]):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify_route(scope["path"]) if scope["type"] == "http" else None
+        limiter = self.limiters.get(route_class)
+        if limiter is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        if not await limiter.acquire():
+            await self._reject(send, limiter)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+    @staticmethod
+    async def _reject(send, limiter: AdaptiveLimiter):
+        body = b'{"detail":"Server is busy, please retry shortly"}'
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(limiter.retry_after()).encode()),
+            (b"x-route-class", limiter.name.encode()),
+        ]
+        if limiter.draining:
+            headers.append((b"connection", b"close"))
+        await send({"type": "http.response.start", "status": 503, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
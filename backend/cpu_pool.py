@@ -0,0 +1,43 @@
+"""Process pool for CPU-bound work that must not run on the event loop.
+
+Match scoring and MinHash fingerprinting are pure Python, so a thread
+would still hold the GIL against the loop; they run in a small process
+pool instead. The pool is
+created on first use so each forked web worker gets its own, and uses
+the spawn start method because forking a process that is already
+running an event loop and thread pools is unsafe.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+CPU_POOL_WORKERS = int(os.environ.get("CPU_POOL_WORKERS", "1"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    # A pool inherited across fork belongs to the parent; start a fresh one.
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(
+            max_workers=CPU_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        _executor_pid = os.getpid()
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args) -> Any:
+    """Run a picklable module-level ``func(*args)`` in the process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+def shutdown_cpu_pool():
+    global _executor
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
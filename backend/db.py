@@ -0,0 +1,104 @@
+"""Connection pool construction.
+
+``create_pool`` has the same signature as ``asyncpg.create_pool`` but
+returns an ``InstrumentedPool``. That pool records how long each
+``acquire()`` waits for a free connection, which tells us when the pool
+size is the bottleneck. Its connections are ``InstrumentedConnection``s,
+which report each query's duration and row count to ``query_stats``.
+
+``warm_up`` runs a few cheap statements on every idle connection at
+startup. Each Postgres backend then has the catalog entries for the hot
+tables cached before the first request arrives.
+"""
+import asyncio
+import logging
+import time
+
+import asyncpg
+
+from metrics import POOL_ACQUIRE_WAIT
+from query_stats import record_query, rows_from_status
+
+
+class InstrumentedConnection(asyncpg.Connection):
+    async def fetch(self, query, *args, **kwargs):
+        started = time.perf_counter()
+        rows = await super().fetch(query, *args, **kwargs)
+        record_query(query, time.perf_counter() - started, len(rows))
+        return rows
+
+    async def fetchrow(self, query, *args, **kwargs):
+        started = time.perf_counter()
+        row = await super().fetchrow(query, *args, **kwargs)
+        record_query(query, time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    async def fetchval(self, query, *args, **kwargs):
+        started = time.perf_counter()
+        value = await super().fetchval(query, *args, **kwargs)
+        record_query(query, time.perf_counter() - started, 1)
+        return value
+
+    async def execute(self, query, *args, **kwargs):
+        started = time.perf_counter()
+        status = await super().execute(query, *args, **kwargs)
+        record_query(query, time.perf_counter() - started, rows_from_status(status))
+        return status
+
+    async def executemany(self, command, args, **kwargs):
+        started = time.perf_counter()
+        result = await super().executemany(command, args, **kwargs)
+        record_query(command, time.perf_counter() - started, 0)
+        return result
+
+
+class InstrumentedPool(asyncpg.Pool):
+    def __init__(self, *args, name: str = "primary", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = name
+
+    async def _acquire(self, timeout):
+        started = time.perf_counter()
+        try:
+            return await super()._acquire(timeout)
+        finally:
+            POOL_ACQUIRE_WAIT.observe(time.perf_counter() - started, self.name)
+
+
+def create_pool(dsn=None, *, name="primary", min_size=10, max_size=10, max_queries=50000,
+                max_inactive_connection_lifetime=300.0, setup=None, init=None,
+                loop=None, connection_class=InstrumentedConnection, record_class=asyncpg.Record, **connect_kwargs):
+    return InstrumentedPool(
+        dsn,
+        name=name,
+        connection_class=connection_class,
+        record_class=record_class,
+        min_size=min_size, max_size=max_size,
+        max_queries=max_queries, loop=loop, setup=setup, init=init,
+        max_inactive_connection_lifetime=max_inactive_connection_lifetime,
+        **connect_kwargs)
+
+
+WARM_UP_QUERIES = (
+    "SELECT 1 FROM candidates LIMIT 0",
+    "SELECT 1 FROM jobs LIMIT 0",
+    "SELECT 1 FROM applications LIMIT 0",
+    "SELECT 1 FROM candidate_job_matches LIMIT 0",
+)
+
+
+async def warm_up(pool, queries=WARM_UP_QUERIES):
+    connections = [await pool.acquire() for _ in range(pool.get_min_size())]
+    try:
+        await asyncio.gather(*(_warm_connection(connection, queries) for connection in connections))
+    finally:
+        for connection in connections:
+            await pool.release(connection)
+
+
+async def _warm_connection(connection, queries):
+    for query in queries:
+        try:
+            await connection.execute(query)
+        except asyncpg.PostgresError as e:
+            logging.debug(f"Pool warm-up query skipped ({e}): {query}")
@@ -0,0 +1,314 @@
+"""Duplicate-candidate detection with blocking keys and MinHash LSH.
+
+Every candidate gets a fingerprint and a set of blocking keys: normalized
+phone, full email, email local part, and LSH band keys for MinHash
+signatures of the name's character trigrams and the resume's word
+trigrams. Only candidates that share a key are compared, so checking a
+new insert costs a few index lookups whatever the table size. Keys shared
+by more than ``MAX_BLOCK_SIZE`` candidates (a shared office phone, say)
+carry no signal and are skipped.
+
+New and edited candidates are queued by trigger and checked in the
+background. MinHash fingerprinting costs tens of milliseconds per
+candidate, so it runs in the CPU process pool rather than on the event
+loop. ``python dedup.py`` is the batch job: it fingerprints the whole
+table and scans every block.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from cpu_pool import run_cpu_bound
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS  # similarity threshold around (1/16) ** (1/4) ~= 0.5
+MAX_RESUME_WORDS = 2000
+MAX_BLOCK_SIZE = int(os.environ.get("DEDUP_MAX_BLOCK_SIZE", "200"))
+DUPLICATE_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", "0.6"))
+DEDUP_REFRESH_INTERVAL = float(os.environ.get("DEDUP_REFRESH_INTERVAL", "10"))  # seconds
+DEDUP_BATCH = int(os.environ.get("DEDUP_BATCH", "200"))
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must be comparable across workers and restarts.
+_rng = random.Random(20250701)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("61") and len(digits) == 11:
+        digits = "0" + digits[2:]
+    return digits if len(digits) >= 8 else None
+
+
+def normalize_email(email: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(full address, local part)``, ignoring case, dots and +tags."""
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return None, None
+    local, domain = email.rsplit("@", 1)
+    local = local.split("+", 1)[0].replace(".", "")
+    return f"{local}@{domain}", local or None
+
+
+def name_shingles(name: Optional[str]) -> Set[str]:
+    # Sorting tokens makes "Smith, Jane" and "Jane Smith" identical.
+    normalized = " ".join(sorted(_WORDS.findall((name or "").lower())))
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if normalized else set()
+
+
+def resume_shingles(text: Optional[str]) -> Set[str]:
+    words = _WORDS.findall((text or "").lower())[:MAX_RESUME_WORDS]
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def minhash(shingles: Set[str]) -> Optional[List[int]]:
+    if not shingles:
+        return None
+    hashed = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashed) for a, b in _PERMUTATIONS]
+
+
+def lsh_keys(prefix: str, signature: Optional[List[int]]) -> List[str]:
+    if signature is None:
+        return []
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        keys.append(f"{prefix}:{band}:{digest}")
+    return keys
+
+
+def signature_similarity(a: Optional[List[int]], b: Optional[List[int]]) -> float:
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def fingerprint(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    email_key, email_local_key = normalize_email(candidate.get("email"))
+    fp = {
+        "candidate_id": candidate["id"],
+        "phone_key": normalize_phone(candidate.get("phone")),
+        "email_key": email_key,
+        "email_local_key": email_local_key,
+        "name_signature": minhash(name_shingles(candidate.get("full_name"))) or [],
+        "resume_signature": minhash(resume_shingles(candidate.get("resume_text"))),
+    }
+    keys = lsh_keys("name", fp["name_signature"] or None) + lsh_keys("resume", fp["resume_signature"])
+    for prefix in ("phone", "email", "email_local"):
+        if fp[f"{prefix}_key"]:
+            keys.append(f"{prefix}:{fp[f'{prefix}_key']}")
+    fp["keys"] = keys
+    return fp
+
+
+def fingerprint_all(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [fingerprint(candidate) for candidate in candidates]
+
+
+def compare(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple[float, List[str]]:
+    """Score how likely two fingerprints are the same person, with reasons."""
+    if a["email_key"] and a["email_key"] == b["email_key"]:
+        return 1.0, ["email"]
+    reasons = []
+    score = 0.0
+    name = signature_similarity(a["name_signature"], b["name_signature"])
+    if name >= 0.5:
+        score += 0.45 * name
+        reasons.append("name")
+    if a["phone_key"] and a["phone_key"] == b["phone_key"]:
+        score += 0.35
+        reasons.append("phone")
+    if a["email_local_key"] and a["email_local_key"] == b["email_local_key"]:
+        score += 0.2
+        reasons.append("email_local_part")
+    resume = signature_similarity(a["resume_signature"], b["resume_signature"])
+    if resume >= 0.5:
+        score += 0.3 * resume
+        reasons.append("resume")
+    return round(min(score, 1.0), 4), reasons
+
+
+class CandidateDeduplicator:
+    async def check(self, connection, candidate_ids: List[uuid.UUID]) -> int:
+        """Fingerprint ``candidate_ids`` and record likely duplicates; returns pairs found."""
+        rows = await connection.fetch('''
+            SELECT id, email, phone, full_name, resume_text FROM candidates WHERE id = ANY($1::uuid[])
+        ''', candidate_ids)
+        fingerprints = await run_cpu_bound(fingerprint_all, [dict(row) for row in rows])
+        await self._store_fingerprints(connection, fingerprints)
+        pairs = []
+        for fp in fingerprints:
+            peer_ids = await connection.fetch('''
+                SELECT DISTINCT k.candidate_id FROM candidate_blocking_keys k
+                WHERE k.key = ANY($1::text[]) AND k.candidate_id <> $2
+                  AND k.key NOT IN (
+                      SELECT key FROM candidate_blocking_keys
+                      WHERE key = ANY($1::text[])
+                      GROUP BY key HAVING COUNT(*) > $3
+                  )
+            ''', fp["keys"], fp["candidate_id"], MAX_BLOCK_SIZE)
+            peers = await self._load_fingerprints(connection, [row['candidate_id'] for row in peer_ids])
+            pairs.extend(self._score(fp, peer) for peer in peers)
+        return await self._store_pairs(connection, pairs)
+
+    async def drain_queue(self, connection) -> int:
+        async with connection.transaction():
+            queued = await connection.fetch('''
+                DELETE FROM dedup_queue
+                WHERE candidate_id IN (
+                    SELECT candidate_id FROM dedup_queue
+                    ORDER BY queued_at
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING candidate_id
+            ''', DEDUP_BATCH)
+            if queued:
+                await self.check(connection, [row['candidate_id'] for row in queued])
+        return len(queued)
+
+    async def rebuild(self, connection) -> int:
+        """Batch job: fingerprint every candidate, then compare within every block."""
+        async with connection.transaction():
+            cursor = await connection.cursor("SELECT id, email, phone, full_name, resume_text FROM candidates")
+            while True:
+                batch = await cursor.fetch(DEDUP_BATCH)
+                if not batch:
+                    break
+                fingerprints = await run_cpu_bound(fingerprint_all, [dict(row) for row in batch])
+                await self._store_fingerprints(connection, fingerprints)
+            await connection.execute("DELETE FROM dedup_queue")
+        found = 0
+        # Large blocks make for many pairs; stream them through a server-side cursor
+        async with connection.transaction():
+            cursor = await connection.cursor('''
+                WITH usable AS (
+                    SELECT key FROM candidate_blocking_keys GROUP BY key HAVING COUNT(*) BETWEEN 2 AND $1
+                )
+                SELECT DISTINCT a.candidate_id AS candidate_a, b.candidate_id AS candidate_b
+                FROM usable u
+                JOIN candidate_blocking_keys a ON a.key = u.key
+                JOIN candidate_blocking_keys b ON b.key = u.key AND a.candidate_id < b.candidate_id
+            ''', MAX_BLOCK_SIZE)
+            while True:
+                chunk = await cursor.fetch(DEDUP_BATCH)
+                if not chunk:
+                    break
+                ids = {row['candidate_a'] for row in chunk} | {row['candidate_b'] for row in chunk}
+                by_id = {fp["candidate_id"]: fp for fp in await self._load_fingerprints(connection, list(ids))}
+                found += await self._store_pairs(connection, [
+                    self._score(by_id[row['candidate_a']], by_id[row['candidate_b']])
+                    for row in chunk if row['candidate_a'] in by_id and row['candidate_b'] in by_id
+                ])
+        return found
+
+    async def pending(self, connection, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = await connection.fetch('''
+            SELECT d.*, a.full_name AS candidate_a_name, a.email AS candidate_a_email,
+                   b.full_name AS candidate_b_name, b.email AS candidate_b_email
+            FROM duplicate_candidates d
+            JOIN candidates a ON a.id = d.candidate_a
+            JOIN candidates b ON b.id = d.candidate_b
+            WHERE d.status = 'pending'
+            ORDER BY d.score DESC
+            LIMIT $1
+        ''', limit)
+        return [dict(row) for row in rows]
+
+    async def run_refresh_loop(self, get_pool):
+        while True:
+            try:
+                async with get_pool().acquire() as connection:
+                    while await self.drain_queue(connection) == DEDUP_BATCH:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Duplicate check failed: {e}")
+            await asyncio.sleep(DEDUP_REFRESH_INTERVAL)
+
+    @staticmethod
+    def _score(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple:
+        first, second = sorted((a, b), key=lambda fp: fp["candidate_id"])
+        score, reasons = compare(first, second)
+        return first["candidate_id"], second["candidate_id"], score, reasons
+
+    @staticmethod
+    async def _store_fingerprints(connection, fingerprints: List[Dict[str, Any]]):
+        if not fingerprints:
+            return
+        ids = [fp["candidate_id"] for fp in fingerprints]
+        await connection.executemany('''
+            INSERT INTO candidate_fingerprints
+                (candidate_id, phone_key, email_key, email_local_key, name_signature, resume_signature, computed_at)
+            VALUES ($1, $2, $3, $4, $5, $6, NOW())
+            ON CONFLICT (candidate_id) DO UPDATE SET
+                phone_key = EXCLUDED.phone_key, email_key = EXCLUDED.email_key,
+                email_local_key = EXCLUDED.email_local_key, name_signature = EXCLUDED.name_signature,
+                resume_signature = EXCLUDED.resume_signature, computed_at = NOW()
+        ''', [(fp["candidate_id"], fp["phone_key"], fp["email_key"], fp["email_local_key"],
+               fp["name_signature"], fp["resume_signature"]) for fp in fingerprints])
+        await connection.execute(
+            "DELETE FROM candidate_blocking_keys WHERE candidate_id = ANY($1::uuid[])", ids
+        )
+        key_rows = [(key, fp["candidate_id"]) for fp in fingerprints for key in set(fp["keys"])]
+        await connection.copy_records_to_table(
+            "candidate_blocking_keys", records=key_rows, columns=["key", "candidate_id"]
+        )
+
+    @staticmethod
+    async def _load_fingerprints(connection, candidate_ids: List[uuid.UUID]) -> List[Dict[str, Any]]:
+        if not candidate_ids:
+            return []
+        rows = await connection.fetch(
+            "SELECT * FROM candidate_fingerprints WHERE candidate_id = ANY($1::uuid[])", candidate_ids
+        )
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    async def _store_pairs(connection, pairs: List[Tuple]) -> int:
+        pairs = [pair for pair in pairs if pair[2] >= DUPLICATE_THRESHOLD]
+        if pairs:
+            # Reviewed pairs (merged/dismissed) keep their status.
+            await connection.executemany('''
+                INSERT INTO duplicate_candidates (candidate_a, candidate_b, score, reasons)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (candidate_a, candidate_b) DO UPDATE
+                SET score = EXCLUDED.score, reasons = EXCLUDED.reasons
+                WHERE duplicate_candidates.status = 'pending'
+            ''', pairs)
+        return len(pairs)
+
+
+async def _main(dsn: str):
+    import asyncpg
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        found = await CandidateDeduplicator().rebuild(connection)
+        print(f"Recorded {found} likely duplicate pair(s)")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    from server import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Rebuild duplicate-candidate fingerprints and pairs")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.dsn))
@@ -0,0 +1,91 @@
+"""Production process model: gunicorn managing uvicorn workers.
+
+    gunicorn server:app --config gunicorn.conf.py
+
+* The app is imported once in the master (``preload_app``) and forked,
+  so workers start in milliseconds and share the imported code pages.
+* ``WEB_CONCURRENCY`` workers, defaulting to the CPUs the container may
+  use (process_model.worker_count).
+* ``DB_CONNECTION_BUDGET`` Postgres connections split across the
+  workers. This sets POOL_MIN_SIZE and POOL_MAX_SIZE before the app is
+  imported, unless they are set explicitly. ``REPLICA_CONNECTION_BUDGET``
+  does the same for the read replica pool.
+* Each worker is recycled after ``MAX_REQUESTS`` requests, with jitter
+  so they don't all restart together. That caps slow memory growth.
+* Migrations run once in the master before workers are forked. Workers
+  skip them, whatever ``RUN_MIGRATIONS_ON_STARTUP`` says.
+* On SIGTERM, workers stop accepting connections and finish in-flight
+  requests for up to ``GRACEFUL_TIMEOUT`` seconds. The lifespan shutdown
+  then cancels background loops, gives up scheduler leadership and
+  closes the pool. Give the container a longer stop grace period than
+  this.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from uvicorn.workers import UvicornWorker  # noqa: E402
+
+from process_model import available_cpus, pool_sizes, worker_count  # noqa: E402
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+workers = worker_count(available_cpus(), os.environ.get("WEB_CONCURRENCY"))
+preload_app = True
+
+max_requests = int(os.environ.get("MAX_REQUESTS", "20000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", str(max_requests // 10)))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+
+
+class DrainingUvicornWorker(UvicornWorker):
+    # Stop waiting on slow requests early enough that the lifespan shutdown
+    # still runs before gunicorn kills the worker at graceful_timeout.
+    CONFIG_KWARGS = dict(UvicornWorker.CONFIG_KWARGS, timeout_graceful_shutdown=max(1, graceful_timeout - 5))
+
+
+worker_class = DrainingUvicornWorker
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))  # heartbeat; a blocked event loop gets the worker restarted
+keepalive = int(os.environ.get("KEEPALIVE", "5"))
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+accesslog = os.environ.get("ACCESS_LOG") or None
+
+_budget = int(os.environ.get("DB_CONNECTION_BUDGET", "50"))
+_pool = pool_sizes(_budget, workers)
+os.environ.setdefault("POOL_MAX_SIZE", str(_pool.max_size))
+os.environ.setdefault("POOL_MIN_SIZE", str(min(_pool.min_size, int(os.environ["POOL_MAX_SIZE"]))))
+if os.environ.get("REPLICA_DATABASE_URL"):
+    # The replica only serves pooled reporting reads; nothing dedicated runs there
+    _replica = pool_sizes(int(os.environ.get("REPLICA_CONNECTION_BUDGET", str(_budget))), workers, dedicated=0)
+    os.environ.setdefault("REPLICA_POOL_MAX_SIZE", str(_replica.max_size))
+    os.environ.setdefault("REPLICA_POOL_MIN_SIZE",
+                          str(min(_replica.min_size, int(os.environ["REPLICA_POOL_MAX_SIZE"]))))
+
+# Read before the app is imported: the master migrates, workers never do
+run_migrations = os.environ.get("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+
+
+def on_starting(server):
+    if not run_migrations:
+        return
+    import migrate
+    from server import DATABASE_URL
+
+    applied = asyncio.run(migrate.migrate(DATABASE_URL))
+    server.log.info(f"Applied {len(applied)} migration(s)")
+
+
+def when_ready(server):
+    server.log.info(
+        f"{workers} workers, pool {os.environ['POOL_MIN_SIZE']}-{os.environ['POOL_MAX_SIZE']} connections each, "
+        f"recycled after {max_requests}+-{max_requests_jitter} requests"
+    )
+
+
+def post_fork(server, worker):
+    # The app was imported in the master; label metrics with this worker's pid.
+    import metrics
+
+    metrics.WORKER = str(os.getpid())
@@ -0,0 +1,114 @@
+"""Interviewer conflict checks and batch availability.
+
+Every interview carries a ``slot`` range, ``[scheduled_date,
+scheduled_date + duration)``, kept up to date by a trigger. The
+``interviews_no_overlap`` exclusion constraint is a GiST index on
+``(lower(interviewer_email), slot)``. It rejects double bookings at
+insert time and also serves the overlap (``&&``) lookups here, so a
+conflict check is one index probe.
+
+``free_slots`` returns availability for several interviewers in one
+query. It builds the working-hours windows for the date range as a
+multirange and subtracts each interviewer's booked slots with range
+arithmetic, so no per-interviewer or per-day round trips are needed.
+"""
+import os
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+SCHEDULING_TIMEZONE = os.environ.get("SCHEDULING_TIMEZONE", "Australia/Brisbane")
+WORKDAY_START = time.fromisoformat(os.environ.get("WORKDAY_START", "08:00"))
+WORKDAY_END = time.fromisoformat(os.environ.get("WORKDAY_END", "17:00"))
+MAX_AVAILABILITY_DAYS = 31
+OVERLAP_CONSTRAINT = "interviews_no_overlap"
+
+# Interviews in these states occupy the interviewer's time.
+LIVE_STATUSES = ("scheduled", "rescheduled")
+_LIVE = ", ".join(f"'{status}'" for status in LIVE_STATUSES)
+
+FREE_SLOTS_QUERY = f'''
+    WITH interviewers AS (
+        SELECT DISTINCT lower(email) AS email FROM unnest($1::text[]) AS email
+    ), working AS (
+        SELECT COALESCE(range_agg(tstzrange(
+                   (day::date + $4::time) AT TIME ZONE $6,
+                   (day::date + $5::time) AT TIME ZONE $6, '[)')), '{{}}'::tstzmultirange)
+               * tstzmultirange(tstzrange($2, $3, '[)')) AS hours
+        FROM generate_series(($2::timestamptz AT TIME ZONE $6::text)::date::timestamp,
+                             ($3::timestamptz AT TIME ZONE $6::text)::date::timestamp,
+                             interval '1 day') AS day
+        WHERE extract(isodow FROM day) < 6
+    ), booked AS (
+        SELECT lower(interviewer_email) AS email, range_agg(slot) AS slots
+        FROM interviews
+        WHERE lower(interviewer_email) IN (SELECT email FROM interviewers)
+          AND status IN ({_LIVE})
+          AND slot && tstzrange($2, $3, '[)')
+        GROUP BY 1
+    )
+    SELECT i.email, lower(free) AS start, upper(free) AS "end"
+    FROM interviewers i
+    CROSS JOIN working w
+    LEFT JOIN booked b ON b.email = i.email
+    CROSS JOIN LATERAL unnest(w.hours - COALESCE(b.slots, '{{}}'::tstzmultirange)) AS free
+    WHERE upper(free) - lower(free) >= make_interval(mins => $7)
+    ORDER BY i.email, start
+'''
+
+
+class AvailabilityRangeError(ValueError):
+    pass
+
+
+def check_range(start: datetime, end: datetime) -> None:
+    if end <= start:
+        raise AvailabilityRangeError("end must be after start")
+    if end - start > timedelta(days=MAX_AVAILABILITY_DAYS):
+        raise AvailabilityRangeError(f"range must be at most {MAX_AVAILABILITY_DAYS} days")
+
+
+def group_slots(emails: List[str], rows) -> Dict[str, List[Dict[str, Any]]]:
+    """Key free slots by interviewer, including interviewers with none."""
+    slots: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        slots[row['email']].append({"start": row['start'], "end": row['end']})
+    return {email.lower(): slots.get(email.lower(), []) for email in emails}
+
+
+async def find_conflicts(
+    connection,
+    interviewer_email: str,
+    start: datetime,
+    duration_minutes: int,
+    exclude_id: Optional[Any] = None,
+) -> List[Dict[str, Any]]:
+    """Live interviews for the interviewer that overlap the proposed slot."""
+    rows = await connection.fetch(f'''
+        SELECT id, candidate_id, interviewer_email, lower(slot) AS start, upper(slot) AS "end", status
+        FROM interviews
+        WHERE lower(interviewer_email) = lower($1)
+          AND status IN ({_LIVE})
+          AND slot && tstzrange($2::timestamptz, $2::timestamptz + make_interval(mins => $3::int), '[)')
+          AND ($4::uuid IS NULL OR id <> $4::uuid)
+        ORDER BY lower(slot)
+    ''', interviewer_email, start, duration_minutes, exclude_id)
+    return [dict(row) for row in rows]
+
+
+async def free_slots(
+    connection,
+    interviewer_emails: List[str],
+    start: datetime,
+    end: datetime,
+    min_minutes: int = 30,
+    workday_start: time = WORKDAY_START,
+    workday_end: time = WORKDAY_END,
+    timezone: str = SCHEDULING_TIMEZONE,
+) -> Dict[str, List[Dict[str, Any]]]:
+    check_range(start, end)
+    rows = await connection.fetch(
+        FREE_SLOTS_QUERY, interviewer_emails, start, end,
+        workday_start, workday_end, timezone, min_minutes
+    )
+    return group_slots(interviewer_emails, rows)
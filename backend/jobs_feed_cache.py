@@ -0,0 +1,215 @@
+"""Stale-while-revalidate response cache for ``GET /api/jobs?status=active``.
+
+The serialized feed is kept as bytes with a strong ETag. Fresh hits and
+conditional requests are answered without touching the route or Postgres;
+stale hits are answered immediately while one background request rebuilds
+the feed. Successful writes to ``/api/jobs`` invalidate the feed on every
+worker through the invalidation bus.
+
+The feed is public and shared, so it is always rendered without the
+caller's credentials: an authenticated view never ends up in the cache.
+When a refresh fails, every request waiting on it gets the route's own
+error response (or exception), not a generic 503.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from cache_bus import ALL_KEYS
+
+JOBS_FEED_NAMESPACE = "jobs"
+JOBS_PATH = "/api/jobs"
+FEED_MAX_AGE = int(os.environ.get("JOBS_FEED_MAX_AGE", "60"))  # seconds
+FEED_STALE_WHILE_REVALIDATE = int(os.environ.get("JOBS_FEED_STALE_WHILE_REVALIDATE", "600"))  # seconds
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since"}
+CREDENTIAL_HEADERS = {b"authorization", b"cookie", b"proxy-authorization"}
+
+
+class FeedLoadError(Exception):
+    """The feed route answered with something other than 200; ``messages`` is that response."""
+
+    def __init__(self, messages: List[dict]):
+        super().__init__(f"jobs feed route returned {messages[0]['status']}")
+        self.messages = messages
+
+
+class FeedEntry:
+    def __init__(self, body: bytes, content_type: bytes):
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'.encode()
+        self.fetched_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class JobsFeedCache:
+    """Holds the current feed entry and coordinates refreshes."""
+
+    def __init__(self, max_age: int = FEED_MAX_AGE, stale_while_revalidate: int = FEED_STALE_WHILE_REVALIDATE):
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.entry: Optional[FeedEntry] = None
+        self.generation = 0
+        self._refresh: Optional[asyncio.Future] = None
+
+    @property
+    def cache_control(self) -> bytes:
+        return f"public, max-age={self.max_age}, stale-while-revalidate={self.stale_while_revalidate}".encode()
+
+    def invalidate(self, key: str = ALL_KEYS):
+        self.entry = None
+        self.generation += 1
+
+    def lookup(self) -> Tuple[Optional[FeedEntry], bool]:
+        """Return ``(entry, is_stale)``; entries past the SWR window are dropped."""
+        entry = self.entry
+        if entry is None:
+            return None, False
+        age = entry.age()
+        if age <= self.max_age:
+            return entry, False
+        if age <= self.max_age + self.stale_while_revalidate:
+            return entry, True
+        self.entry = None
+        return None, False
+
+    def refresh(self, loader: Callable[[], Awaitable[FeedEntry]]) -> asyncio.Future:
+        """Run ``loader`` once even if many requests miss at the same time."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(self._load(loader))
+            self._refresh.add_done_callback(_log_failure)
+        return self._refresh
+
+    async def _load(self, loader) -> FeedEntry:
+        generation = self.generation
+        entry = await loader()
+        # A write landed while we were loading; don't cache what we read.
+        if generation == self.generation:
+            self.entry = entry
+        return entry
+
+
+def _log_failure(future: asyncio.Future):
+    # Also marks the exception as retrieved for background (stale) refreshes nobody awaits.
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(f"Jobs feed refresh failed: {future.exception()}")
+
+
+class JobsFeedCacheMiddleware:
+    def __init__(self, app, feed: JobsFeedCache, on_write: Callable[[], Awaitable[None]]):
+        self.app = app
+        self.feed = feed
+        self.on_write = on_write
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(JOBS_PATH):
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        if method in ("GET", "HEAD") and self._is_active_feed(scope):
+            await self._serve_feed(scope, send)
+        elif method in WRITE_METHODS and self._is_jobs_resource(scope["path"]):
+            await self.app(scope, receive, self._invalidating_send(send))
+        else:
+            await self.app(scope, receive, send)
+
+    @staticmethod
+    def _is_active_feed(scope) -> bool:
+        if scope["path"].rstrip("/") != JOBS_PATH:
+            return False
+        return parse_qs(scope["query_string"].decode("latin-1")) == {"status": ["active"]}
+
+    @staticmethod
+    def _is_jobs_resource(path: str) -> bool:
+        return path.rstrip("/") == JOBS_PATH or path.startswith(JOBS_PATH + "/")
+
+    def _invalidating_send(self, send):
+        async def wrapped(message):
+            # Invalidate before the client sees success so a follow-up read
+            # can't be served the old feed.
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                self.feed.invalidate()
+                try:
+                    await self.on_write()
+                except Exception as e:
+                    logging.error(f"Failed to publish jobs feed invalidation: {e}")
+            await send(message)
+        return wrapped
+
+    async def _serve_feed(self, scope, send):
+        entry, stale = self.feed.lookup()
+        if entry is None:
+            try:
+                entry = await self.feed.refresh(lambda: self._load(scope))
+            except FeedLoadError as e:
+                # Every waiter on this refresh gets the route's error response.
+                for message in e.messages:
+                    await send(message)
+                return
+            cache_status = b"MISS"
+        elif stale:
+            self.feed.refresh(lambda: self._load(scope))
+            cache_status = b"STALE"
+        else:
+            cache_status = b"HIT"
+
+        headers = [
+            (b"etag", entry.etag),
+            (b"cache-control", self.feed.cache_control),
+            (b"x-cache", cache_status),
+        ]
+        if self._matches_etag(scope, entry.etag):
+            await self._send(send, 304, headers, b"")
+            return
+        headers.append((b"content-type", entry.content_type))
+        body = b"" if scope["method"] == "HEAD" else entry.body
+        await self._send(send, 200, headers, body, content_length=len(entry.body))
+
+    async def _load(self, scope) -> FeedEntry:
+        """Render the feed through the normal route, anonymously, and capture its bytes."""
+        inner_scope = dict(scope)
+        inner_scope["method"] = "GET"
+        inner_scope["headers"] = [
+            (k, v) for k, v in scope["headers"] if k not in CONDITIONAL_HEADERS and k not in CREDENTIAL_HEADERS
+        ]
+        messages: List[dict] = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def capture(message):
+            messages.append(message)
+
+        await self.app(inner_scope, receive, capture)
+        if not messages:
+            raise RuntimeError("jobs feed route sent no response")
+        start = messages[0]
+        if start["status"] != 200:
+            raise FeedLoadError(messages)
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        content_type = dict(start.get("headers", [])).get(b"content-type", b"application/json")
+        return FeedEntry(body, content_type)
+
+    @staticmethod
+    def _matches_etag(scope, etag: bytes) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                candidates = [v.strip() for v in value.split(b",")]
+                return etag in candidates or b"*" in candidates
+        return False
+
+    @staticmethod
+    async def _send(send, status: int, headers, body: bytes, content_length: Optional[int] = None):
+        length = len(body) if content_length is None else content_length
+        if status != 304:
+            headers = headers + [(b"content-length", str(length).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,34 @@
+"""Deferred imports for heavy libraries the server rarely needs at boot.
+
+``lazy_import("PyPDF2")`` returns a module object whose body runs on
+first attribute access (``importlib.util.LazyLoader``). Worker start-up
+therefore doesn't pay for PDF parsing, templating, JWT backends, HTTP
+clients or SendGrid until a request uses them. Use the module through
+attribute access (``httpx.AsyncClient``). ``from x import y`` loads it
+immediately, and so does an annotation that is evaluated at definition
+time.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """True once ``name`` has been imported for real, not just registered lazily."""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
@@ -0,0 +1,207 @@
+"""Precomputed candidate-to-job match ranking.
+
+Scores live in ``candidate_job_matches`` and only pairs scoring at least
+``MIN_MATCH_SCORE`` are stored, which keeps the table sparse. Triggers on
+``candidates`` and ``jobs`` queue changed rows. ``drain_refresh_queue``
+rescores a changed candidate against the active jobs, or a changed job
+against all candidates in batches. Each transaction claims one queued
+job, or a small batch of queued candidates, so a queue row lock is never
+held across a long rescore of many entities; scoring itself runs in the
+CPU process pool. ``/api/jobs/{id}/matches`` then reads the top-K with a
+single index range scan.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cpu_pool import run_cpu_bound
+from profiling import span
+
+MIN_MATCH_SCORE = float(os.environ.get("MIN_MATCH_SCORE", "0.3"))
+MATCH_REFRESH_INTERVAL = float(os.environ.get("MATCH_REFRESH_INTERVAL", "5"))  # seconds
+MATCH_REFRESH_BATCH = int(os.environ.get("MATCH_REFRESH_BATCH", "50"))  # candidates per transaction
+CANDIDATE_SCAN_BATCH = 1000
+
+WEIGHTS = {"location": 0.3, "visa": 0.2, "requirements": 0.3, "candidate_score": 0.2}
+VISA_SCORES = {"citizen": 1.0, "permanent": 1.0, "temporary": 0.6, "needs_sponsorship": 1.0}
+RELOCATION_SCORES = {"yes": 0.8, "maybe": 0.5, "no": 0.0}
+
+_YEARS = re.compile(r"(\d+)\+?\s*years?")
+_WORDS = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"in", "of", "and", "the", "a", "an", "or", "with", "to", "for"}
+
+CANDIDATE_COLUMNS = '''id, location, visa_status, sponsorship_needed, experience_years,
+    relocation_willing, housing_needed, skills, childcare_cert, score'''
+
+
+def _requirements(job: Dict[str, Any]) -> List[str]:
+    requirements = job.get("requirements") or []
+    if isinstance(requirements, str):
+        try:
+            requirements = json.loads(requirements)
+        except ValueError:
+            requirements = [requirements]
+    return [str(r).lower() for r in requirements]
+
+
+def _words(text: str) -> set:
+    return {w for w in _WORDS.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def requirement_coverage(job: Dict[str, Any], candidate: Dict[str, Any]) -> float:
+    requirements = _requirements(job)
+    if not requirements:
+        return 1.0
+    skills = [s.lower() for s in candidate.get("skills") or []]
+    cert_words = _words(candidate.get("childcare_cert") or "")
+    experience = candidate.get("experience_years") or 0
+    met = 0
+    for requirement in requirements:
+        years = _YEARS.search(requirement)
+        if years and "experience" in requirement:
+            met += experience >= int(years.group(1))
+        elif any(skill and skill in requirement for skill in skills):
+            met += 1
+        elif cert_words and _words(requirement) <= cert_words:
+            met += 1
+    return met / len(requirements)
+
+
+def match_score(job: Dict[str, Any], candidate: Dict[str, Any]) -> float:
+    """Score a candidate for a job in [0, 1]; 0 means not viable."""
+    if candidate.get("visa_status") == "needs_sponsorship" or candidate.get("sponsorship_needed"):
+        if not job.get("sponsorship_eligible"):
+            return 0.0
+    if candidate.get("location") == job.get("location"):
+        location = 1.0
+    else:
+        location = RELOCATION_SCORES.get(candidate.get("relocation_willing"), 0.0)
+        if location == 0.0:
+            return 0.0
+        if job.get("relocation_support"):
+            location += 0.1
+        if candidate.get("housing_needed") and not job.get("housing_support"):
+            location -= 0.3
+    visa = VISA_SCORES.get(candidate.get("visa_status"), 0.5)
+    candidate_score = min(float(candidate.get("score") or 0) / 10, 1.0)
+    total = (
+        WEIGHTS["location"] * max(0.0, min(location, 1.0))
+        + WEIGHTS["visa"] * visa
+        + WEIGHTS["requirements"] * requirement_coverage(job, candidate)
+        + WEIGHTS["candidate_score"] * candidate_score
+    )
+    return round(total, 4)
+
+
+def score_pairs(jobs: Iterable[Dict[str, Any]], candidates: Iterable[Dict[str, Any]]) -> List[Tuple]:
+    pairs = []
+    for job in jobs:
+        for candidate in candidates:
+            score = match_score(job, candidate)
+            if score >= MIN_MATCH_SCORE:
+                pairs.append((job["id"], candidate["id"], score))
+    return pairs
+
+
+class MatchEngine:
+    async def top_matches(self, connection, job_id: uuid.UUID, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = await connection.fetch('''
+            SELECT c.*, m.score AS match_score, m.computed_at AS match_computed_at
+            FROM candidate_job_matches m
+            JOIN candidates c ON c.id = m.candidate_id
+            WHERE m.job_id = $1
+            ORDER BY m.score DESC
+            LIMIT $2
+        ''', job_id, limit)
+        return [dict(row) for row in rows]
+
+    async def drain_refresh_queue(self, connection) -> int:
+        """Rescore one queued job, or else one batch of queued candidates; return how many were claimed."""
+        async with connection.transaction():
+            job_ids = await self._claim(connection, "job", 1)
+            if job_ids:
+                await self._rescore_job(connection, job_ids[0])
+                return 1
+        async with connection.transaction():
+            candidate_ids = await self._claim(connection, "candidate", MATCH_REFRESH_BATCH)
+            if candidate_ids:
+                await self._rescore_candidates(connection, candidate_ids)
+        return len(candidate_ids)
+
+    @staticmethod
+    async def _claim(connection, entity_type: str, limit: int) -> List[uuid.UUID]:
+        # SKIP LOCKED lets every worker drain concurrently without overlap.
+        rows = await connection.fetch('''
+            DELETE FROM match_refresh_queue
+            WHERE (entity_type, entity_id) IN (
+                SELECT entity_type, entity_id FROM match_refresh_queue
+                WHERE entity_type = $1
+                ORDER BY queued_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING entity_id
+        ''', entity_type, limit)
+        return [row['entity_id'] for row in rows]
+
+    async def _active_jobs(self, connection, job_ids: Optional[List[uuid.UUID]] = None) -> List[Dict[str, Any]]:
+        if job_ids is None:
+            rows = await connection.fetch("SELECT * FROM jobs WHERE status = 'active'")
+        else:
+            rows = await connection.fetch(
+                "SELECT * FROM jobs WHERE status = 'active' AND id = ANY($1::uuid[])", job_ids
+            )
+        return [dict(row) for row in rows]
+
+    async def _rescore_job(self, connection, job_id: uuid.UUID):
+        await connection.execute("DELETE FROM candidate_job_matches WHERE job_id = $1", job_id)
+        jobs = await self._active_jobs(connection, [job_id])
+        if not jobs:
+            return  # deleted or no longer active
+        cursor = await connection.cursor(f"SELECT {CANDIDATE_COLUMNS} FROM candidates")
+        while True:
+            batch = await cursor.fetch(CANDIDATE_SCAN_BATCH)
+            if not batch:
+                break
+            with span("match_scoring"):
+                pairs = await run_cpu_bound(score_pairs, jobs, [dict(row) for row in batch])
+            await self._store(connection, pairs)
+
+    async def _rescore_candidates(self, connection, candidate_ids: List[uuid.UUID]):
+        await connection.execute(
+            "DELETE FROM candidate_job_matches WHERE candidate_id = ANY($1::uuid[])", candidate_ids
+        )
+        rows = await connection.fetch(
+            f"SELECT {CANDIDATE_COLUMNS} FROM candidates WHERE id = ANY($1::uuid[])", candidate_ids
+        )
+        jobs = await self._active_jobs(connection)
+        with span("match_scoring"):
+            pairs = await run_cpu_bound(score_pairs, jobs, [dict(row) for row in rows])
+        await self._store(connection, pairs)
+
+    @staticmethod
+    async def _store(connection, pairs: List[Tuple]):
+        if pairs:
+            job_ids, candidate_ids, scores = zip(*pairs)
+            await connection.execute('''
+                INSERT INTO candidate_job_matches (job_id, candidate_id, score)
+                SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::real[])
+                ON CONFLICT (job_id, candidate_id) DO UPDATE
+                SET score = EXCLUDED.score, computed_at = NOW()
+            ''', list(job_ids), list(candidate_ids), list(scores))
+
+    async def run_refresh_loop(self, get_pool):
+        while True:
+            try:
+                async with get_pool().acquire() as connection:
+                    while await self.drain_refresh_queue(connection):
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Match refresh failed: {e}")
+            await asyncio.sleep(MATCH_REFRESH_INTERVAL)
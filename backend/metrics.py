@@ -0,0 +1,257 @@
+"""In-process Prometheus metrics.
+
+A small registry of counters, gauges and histograms, rendered in the
+Prometheus text exposition format at ``/metrics``. Recording a value is
+a dict lookup plus a ``bisect``, and there are no locks, because
+everything runs on the event loop thread. Per-request overhead is
+measured by ``benchmarks/bench_metrics.py``.
+
+``MetricsMiddleware`` labels requests with the matched route *template*
+(``/api/jobs/{job_id}/matches``) rather than the raw path, so label
+cardinality is bounded by the number of routes.
+
+Each worker process keeps its own values and labels them with
+``worker``, so a scrape reports the worker that served it. Scrape every
+worker, or sum by route in queries.
+"""
+import asyncio
+import math
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+from concurrency import classify_route
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+EVENT_LOOP_LAG_INTERVAL = float(os.environ.get("EVENT_LOOP_LAG_INTERVAL", "0.5"))  # seconds
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+MAX_CACHED_PATHS = 1024  # route templates remembered for requests answered before routing
+
+WORKER = str(os.getpid())
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = ("worker",) + tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, (WORKER,) + labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], and the sum.
+        self.counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str):
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        bucket_names = self.label_names + ("le",)
+        for labels, counts in sorted(self.counts.items()):
+            values = (WORKER,) + labels
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_names, values + (le,))} {cumulative}")
+            label_text = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(self.sums[labels])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "ats_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "ats_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "ats_http_requests_in_flight", "Requests currently being handled, by route class.", ("route_class",)))
+POOL_ACQUIRE_WAIT = REGISTRY.register(Histogram(
+    "ats_db_pool_acquire_seconds", "Time spent waiting for a pooled connection.", ("pool",), WAIT_BUCKETS))
+OUTBOUND_LATENCY = REGISTRY.register(Histogram(
+    "ats_outbound_request_duration_seconds", "Latency of calls to external services.", ("target", "outcome")))
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "ats_event_loop_lag_seconds", "How late the event loop runs a scheduled wake-up.", (), WAIT_BUCKETS))
+WORKER_BOOT = REGISTRY.register(Gauge(
+    "ats_worker_boot_seconds", "Worker boot time: importing the app, then the startup handler.", ("phase",)))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording count, latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[object, str] = {}
+        self._paths: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify_route(scope["path"]) or "other"
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route_class)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(route_class)
+            route = self._route_template(scope)
+            HTTP_LATENCY.observe(elapsed, scope["method"], route)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status[0]))
+
+    def _route_template(self, scope) -> str:
+        # The router stores the matched endpoint in the scope it was given.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # Answered before routing (feed cache hit, load shedding 503) or no route at all
+            return self._match_path(scope)
+        template = self._routes.get(endpoint)
+        if template is None:
+            template = "<unmatched>"
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            self._routes[endpoint] = template
+        return template
+
+    def _match_path(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        template = self._paths.get(key)
+        if template is None:
+            template = "<unmatched>"
+            for route in scope["app"].routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    template = route.path
+                    break
+                if match == Match.PARTIAL and template == "<unmatched>":
+                    template = route.path  # path matches, method doesn't (405)
+            if len(self._paths) < MAX_CACHED_PATHS:
+                self._paths[key] = template
+        return template
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+
+def observe_outbound(target: str, started: float, ok: bool):
+    OUTBOUND_LATENCY.observe(time.perf_counter() - started, target, "ok" if ok else "error")
@@ -0,0 +1,171 @@
+"""Versioned SQL migrations.
+
+Migrations live in ``migrations/NNNN_description.sql`` and are applied in
+order, each exactly once, recorded in ``schema_migrations``. They run
+once per deploy, from the gunicorn master (``on_starting`` in
+gunicorn.conf.py) or as a release step with this script, not from every
+worker. A Postgres advisory lock still serializes instances that start
+together. Waiters poll for it with ``pg_try_advisory_lock`` rather than
+blocking in a statement, because ``CREATE INDEX CONCURRENTLY`` waits for
+every open snapshot, including that of a session stuck on the lock.
+
+Files that start with ``-- migrate: no-transaction`` are run statement by
+statement outside a transaction, which ``CREATE INDEX CONCURRENTLY``
+requires. Write those statements so they can be re-run (``IF NOT EXISTS``).
+A failed concurrent build leaves an INVALID index behind that
+``IF NOT EXISTS`` would skip, so such an index is dropped before the
+statement is retried.
+
+Usage: python migrate.py [--dsn postgresql://...] [--list]
+"""
+import argparse
+import asyncio
+import logging
+import re
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import asyncpg
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATION_LOCK_ID = 727_001  # arbitrary, shared by every worker
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+LOCK_POLL_INTERVAL = 1.0  # seconds
+
+_FILENAME = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+_CONCURRENT_INDEX = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file name must look like 0001_name.sql: {path.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), path))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Duplicate migration version numbers")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    # Migration files don't put semicolons inside literals, so a plain split is enough.
+    without_comments = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    return [statement.strip() for statement in without_comments.split(";") if statement.strip()]
+
+
+def concurrent_index_name(statement: str) -> Optional[str]:
+    match = _CONCURRENT_INDEX.match(statement)
+    return match.group(1) if match else None
+
+
+async def drop_invalid_index(connection, name: str) -> bool:
+    """Drop index ``name`` if an earlier concurrent build left it INVALID."""
+    invalid = await connection.fetchval(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name
+    )
+    if not invalid:
+        return False
+    logging.warning(f"Dropping invalid index {name} left by a failed concurrent build")
+    await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    return True
+
+
+async def applied_versions(connection) -> List[int]:
+    await connection.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    ''')
+    rows = await connection.fetch("SELECT version FROM schema_migrations ORDER BY version")
+    return [row['version'] for row in rows]
+
+
+async def apply_migrations(connection, migrations: List[Migration] = None) -> List[int]:
+    """Apply pending migrations on ``connection`` and return their versions."""
+    migrations = discover_migrations() if migrations is None else migrations
+    applied = []
+    while not await connection.fetchval("SELECT pg_try_advisory_lock($1)", MIGRATION_LOCK_ID):
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+    try:
+        done = set(await applied_versions(connection))
+        for migration in migrations:
+            if migration.version in done:
+                continue
+            logging.info(f"Applying migration {migration.version:04d}_{migration.name}")
+            if migration.transactional:
+                async with connection.transaction():
+                    await connection.execute(migration.sql)
+                    await _record(connection, migration)
+            else:
+                for statement in split_statements(migration.sql):
+                    index = concurrent_index_name(statement)
+                    if index:
+                        await drop_invalid_index(connection, index)
+                    await connection.execute(statement)
+                await _record(connection, migration)
+            applied.append(migration.version)
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+    return applied
+
+
+async def _record(connection, migration: Migration):
+    await connection.execute(
+        "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+        migration.version, migration.name
+    )
+
+
+async def migrate(dsn: str) -> List[int]:
+    """Apply pending migrations on a connection of its own."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        return await apply_migrations(connection)
+    finally:
+        await connection.close()
+
+
+async def _main(dsn: str, list_only: bool):
+    if not list_only:
+        applied = await migrate(dsn)
+        print(f"Applied {len(applied)} migration(s)")
+        return
+    connection = await asyncpg.connect(dsn)
+    try:
+        done = set(await applied_versions(connection))
+        for migration in discover_migrations():
+            state = "applied" if migration.version in done else "pending"
+            print(f"{migration.version:04d}_{migration.name}: {state}")
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    from server import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--list", action="store_true", help="show migration status without applying")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.dsn, args.list))
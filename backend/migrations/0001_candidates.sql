@@ -0,0 +1,36 @@
+-- Candidate table owned by the migration history. IF NOT EXISTS adopts
+-- databases created before migrations existed; the ALTERs make sure the
+-- columns advanced search filters on are present there too.
+CREATE TABLE IF NOT EXISTS candidates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email TEXT NOT NULL,
+    phone TEXT,
+    full_name TEXT NOT NULL,
+    location TEXT,
+    visa_status TEXT,
+    visa_type TEXT,
+    sponsorship_needed BOOLEAN NOT NULL DEFAULT FALSE,
+    childcare_cert TEXT,
+    experience_years INTEGER,
+    rural_experience BOOLEAN NOT NULL DEFAULT FALSE,
+    relocation_willing TEXT,
+    housing_needed BOOLEAN NOT NULL DEFAULT FALSE,
+    english_level TEXT,
+    availability_start TIMESTAMPTZ,
+    salary_expectation INTEGER,
+    notes TEXT,
+    resume_filename TEXT,
+    resume_text TEXT,
+    skills TEXT[] NOT NULL DEFAULT '{}',
+    score DOUBLE PRECISION,
+    status TEXT NOT NULL DEFAULT 'new',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS skills TEXT[] NOT NULL DEFAULT '{}';
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS score DOUBLE PRECISION;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'new';
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS resume_text TEXT;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
@@ -0,0 +1,47 @@
+-- migrate: no-transaction
+-- Indexes for the AdvancedSearchFilter predicates in search_candidates.
+-- Built CONCURRENTLY so adding them to a live table doesn't block writes.
+
+-- required_skills: skills && $n
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_skills_gin
+    ON candidates USING GIN (skills);
+
+-- visa_status / sponsorship_needed, usually combined with a score floor
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_visa_sponsorship_score
+    ON candidates (visa_status, sponsorship_needed, score DESC);
+
+-- locations, optionally narrowed by visa status
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_location_visa
+    ON candidates (location, visa_status);
+
+-- "sponsorship needed, rural experience, score >= N"
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_sponsorship_rural_score
+    ON candidates (sponsorship_needed, rural_experience, score DESC);
+
+-- relocation_willing across locations
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_relocation_location
+    ON candidates (relocation_willing, location);
+
+-- experience range with score ordering
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_experience_score
+    ON candidates (experience_years, score DESC);
+
+-- available_from
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_availability_start
+    ON candidates (availability_start);
+
+-- applied_after / applied_before and compliance report periods
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_created_at
+    ON candidates (created_at DESC);
+
+-- application_status: the open pipeline is small relative to the archive
+-- of hired/rejected candidates, so keep it in its own partial index.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_open_status
+    ON candidates (status, created_at DESC)
+    WHERE status IN ('new', 'screening', 'interview', 'offer');
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_hired_created_at
+    ON candidates (created_at)
+    WHERE status = 'hired';
+
+ANALYZE candidates;
@@ -0,0 +1,44 @@
+-- Saved advanced searches with materialized match sets.
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    filter_hash TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    filters JSONB NOT NULL,
+    last_viewed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS saved_search_matches (
+    saved_search_id UUID NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+    candidate_id UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    matched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (saved_search_id, candidate_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_saved_search_matches_matched_at
+    ON saved_search_matches (saved_search_id, matched_at);
+
+-- Candidates whose searchable fields changed since the last refresh.
+-- Filled by trigger so every write path is covered, drained in batches.
+CREATE TABLE IF NOT EXISTS saved_search_refresh_queue (
+    candidate_id UUID PRIMARY KEY,
+    queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION queue_saved_search_refresh() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO saved_search_refresh_queue (candidate_id)
+    VALUES (NEW.id)
+    ON CONFLICT (candidate_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS candidates_saved_search_refresh ON candidates;
+CREATE TRIGGER candidates_saved_search_refresh
+    AFTER INSERT OR UPDATE OF location, visa_status, sponsorship_needed, experience_years,
+        rural_experience, score, availability_start, relocation_willing, skills, status,
+        full_name, email, notes, resume_text, childcare_cert
+    ON candidates
+    FOR EACH ROW EXECUTE FUNCTION queue_saved_search_refresh();
@@ -0,0 +1,53 @@
+-- Sparse candidate x job match scores, kept current from a trigger-fed queue.
+CREATE TABLE IF NOT EXISTS candidate_job_matches (
+    job_id UUID NOT NULL,
+    candidate_id UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job_id, candidate_id)
+);
+
+-- Top-K per job is an index range scan.
+CREATE INDEX IF NOT EXISTS idx_candidate_job_matches_job_score
+    ON candidate_job_matches (job_id, score DESC);
+
+CREATE INDEX IF NOT EXISTS idx_candidate_job_matches_candidate
+    ON candidate_job_matches (candidate_id);
+
+CREATE TABLE IF NOT EXISTS match_refresh_queue (
+    entity_type TEXT NOT NULL CHECK (entity_type IN ('candidate', 'job')),
+    entity_id UUID NOT NULL,
+    queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE OR REPLACE FUNCTION queue_match_refresh() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO match_refresh_queue (entity_type, entity_id)
+    VALUES (TG_ARGV[0], CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END)
+    ON CONFLICT (entity_type, entity_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS candidates_match_refresh ON candidates;
+CREATE TRIGGER candidates_match_refresh
+    AFTER INSERT OR UPDATE OF location, visa_status, sponsorship_needed, experience_years,
+        relocation_willing, housing_needed, skills, childcare_cert, score
+    ON candidates
+    FOR EACH ROW EXECUTE FUNCTION queue_match_refresh('candidate');
+
+-- The jobs table predates migrations; hook it up (and backfill) when present.
+DO $$
+BEGIN
+    IF to_regclass('jobs') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS jobs_match_refresh ON jobs;
+        CREATE TRIGGER jobs_match_refresh
+            AFTER INSERT OR UPDATE OR DELETE ON jobs
+            FOR EACH ROW EXECUTE FUNCTION queue_match_refresh('job');
+        INSERT INTO match_refresh_queue (entity_type, entity_id)
+        SELECT 'job', id FROM jobs
+        ON CONFLICT DO NOTHING;
+    END IF;
+END;
+$$;
@@ -0,0 +1,57 @@
+-- Duplicate-candidate detection: blocking keys, MinHash signatures and the
+-- merge candidates they produce.
+CREATE TABLE IF NOT EXISTS candidate_fingerprints (
+    candidate_id UUID PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+    phone_key TEXT,
+    email_key TEXT,
+    email_local_key TEXT,
+    name_signature BIGINT[] NOT NULL,
+    resume_signature BIGINT[],
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- One row per (blocking key, candidate): phone:, email:, name band and
+-- resume band keys. Candidates sharing any key are compared.
+CREATE TABLE IF NOT EXISTS candidate_blocking_keys (
+    key TEXT NOT NULL,
+    candidate_id UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    PRIMARY KEY (key, candidate_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_candidate_blocking_keys_candidate
+    ON candidate_blocking_keys (candidate_id);
+
+CREATE TABLE IF NOT EXISTS duplicate_candidates (
+    candidate_a UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    candidate_b UUID NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    reasons TEXT[] NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'merged', 'dismissed')),
+    detected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (candidate_a, candidate_b),
+    CHECK (candidate_a < candidate_b)
+);
+
+CREATE INDEX IF NOT EXISTS idx_duplicate_candidates_pending
+    ON duplicate_candidates (score DESC)
+    WHERE status = 'pending';
+
+CREATE TABLE IF NOT EXISTS dedup_queue (
+    candidate_id UUID PRIMARY KEY,
+    queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION queue_dedup_check() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO dedup_queue (candidate_id)
+    VALUES (NEW.id)
+    ON CONFLICT (candidate_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS candidates_dedup_check ON candidates;
+CREATE TRIGGER candidates_dedup_check
+    AFTER INSERT OR UPDATE OF email, phone, full_name, resume_text
+    ON candidates
+    FOR EACH ROW EXECUTE FUNCTION queue_dedup_check();
@@ -0,0 +1,54 @@
+-- Interval-indexed interview slots. ``slot`` is maintained by trigger from
+-- scheduled_date + duration_minutes. An exclusion constraint stops one
+-- interviewer from being double-booked while an interview is live.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+CREATE OR REPLACE FUNCTION set_interview_slot() RETURNS trigger AS $$
+BEGIN
+    NEW.slot := tstzrange(
+        NEW.scheduled_date::timestamptz,
+        NEW.scheduled_date::timestamptz + make_interval(mins => COALESCE(NEW.duration_minutes, 60)),
+        '[)'
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF to_regclass('interviews') IS NULL THEN
+        RAISE NOTICE 'interviews table not found; skipping interview slot setup';
+        RETURN;
+    END IF;
+
+    ALTER TABLE interviews ADD COLUMN IF NOT EXISTS slot tstzrange;
+
+    DROP TRIGGER IF EXISTS interviews_set_slot ON interviews;
+    CREATE TRIGGER interviews_set_slot
+        BEFORE INSERT OR UPDATE OF scheduled_date, duration_minutes ON interviews
+        FOR EACH ROW EXECUTE FUNCTION set_interview_slot();
+
+    UPDATE interviews SET slot = tstzrange(
+        scheduled_date::timestamptz,
+        scheduled_date::timestamptz + make_interval(mins => COALESCE(duration_minutes, 60)),
+        '[)'
+    ) WHERE slot IS NULL;
+
+    BEGIN
+        ALTER TABLE interviews ADD CONSTRAINT interviews_no_overlap
+            EXCLUDE USING gist (lower(interviewer_email) WITH =, slot WITH &&)
+            WHERE (status IN ('scheduled', 'rescheduled'));
+    EXCEPTION
+        WHEN duplicate_object OR duplicate_table THEN
+            NULL;
+        WHEN exclusion_violation THEN
+            -- Existing double bookings must be resolved by hand before the
+            -- constraint can be added; until then keep the same GiST index so
+            -- conflict checks and availability queries stay indexed.
+            RAISE WARNING 'interviews has overlapping bookings; interviews_no_overlap not added';
+            CREATE INDEX IF NOT EXISTS idx_interviews_interviewer_slot
+                ON interviews USING gist (lower(interviewer_email), slot)
+                WHERE status IN ('scheduled', 'rescheduled');
+    END;
+END;
+$$;
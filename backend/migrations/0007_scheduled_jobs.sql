@@ -0,0 +1,49 @@
+-- Work for the background scheduler. Due rows are claimed with
+-- FOR UPDATE SKIP LOCKED, so workers never process the same row twice.
+
+-- Outgoing webhooks (careers site sync). Failed deliveries are retried
+-- with backoff until they succeed or run out of attempts.
+CREATE TABLE IF NOT EXISTS webhook_deliveries (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    url TEXT NOT NULL,
+    event TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'delivered', 'failed')),
+    delivered_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_due
+    ON webhook_deliveries (next_attempt_at) WHERE status = 'pending';
+
+-- Pipeline analytics, refreshed periodically by the scheduler leader.
+CREATE MATERIALIZED VIEW IF NOT EXISTS candidate_pipeline_stats AS
+    SELECT date_trunc('week', created_at) AS week,
+           COALESCE(location, '') AS location,
+           COALESCE(visa_status, '') AS visa_status,
+           COALESCE(status, '') AS status,
+           COUNT(*) AS candidates,
+           AVG(score) AS avg_score
+    FROM candidates
+    GROUP BY 1, 2, 3, 4;
+
+-- A unique index lets the view refresh without blocking readers.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_candidate_pipeline_stats_key
+    ON candidate_pipeline_stats (week, location, visa_status, status);
+
+-- Interview reminders: sent once, some hours before the interview.
+DO $$
+BEGIN
+    IF to_regclass('interviews') IS NULL THEN
+        RAISE NOTICE 'interviews table not found; skipping reminder columns';
+        RETURN;
+    END IF;
+    ALTER TABLE interviews ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMPTZ;
+    CREATE INDEX IF NOT EXISTS idx_interviews_reminder_due
+        ON interviews (scheduled_date)
+        WHERE reminder_sent_at IS NULL AND status IN ('scheduled', 'rescheduled');
+END;
+$$;
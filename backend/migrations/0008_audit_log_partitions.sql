@@ -0,0 +1,75 @@
+-- Monthly range partitions for audit_logs. Future partitions are created
+-- ahead of time by the scheduler (audit_partitions.py), and expired ones
+-- are detached, archived to gzip files and dropped.
+--
+-- On a database that already has an unpartitioned audit_logs, the legacy
+-- rows are copied into the partitioned table in this migration's single
+-- transaction: audit writes are blocked until the copy commits and the
+-- copy needs roughly the table's size again in free disk. On a large
+-- table, budget that as downtime and run the migration in a maintenance
+-- window.
+
+-- Creates the partition holding ``month`` (UTC) if missing; returns its name.
+CREATE OR REPLACE FUNCTION create_audit_log_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    start_at DATE := date_trunc('month', month)::date;
+    partition_name TEXT := format('audit_logs_%s', to_char(start_at, 'YYYY_MM'));
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        start_at::timestamp AT TIME ZONE 'UTC',
+        (start_at + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    legacy BOOLEAN := to_regclass('audit_logs') IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_logs')
+    );
+    first_month DATE := date_trunc('month', NOW() AT TIME ZONE 'UTC')::date;
+    month DATE;
+BEGIN
+    IF legacy THEN
+        ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned;
+        SELECT COALESCE(date_trunc('month', MIN(timestamp) AT TIME ZONE 'UTC')::date, first_month)
+        INTO first_month FROM audit_logs_unpartitioned;
+    END IF;
+
+    CREATE TABLE IF NOT EXISTS audit_logs (
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        user_id UUID,
+        user_email TEXT,
+        action TEXT NOT NULL,
+        entity_type TEXT,
+        entity_id UUID,
+        details JSON,
+        ip_address TEXT,
+        timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+
+    -- Catches writes if the scheduler ever falls behind; normally empty.
+    CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+    -- Every month with existing rows, through three months ahead.
+    FOR month IN
+        SELECT generate_series(first_month,
+                               date_trunc('month', NOW() AT TIME ZONE 'UTC')::date + interval '3 months',
+                               interval '1 month')::date
+    LOOP
+        PERFORM create_audit_log_partition(month);
+    END LOOP;
+
+    IF legacy THEN
+        INSERT INTO audit_logs (id, user_id, user_email, action, entity_type, entity_id, details, ip_address, timestamp)
+        SELECT id, user_id, user_email, action, entity_type, entity_id, details::json, ip_address::text,
+               COALESCE(timestamp, NOW())
+        FROM audit_logs_unpartitioned;
+        DROP TABLE audit_logs_unpartitioned;
+    END IF;
+END;
+$$;
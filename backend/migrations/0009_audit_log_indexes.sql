@@ -0,0 +1,14 @@
+-- Audit log lookups by entity and by user, paginated on (timestamp, id).
+-- Indexes on the partitioned parent are created on every partition,
+-- including ones added later.
+ALTER TABLE audit_logs ALTER COLUMN details TYPE JSONB USING details::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_entity
+    ON audit_logs (entity_type, entity_id, timestamp, id);
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user
+    ON audit_logs (user_id, timestamp, id);
+
+-- Containment filters, e.g. details @> '{"field": "status"}'.
+CREATE INDEX IF NOT EXISTS idx_audit_logs_details
+    ON audit_logs USING gin (details jsonb_path_ops);
@@ -0,0 +1,42 @@
+-- Saved searches belong to the user (token subject) who saved them, and
+-- "new since last viewed" uses a monotonic match id watermark instead of
+-- comparing matched_at to last_viewed_at: a match inserted by a refresh
+-- transaction that started before the view but committed after it has an
+-- older matched_at and would otherwise never be reported.
+ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS owner TEXT;
+ALTER TABLE saved_searches DROP CONSTRAINT IF EXISTS saved_searches_filter_hash_key;
+-- Searches saved before ownership existed have no owner and are not listed
+-- for anyone until assigned one.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_saved_searches_owner_filter_hash
+    ON saved_searches (owner, filter_hash);
+
+CREATE SEQUENCE IF NOT EXISTS saved_search_matches_match_id_seq AS BIGINT;
+ALTER TABLE saved_search_matches ADD COLUMN IF NOT EXISTS match_id BIGINT;
+ALTER SEQUENCE saved_search_matches_match_id_seq OWNED BY saved_search_matches.match_id;
+
+-- Number existing matches in matched_at order so the watermark below
+-- splits seen from unseen exactly as the old timestamp comparison did.
+UPDATE saved_search_matches m
+SET match_id = numbered.match_id
+FROM (
+    SELECT saved_search_id, candidate_id,
+           nextval('saved_search_matches_match_id_seq') AS match_id
+    FROM (SELECT saved_search_id, candidate_id FROM saved_search_matches
+          WHERE match_id IS NULL ORDER BY matched_at, saved_search_id, candidate_id) ordered
+) numbered
+WHERE m.saved_search_id = numbered.saved_search_id AND m.candidate_id = numbered.candidate_id;
+
+ALTER TABLE saved_search_matches
+    ALTER COLUMN match_id SET DEFAULT nextval('saved_search_matches_match_id_seq'),
+    ALTER COLUMN match_id SET NOT NULL;
+
+ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS last_seen_match_id BIGINT NOT NULL DEFAULT 0;
+UPDATE saved_searches s
+SET last_seen_match_id = COALESCE((
+    SELECT MAX(m.match_id) FROM saved_search_matches m
+    WHERE m.saved_search_id = s.id AND m.matched_at <= s.last_viewed_at
+), 0);
+
+DROP INDEX IF EXISTS idx_saved_search_matches_matched_at;
+CREATE INDEX IF NOT EXISTS idx_saved_search_matches_match_id
+    ON saved_search_matches (saved_search_id, match_id);
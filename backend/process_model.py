@@ -0,0 +1,67 @@
+"""Sizing for the production process model (see gunicorn.conf.py).
+
+* Workers: one async worker per CPU the container may actually use.
+  That is the cgroup CPU quota when one is set, not the host's core
+  count. There are at least two workers, so recycling one never leaves
+  the instance without a worker.
+* Connections: ``DB_CONNECTION_BUDGET`` is the number of Postgres
+  connections this instance may hold. It is split evenly across workers.
+  Each worker first reserves ``DEDICATED_CONNECTIONS_PER_WORKER`` for
+  the scheduler's leader-lock session and the cache bus LISTEN
+  connection. The rest becomes that worker's pool.
+"""
+import math
+import os
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+DEDICATED_CONNECTIONS_PER_WORKER = 2  # scheduler lock session + cache bus listener
+MIN_WORKERS = 2
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+class PoolSizes(NamedTuple):
+    min_size: int
+    max_size: int
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPUs allowed by the cgroup quota (v2 ``cpu.max`` or v1 CFS), or None if unlimited."""
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+def worker_count(cpus: int, override: Optional[str] = None, max_workers: int = 16) -> int:
+    if override:
+        return max(1, int(override))
+    return min(max(MIN_WORKERS, cpus), max_workers)
+
+
+def pool_sizes(budget: int, workers: int, dedicated: int = DEDICATED_CONNECTIONS_PER_WORKER) -> PoolSizes:
+    per_worker = budget // workers - dedicated
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={budget} cannot serve {workers} workers "
+            f"({dedicated} dedicated + at least 1 pooled connection each)"
+        )
+    return PoolSizes(min_size=max(1, per_worker // 2), max_size=per_worker)
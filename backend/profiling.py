@@ -0,0 +1,221 @@
+"""Opt-in sampling profiler and timing spans.
+
+``SamplingProfiler`` runs a daemon thread that, every ``PROFILE_INTERVAL``
+seconds, reads the event loop thread's current stack via
+``sys._current_frames()`` and counts it in folded form, i.e.
+``outer (file:line);inner (file:line)``. That is the input format of
+flamegraph.pl and speedscope. Nothing is traced and no hooks are
+installed, so the cost is one stack walk per sample, and the thread
+only exists while a profile is running.
+
+There are two ways to profile:
+
+* Global: started and stopped from ``/api/system/profiler`` or by sending
+  ``SIGUSR2``. A stop from the signal writes the profile to
+  ``PROFILE_DIR``.
+* Per request: when ``PROFILE_REQUESTS_ENABLED`` is set, a request with an
+  ``X-Profile`` header (equal to ``PROFILE_TOKEN`` if one is configured)
+  gets a profile of its own. A sample counts for the request only if its
+  task was the one running on the loop when the sample was taken. The
+  response carries ``X-Profile-Id``, and the folded stacks can be
+  fetched from ``/api/system/profiler/requests/{id}``.
+
+``span(name)`` times a block into ``ats_span_duration_seconds``, so hot
+paths show up in metrics even with no profile running.
+"""
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from metrics import REGISTRY, Histogram
+
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))  # seconds
+PROFILE_REQUESTS_ENABLED = os.environ.get("PROFILE_REQUESTS_ENABLED", "false").lower() == "true"
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "/tmp"))
+MAX_STORED_REQUEST_PROFILES = 20
+MAX_STACK_DEPTH = 128
+
+SPAN_DURATION = REGISTRY.register(Histogram(
+    "ats_span_duration_seconds", "Time spent in instrumented hot paths.", ("span",),
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)))
+
+
+@contextmanager
+def span(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_DURATION.observe(time.perf_counter() - started, name)
+
+
+_frame_labels: Dict[object, str] = {}
+
+
+def _label(code) -> str:
+    label = _frame_labels.get(code)
+    if label is None:
+        label = _frame_labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+def fold(frame) -> str:
+    """Root-first, semicolon-separated stack of ``frame``."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def render_folded(samples: Counter) -> str:
+    # dict() copies in one step under the GIL while the sampler keeps counting.
+    snapshot = dict(samples)
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(snapshot.items(), key=lambda item: -item[1]))
+
+
+class RequestProfile:
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.samples: Counter = Counter()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def folded(self) -> str:
+        header = f"# {self.method} {self.path} {self.duration or 0:.4f}s {sum(self.samples.values())} samples\n"
+        return header + render_folded(self.samples)
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.global_enabled = False
+        self.started_at: Optional[float] = None
+        self.recent: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._requests: Dict[asyncio.Task, RequestProfile] = {}
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None):
+        """Start the global profile; must be called from the event loop thread."""
+        if interval:
+            self.interval = interval
+        self.samples = Counter()
+        self.started_at = time.time()
+        self.global_enabled = True
+        self._ensure_thread()
+
+    def stop(self) -> str:
+        self.global_enabled = False
+        return render_folded(self.samples)
+
+    def begin_request(self, method: str, path: str) -> RequestProfile:
+        profile = RequestProfile(f"{os.getpid()}-{next(self._ids)}", method, path)
+        self._requests[asyncio.current_task()] = profile
+        self._ensure_thread()
+        return profile
+
+    def end_request(self, profile: RequestProfile):
+        self._requests.pop(asyncio.current_task(), None)
+        profile.duration = time.perf_counter() - profile.started
+        self.recent[profile.id] = profile
+        while len(self.recent) > MAX_STORED_REQUEST_PROFILES:
+            self.recent.popitem(last=False)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "running": self.global_enabled,
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "samples": sum(self.samples.values()),
+            "active_request_profiles": len(self._requests),
+            "stored_request_profiles": list(self.recent),
+        }
+
+    def write(self, directory: Path = PROFILE_DIR) -> Path:
+        path = directory / f"profile-{os.getpid()}-{int(time.time())}.folded"
+        path.write_text(render_folded(self.samples))
+        return path
+
+    def _ensure_thread(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if not self.running:
+            self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        current_tasks = asyncio.tasks._current_tasks
+        while self.global_enabled or self._requests:
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                stack = fold(frame)
+                if self.global_enabled:
+                    self.samples[stack] += 1
+                if self._requests:
+                    profile = self._requests.get(current_tasks.get(self._loop))
+                    if profile is not None:
+                        profile.samples[stack] += 1
+            del frame
+            self._wake.wait(self.interval)
+
+
+profiler = SamplingProfiler()
+
+
+def toggle_from_signal():
+    if profiler.global_enabled:
+        profiler.stop()
+        return profiler.write()
+    profiler.start()
+    return None
+
+
+class ProfileRequestMiddleware:
+    """Profiles single requests that ask for it with an ``X-Profile`` header."""
+
+    def __init__(self, app, enabled: bool = PROFILE_REQUESTS_ENABLED, token: str = PROFILE_TOKEN):
+        self.app = app
+        self.enabled = enabled
+        self.token = token.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = profiler.begin_request(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.end_request(profile)
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return not self.token or value == self.token
+        return False
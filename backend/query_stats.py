@@ -0,0 +1,171 @@
+"""Per-statement query statistics, slow-query log and N+1 detection.
+
+Every query run through ``db.InstrumentedConnection`` (the pool's
+connection class) calls ``record_query``. Statements are grouped by
+*fingerprint*: the SQL with literals replaced by ``?`` and whitespace
+collapsed. That way ``WHERE id = $1`` and ``WHERE id = 'abc'`` count as
+the same statement.
+
+* ``QUERY_STATS`` aggregates calls, time and rows per fingerprint for
+  ``/api/system/query-stats``.
+* Statements slower than ``SLOW_QUERY_MS`` are logged with their
+  fingerprint and row count.
+* ``QueryStatsMiddleware`` counts queries per request. A fingerprint that
+  runs ``N_PLUS_ONE_THRESHOLD`` or more times in one request is logged as
+  a likely N+1. When ``SQL_DEBUG_HEADERS`` is on, the counts are also
+  sent back as ``X-DB-*`` response headers.
+"""
+import contextvars
+import hashlib
+import logging
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "10"))
+SQL_DEBUG_HEADERS = os.environ.get("SQL_DEBUG_HEADERS", "false").lower() == "true"
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"\$\d+")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    normalized = _COMMENTS.sub(" ", query)
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PARAMS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _LISTS.sub("(...)", normalized)
+    return _SPACE.sub(" ", normalized).strip()
+
+
+def fingerprint_id(fingerprint_text: str) -> str:
+    return hashlib.sha1(fingerprint_text.encode()).hexdigest()[:12]
+
+
+def rows_from_status(status: str) -> int:
+    """Row count from a command tag such as ``UPDATE 5`` or ``INSERT 0 3``."""
+    last = status.rsplit(" ", 1)[-1] if status else ""
+    return int(last) if last.isdigit() else 0
+
+
+class StatementStats:
+    __slots__ = ("fingerprint", "calls", "total_seconds", "max_seconds", "rows")
+
+    def __init__(self, fingerprint_text: str):
+        self.fingerprint = fingerprint_text
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": fingerprint_id(self.fingerprint),
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "rows": self.rows,
+        }
+
+
+class QueryStats:
+    def __init__(self, max_statements: int = 1000):
+        self.max_statements = max_statements
+        self.statements: Dict[str, StatementStats] = {}
+
+    def record(self, fingerprint_text: str, seconds: float, rows: int):
+        stats = self.statements.get(fingerprint_text)
+        if stats is None:
+            if len(self.statements) >= self.max_statements:
+                return  # unbounded dynamic SQL; keep the ones we have
+            stats = self.statements[fingerprint_text] = StatementStats(fingerprint_text)
+        stats.calls += 1
+        stats.total_seconds += seconds
+        stats.rows += rows
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+
+    def top(self, limit: int = 50, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        rows = [stats.as_dict() for stats in self.statements.values()]
+        return sorted(rows, key=lambda row: row[order_by], reverse=True)[:limit]
+
+    def reset(self):
+        self.statements.clear()
+
+
+class RequestQueries:
+    __slots__ = ("count", "seconds", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[tuple]:
+        return [(text, n) for text, n in self.fingerprints.most_common() if n >= threshold]
+
+
+QUERY_STATS = QueryStats()
+_request_queries: contextvars.ContextVar[Optional[RequestQueries]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+
+def record_query(query: str, seconds: float, rows: int):
+    fingerprint_text = fingerprint(query)
+    QUERY_STATS.record(fingerprint_text, seconds, rows)
+    current = _request_queries.get()
+    if current is not None:
+        current.count += 1
+        current.seconds += seconds
+        current.fingerprints[fingerprint_text] += 1
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        logging.warning(f"Slow query ({seconds * 1000:.0f} ms, {rows} rows): {fingerprint_text}")
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware tracking the queries each request runs."""
+
+    def __init__(self, app, debug_headers: bool = SQL_DEBUG_HEADERS, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.debug_headers = debug_headers
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries()
+        token = _request_queries.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(queries.count).encode()))
+                headers.append((b"x-db-query-time-ms", f"{queries.seconds * 1000:.1f}".encode()))
+                repeated = queries.repeated(self.threshold)
+                if repeated:
+                    ids = ",".join(f"{fingerprint_id(text)}x{n}" for text, n in repeated)
+                    headers.append((b"x-db-n-plus-one", ids.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            for text, n in queries.repeated(self.threshold):
+                logging.warning(
+                    f"Possible N+1: {n} runs in {scope['method']} {scope['path']} "
+                    f"[{fingerprint_id(text)}]: {text}"
+                )
@@ -0,0 +1,181 @@
+"""Read/write routing between the primary and a streaming replica.
+
+Reporting and analytics reads can run on a replica (``REPLICA_DATABASE_URL``),
+keeping heavy aggregates off the primary that serves candidate writes.
+Everything else stays on the primary. A function or route opts in with
+``@db_router.replica_reads()`` and takes its connection from
+``db_router.acquire()``:
+
+    @db_router.replica_reads(max_lag=30)
+    async def generate_compliance_report(...):
+        async with db_router.acquire() as connection:
+            ...
+
+Outside an annotated call, ``acquire()`` returns a primary connection. So
+a helper shared with a write path is safe. A streaming response that
+queries after the handler returns picks its pool up front with
+``read_pool(max_lag)``.
+
+The replica is used only while it is known to be fresh enough. A monitor
+task measures replay lag every ``REPLICA_LAG_CHECK_INTERVAL`` seconds.
+The lag counts as zero when everything received has been replayed, and
+otherwise as the age of the last replayed transaction. A standby whose
+WAL receiver is not streaming has nothing new to replay and would look
+fresh however far behind it falls, so its lag is unknown. The receiver
+status is only visible to roles with ``pg_read_all_stats`` (e.g. via
+``pg_monitor``); without it a running receiver process counts as
+streaming. Reads fall back to the primary when:
+
+* no replica is configured;
+* the lag is unknown (before the first check, or after a check failed);
+* the lag is above the caller's ``max_lag``;
+* a replica connection can't be acquired, which also marks the replica
+  as unhealthy until the next check passes.
+
+The decisions are counted in ``ats_db_read_routing_total`` by target and
+reason. The lag is exported as ``ats_db_replica_lag_seconds``.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+import asyncpg
+
+from metrics import REGISTRY, Counter, Gauge
+
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", "30"))  # seconds
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("REPLICA_LAG_CHECK_INTERVAL", "2"))  # seconds
+REPLICA_ACQUIRE_TIMEOUT = float(os.environ.get("REPLICA_ACQUIRE_TIMEOUT", "2"))  # seconds
+
+REPLICA_LAG_QUERY = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp())
+    END::float8
+'''
+
+READ_ROUTING = REGISTRY.register(Counter(
+    "ats_db_read_routing_total", "Reporting reads by the pool that served them and why.", ("target", "reason")))
+REPLICA_LAG = REGISTRY.register(Gauge(
+    "ats_db_replica_lag_seconds", "Replay lag of the read replica at the last check.", ()))
+
+_replica_max_lag: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("replica_max_lag", default=None)
+
+
+class ReadRouter:
+    def __init__(self, max_lag: float = REPLICA_MAX_LAG, check_interval: float = REPLICA_LAG_CHECK_INTERVAL):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary: Optional[asyncpg.Pool] = None
+        self.replica: Optional[asyncpg.Pool] = None
+        self.lag: Optional[float] = None  # None: unknown, don't use the replica
+        self.last_check: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._monitor: Optional[asyncio.Task] = None
+
+    def start(self, primary: asyncpg.Pool, replica: Optional[asyncpg.Pool] = None):
+        self.primary = primary
+        self.replica = replica
+        if replica is not None:
+            self._monitor = asyncio.create_task(self._monitor_lag())
+
+    async def stop(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    def replica_reads(self, max_lag: Optional[float] = None):
+        """Let ``acquire()`` calls made inside the decorated coroutine use the replica."""
+        def decorate(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                token = _replica_max_lag.set(self.max_lag if max_lag is None else max_lag)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _replica_max_lag.reset(token)
+            return wrapper
+        return decorate
+
+    def read_pool(self, max_lag: Optional[float] = None) -> asyncpg.Pool:
+        """The replica if it is within ``max_lag`` seconds of the primary, else the primary."""
+        limit = self.max_lag if max_lag is None else max_lag
+        if self.replica is None:
+            reason = "no_replica"
+        elif self.lag is None:
+            reason = "replica_unhealthy"
+        elif self.lag > limit:
+            reason = "replica_lagging"
+        else:
+            READ_ROUTING.inc("replica", "fresh")
+            return self.replica
+        READ_ROUTING.inc("primary", reason)
+        return self.primary
+
+    @asynccontextmanager
+    async def acquire(self):
+        max_lag = _replica_max_lag.get()
+        target = self.primary if max_lag is None else self.read_pool(max_lag)
+        if target is self.replica:
+            try:
+                connection = await self.replica.acquire(timeout=REPLICA_ACQUIRE_TIMEOUT)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                self._mark_unhealthy(e)
+                READ_ROUTING.inc("primary", "replica_unavailable")
+            else:
+                try:
+                    yield connection
+                finally:
+                    await self.replica.release(connection)
+                return
+        async with self.primary.acquire() as connection:
+            yield connection
+
+    async def check_lag(self) -> Optional[float]:
+        try:
+            async with self.replica.acquire(timeout=REPLICA_ACQUIRE_TIMEOUT) as connection:
+                lag = await connection.fetchval(REPLICA_LAG_QUERY)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            self._mark_unhealthy(e)
+            return None
+        self.last_check = time.time()
+        self.last_error = None
+        # NULL: in recovery but not streaming, or nothing replayed yet
+        self.lag = None if lag is None else max(0.0, lag)
+        REPLICA_LAG.set(value=-1.0 if self.lag is None else self.lag)
+        return self.lag
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "replica_configured": self.replica is not None,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+        }
+
+    def _mark_unhealthy(self, error: Exception):
+        if self.lag is not None:
+            logging.error(f"Read replica unavailable, reporting reads fall back to the primary: {error}")
+        self.lag = None
+        self.last_check = time.time()
+        self.last_error = str(error)[:500]
+        REPLICA_LAG.set(value=-1.0)
+
+    async def _monitor_lag(self):
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
@@ -0,0 +1,179 @@
+"""Saved advanced searches with materialized, incrementally refreshed results.
+
+A saved search is stored once per normalized filter set (``filter_hash``)
+and its matching candidate ids are materialized in
+``saved_search_matches``. A trigger on ``candidates`` queues every
+inserted or re-scored candidate. ``drain_refresh_queue`` re-checks only
+those ids against each saved search (a primary-key lookup per search)
+instead of re-running the searches.
+
+Searches are scoped to their owner (the token subject). The "new since
+last viewed" delta is driven by ``match_id``, a sequence value assigned
+when a candidate first matches, compared against the search's
+``last_seen_match_id`` watermark. Refreshes hold a share lock on every
+saved search until they commit and viewing takes an update lock, so a
+view never advances the watermark past a match id it cannot see yet.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from candidate_search import build_search_clauses
+
+SAVED_SEARCH_REFRESH_INTERVAL = float(os.environ.get("SAVED_SEARCH_REFRESH_INTERVAL", "5"))  # seconds
+SAVED_SEARCH_REFRESH_BATCH = int(os.environ.get("SAVED_SEARCH_REFRESH_BATCH", "500"))
+
+
+def normalize_filters(filters: BaseModel) -> Dict[str, Any]:
+    """Drop unset values and sort lists so equivalent filters compare equal."""
+    normalized = {}
+    for field, value in filters.model_dump(mode="json", exclude_none=True).items():
+        if isinstance(value, list):
+            value = sorted(set(value))
+            if not value:
+                continue
+        elif isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        normalized[field] = value
+    return normalized
+
+
+def filter_hash(normalized: Dict[str, Any]) -> str:
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SavedSearches:
+    def __init__(self, filter_model: Type[BaseModel]):
+        self.filter_model = filter_model
+
+    async def save(self, connection, owner: str, name: str, filters: BaseModel) -> Dict[str, Any]:
+        """Create (or return the owner's existing) saved search and materialize its matches."""
+        normalized = normalize_filters(filters)
+        async with connection.transaction():
+            row = await connection.fetchrow('''
+                INSERT INTO saved_searches (owner, filter_hash, name, filters)
+                VALUES ($1, $2, $3, $4::jsonb)
+                ON CONFLICT (owner, filter_hash) DO NOTHING
+                RETURNING *
+            ''', owner, filter_hash(normalized), name, json.dumps(normalized))
+            if row is None:
+                return dict(await connection.fetchrow(
+                    "SELECT * FROM saved_searches WHERE owner = $1 AND filter_hash = $2",
+                    owner, filter_hash(normalized),
+                ))
+            where, values, _ = build_search_clauses(self.filter_model(**normalized))
+            await connection.execute(f'''
+                INSERT INTO saved_search_matches (saved_search_id, candidate_id)
+                SELECT ${len(values) + 1}::uuid, id FROM candidates WHERE {where}
+            ''', *values, row['id'])
+        return dict(row)
+
+    async def list(self, connection, owner: str) -> List[Dict[str, Any]]:
+        rows = await connection.fetch('''
+            SELECT s.*,
+                   (SELECT COUNT(*) FROM saved_search_matches m WHERE m.saved_search_id = s.id) AS match_count,
+                   (SELECT COUNT(*) FROM saved_search_matches m
+                     WHERE m.saved_search_id = s.id AND m.match_id > s.last_seen_match_id) AS new_match_count
+            FROM saved_searches s
+            WHERE s.owner = $1
+            ORDER BY s.name
+        ''', owner)
+        return [dict(row) for row in rows]
+
+    async def results(self, connection, owner: str, saved_search_id: uuid.UUID) -> Optional[List[Dict[str, Any]]]:
+        """Return the search's matching candidates, or ``None`` if the owner has no such search."""
+        rows = await connection.fetch('''
+            SELECT c.* FROM saved_searches s
+            LEFT JOIN saved_search_matches m ON m.saved_search_id = s.id
+            LEFT JOIN candidates c ON c.id = m.candidate_id
+            WHERE s.id = $1 AND s.owner = $2
+            ORDER BY c.score DESC NULLS LAST
+        ''', saved_search_id, owner)
+        if not rows:
+            return None
+        # A search with no matches still yields its one all-NULL outer-join row.
+        return [dict(row) for row in rows if row['id'] is not None]
+
+    async def new_matches(self, connection, owner: str, saved_search_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """Return matches added since the search was last viewed and mark it viewed."""
+        async with connection.transaction():
+            # FOR UPDATE waits for in-flight refreshes (which hold FOR SHARE) to
+            # commit, so every match id below the new watermark is visible here.
+            viewed = await connection.fetchrow('''
+                SELECT last_viewed_at, last_seen_match_id FROM saved_searches
+                WHERE id = $1 AND owner = $2
+                FOR UPDATE
+            ''', saved_search_id, owner)
+            if viewed is None:
+                return None
+            rows = await connection.fetch('''
+                SELECT c.*, m.matched_at, m.match_id FROM saved_search_matches m
+                JOIN candidates c ON c.id = m.candidate_id
+                WHERE m.saved_search_id = $1 AND m.match_id > $2
+                ORDER BY m.match_id
+            ''', saved_search_id, viewed['last_seen_match_id'])
+            watermark = rows[-1]['match_id'] if rows else viewed['last_seen_match_id']
+            await connection.execute('''
+                UPDATE saved_searches SET last_viewed_at = NOW(), last_seen_match_id = $2 WHERE id = $1
+            ''', saved_search_id, watermark)
+        return {"since": viewed['last_viewed_at'], "candidates": [dict(row) for row in rows]}
+
+    async def drain_refresh_queue(self, connection) -> int:
+        """Re-check one batch of queued candidates against every saved search."""
+        async with connection.transaction():
+            # SKIP LOCKED lets every worker drain concurrently without overlap.
+            candidate_ids = [row['candidate_id'] for row in await connection.fetch('''
+                DELETE FROM saved_search_refresh_queue
+                WHERE candidate_id IN (
+                    SELECT candidate_id FROM saved_search_refresh_queue
+                    ORDER BY queued_at
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING candidate_id
+            ''', SAVED_SEARCH_REFRESH_BATCH)]
+            if not candidate_ids:
+                return 0
+            # FOR SHARE holds off new_matches until these inserts commit, so a
+            # view can't move a watermark past match ids it cannot see yet.
+            for saved in await connection.fetch("SELECT id, filters FROM saved_searches ORDER BY id FOR SHARE"):
+                where, values, _ = build_search_clauses(self.filter_model(**json.loads(saved['filters'])))
+                ids_param, search_param = f"${len(values) + 1}::uuid[]", f"${len(values) + 2}::uuid"
+                await connection.execute(f'''
+                    WITH still_matching AS (
+                        SELECT id FROM candidates WHERE id = ANY({ids_param}) AND {where}
+                    ), added AS (
+                        INSERT INTO saved_search_matches (saved_search_id, candidate_id)
+                        SELECT {search_param}, id FROM still_matching
+                        ON CONFLICT DO NOTHING
+                    )
+                    DELETE FROM saved_search_matches
+                    WHERE saved_search_id = {search_param}
+                      AND candidate_id = ANY({ids_param})
+                      AND candidate_id NOT IN (SELECT id FROM still_matching)
+                ''', *values, candidate_ids, saved['id'])
+        # After commit: concurrent drains share the row locks above and would
+        # deadlock upgrading them inside the transaction.
+        await connection.execute("UPDATE saved_searches SET refreshed_at = NOW()")
+        return len(candidate_ids)
+
+    async def run_refresh_loop(self, get_pool):
+        while True:
+            try:
+                async with get_pool().acquire() as connection:
+                    while await self.drain_refresh_queue(connection) == SAVED_SEARCH_REFRESH_BATCH:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Saved search refresh failed: {e}")
+            await asyncio.sleep(SAVED_SEARCH_REFRESH_INTERVAL)
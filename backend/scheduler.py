@@ -0,0 +1,146 @@
+"""Asyncio scheduler for periodic background work, safe with many workers.
+
+Every uvicorn worker runs a ``Scheduler``, and one of them is the leader.
+The leader is whichever worker holds the ``SCHEDULER_LOCK_ID`` advisory
+lock. The lock is session level and held on a dedicated connection, so
+it is released as soon as the leader's process or connection dies, and
+the next election round on another worker takes over.
+
+Jobs come in two kinds:
+
+* ``leader_only`` jobs (e.g. refreshing a materialized view) must run
+  once per interval cluster-wide, so only the leader runs them.
+* claim jobs (reminders, webhook retries) claim due rows with
+  ``FOR UPDATE SKIP LOCKED``. Every worker can run them without
+  duplicates, which spreads large backlogs across the cluster.
+
+This replaces the unused ``schedule`` package, which blocks a thread and
+knows nothing about other workers.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import asyncpg
+
+SCHEDULER_LOCK_ID = 727_002  # arbitrary; MIGRATION_LOCK_ID is 727_001
+SCHEDULER_TICK = float(os.environ.get("SCHEDULER_TICK", "1"))  # seconds
+LEADER_ELECTION_INTERVAL = float(os.environ.get("LEADER_ELECTION_INTERVAL", "10"))  # seconds
+
+JobFunc = Callable[[asyncpg.Pool], Awaitable[Any]]
+
+
+class Job:
+    def __init__(self, name: str, interval: float, func: JobFunc, leader_only: bool):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.leader_only = leader_only
+        self.next_run = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.last_duration: Optional[float] = None
+
+    def due(self, now: float, is_leader: bool) -> bool:
+        if self.leader_only and not is_leader:
+            return False
+        return now >= self.next_run and (self.task is None or self.task.done())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "leader_only": self.leader_only,
+            "running": self.task is not None and not self.task.done(),
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_duration": self.last_duration,
+        }
+
+
+class Scheduler:
+    def __init__(self, dsn: str, lock_id: int = SCHEDULER_LOCK_ID):
+        self.dsn = dsn
+        self.lock_id = lock_id
+        self.jobs: List[Job] = []
+        self.is_leader = False
+        self._lock_connection: Optional[asyncpg.Connection] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def every(self, seconds: float, name: Optional[str] = None, leader_only: bool = False):
+        """Register ``func(pool)`` to run every ``seconds``; usable as a decorator."""
+        def register(func: JobFunc) -> JobFunc:
+            self.jobs.append(Job(name or func.__name__, seconds, func, leader_only))
+            return func
+        return register
+
+    def start(self, get_pool: Callable[[], asyncpg.Pool]):
+        self._tasks = [
+            asyncio.create_task(self._election_loop()),
+            asyncio.create_task(self._run_loop(get_pool)),
+        ]
+
+    async def stop(self):
+        for task in self._tasks + [job.task for job in self.jobs if job.task is not None]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._resign()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"is_leader": self.is_leader, "jobs": [job.snapshot() for job in self.jobs]}
+
+    async def _run_loop(self, get_pool):
+        while True:
+            now = time.monotonic()
+            for job in self.jobs:
+                if job.due(now, self.is_leader):
+                    job.next_run = now + job.interval
+                    job.task = asyncio.create_task(self._run_job(job, get_pool()))
+            await asyncio.sleep(SCHEDULER_TICK)
+
+    async def _run_job(self, job: Job, pool: asyncpg.Pool):
+        started = time.monotonic()
+        try:
+            await job.func(pool)
+            job.runs += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            logging.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            job.last_duration = round(time.monotonic() - started, 3)
+
+    async def _election_loop(self):
+        while True:
+            try:
+                await self._elect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scheduler leader election failed: {e}")
+                await self._resign()
+            await asyncio.sleep(LEADER_ELECTION_INTERVAL)
+
+    async def _elect(self):
+        if self._lock_connection is None or self._lock_connection.is_closed():
+            self.is_leader = False
+            self._lock_connection = await asyncpg.connect(self.dsn)
+        if self.is_leader:
+            # Still holding the lock as long as the session is alive.
+            await self._lock_connection.fetchval("SELECT 1", timeout=5)
+            return
+        self.is_leader = await self._lock_connection.fetchval("SELECT pg_try_advisory_lock($1)", self.lock_id)
+        if self.is_leader:
+            logging.info("This worker is now the scheduler leader")
+
+    async def _resign(self):
+        self.is_leader = False
+        connection, self._lock_connection = self._lock_connection, None
+        if connection is not None and not connection.is_closed():
+            # Closing the session releases the advisory lock.
+            await connection.close()
@@ -1,44 +1,87 @@
+import time
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, APIRouter, HTTPException, Query, UploadFile, File, Depends, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 import os
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
-import sendgrid
-from sendgrid.helpers.mail import Mail
 import json
-import PyPDF2
 import io
 import base64
 import re
-from jinja2 import Template
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError
 import bcrypt
-import httpx
 import asyncio
 import hashlib
 import hmac
+import signal
 import asyncpg
 
+# Heavy libraries load on first use rather than at worker boot
+from lazy_imports import lazy_import
+sendgrid = lazy_import("sendgrid")
+PyPDF2 = lazy_import("PyPDF2")
+jinja2 = lazy_import("jinja2")
+jwt = lazy_import("jose.jwt")
+httpx = lazy_import("httpx")
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Security setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-security = HTTPBearer()
-SECRET_KEY = os.environ.get("SECRET_KEY", "default-secret-key")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Local modules read their settings from the environment, so import after .env
+from audit_partitions import AUDIT_MAINTENANCE_INTERVAL, maintain_audit_partitions
+from audit_query import InvalidCursorError, build_audit_query, paginate
+from auth import (
+    pwd_context, security, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    hash_password, verify_password, create_access_token, decode_access_token, get_token_claims,
+)
+from background_jobs import (
+    ANALYTICS_REFRESH_INTERVAL, REMINDER_INTERVAL, WEBHOOK_RETRY_INTERVAL,
+    refresh_pipeline_stats, retry_webhooks, send_interview_reminders,
+)
+from cache_bus import InvalidationBus
+from candidate_search import FACET_COLUMNS, PreparedStatementCache, build_faceted_search_query, build_search_query
+from concurrency import LOAD_SHEDDING_ENABLED, ConcurrencyLimitMiddleware, build_limiters, drain_limiters
+from cpu_pool import shutdown_cpu_pool
+from db import create_pool, warm_up
+from dedup import CandidateDeduplicator
+from exports import (
+    EXPORTS, XLSX_MEDIA_TYPE, accepts_gzip, csv_chunks, export_filename, fetch_batches, gzip_chunks, xlsx_chunks,
+)
+from fast_json import FastJSONResponse
+from interview_scheduling import OVERLAP_CONSTRAINT, AvailabilityRangeError, find_conflicts, free_slots
+from jobs_feed_cache import JOBS_FEED_NAMESPACE, JobsFeedCache, JobsFeedCacheMiddleware
+from matching import MatchEngine
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, REGISTRY as METRICS_REGISTRY,
+    WORKER_BOOT, MetricsMiddleware, monitor_event_loop_lag, observe_outbound,
+)
+from migrate import apply_migrations
+from profiling import ProfileRequestMiddleware, profiler, span, toggle_from_signal
+from query_stats import QUERY_STATS, QueryStatsMiddleware
+from read_routing import ReadRouter
+from saved_searches import SavedSearches
+from scheduler import Scheduler
+
+# SendGrid setup; the client is built on the first email sent
+SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
+sg = None
 
-# SendGrid setup
-sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
+def sendgrid_client():
+    global sg
+    if sg is None:
+        sg = sendgrid.SendGridAPIClient(api_key=SENDGRID_API_KEY)
+    return sg
 
 # Careers site webhook configuration
 CAREERS_SITE_URL = os.environ.get('CAREERS_SITE_URL', 'https://childcare-career-hub.lovable.app')
@@ -48,8 +91,74 @@ CAREERS_WEBHOOK_TIMEOUT = 30  # seconds
 # Get ATS Domain from environment variables
 ATS_DOMAIN = os.environ.get("ATS_DOMAIN", "localhost")
 
+# PostgreSQL configuration
+DATABASE_URL = os.environ.get("DATABASE_URL") or (
+    f"postgresql://{os.environ.get('DB_USERNAME', 'postgres')}:{os.environ.get('DB_PASSWORD', '')}"
+    f"@{os.environ.get('DB_HOST', 'localhost')}:{os.environ.get('DB_PORT', '5432')}"
+    f"/{os.environ.get('DB_DATABASE', 'postgres')}?sslmode={os.environ.get('DB_SSLMODE', 'prefer')}"
+)
+pool: Optional[asyncpg.Pool] = None
+POOL_MIN_SIZE = int(os.environ.get("POOL_MIN_SIZE", "10"))
+POOL_MAX_SIZE = int(os.environ.get("POOL_MAX_SIZE", "10"))
+
+# Optional streaming replica for reporting reads; see read_routing.py
+REPLICA_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL")
+REPLICA_POOL_MIN_SIZE = int(os.environ.get("REPLICA_POOL_MIN_SIZE", str(POOL_MIN_SIZE)))
+REPLICA_POOL_MAX_SIZE = int(os.environ.get("REPLICA_POOL_MAX_SIZE", str(POOL_MAX_SIZE)))
+replica_pool: Optional[asyncpg.Pool] = None
+db_router = ReadRouter()
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+
+# Cross-worker cache invalidation (one LISTEN connection per worker)
+invalidation_bus = InvalidationBus(DATABASE_URL)
+
+# orjson responses for every route; large row sets should still return
+# FastJSONResponse(rows) directly to skip jsonable_encoder altogether
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+# Startup and shutdown; the pool, background loops and listeners live as long as the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_db()
+    try:
+        yield
+    finally:
+        await shutdown_db()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(
+    default_response_class=FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse,
+    lifespan=lifespan,
+)
+
+# Per-request query counts and N+1 warnings; X-DB-* headers when SQL_DEBUG_HEADERS=true
+app.add_middleware(QueryStatsMiddleware)
+
+# Single-request flame graphs for requests sent with X-Profile (PROFILE_REQUESTS_ENABLED=true)
+app.add_middleware(ProfileRequestMiddleware)
+
+# Per-route-class concurrency limits; requests beyond the queue get 503 + Retry-After
+route_limiters = build_limiters()
+SHUTDOWN_DRAIN_TIMEOUT = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT", "3"))  # seconds; fits inside gunicorn's last 5
+if LOAD_SHEDDING_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware, limiters=route_limiters)
+
+# Public jobs feed served from cache; job writes invalidate it on every worker
+jobs_feed_cache = JobsFeedCache()
+invalidation_bus.subscribe(JOBS_FEED_NAMESPACE, jobs_feed_cache.invalidate)
+
+async def publish_jobs_feed_invalidation():
+    await invalidation_bus.publish(pool, JOBS_FEED_NAMESPACE)
+
+app.add_middleware(JobsFeedCacheMiddleware, feed=jobs_feed_cache, on_write=publish_jobs_feed_invalidation)
+
+# Per-route metrics, outermost so cache hits and shed requests are counted too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -58,18 +167,69 @@ api_router = APIRouter(prefix="/api")
 
 # ... [All Enum and BaseModel definitions remain unchanged] ...
 
+# Search models
+class VisaStatus(str, Enum):
+    CITIZEN = "citizen"
+    PERMANENT = "permanent"
+    TEMPORARY = "temporary"
+    NEEDS_SPONSORSHIP = "needs_sponsorship"
+
+class RelocationWillingness(str, Enum):
+    YES = "yes"
+    NO = "no"
+    MAYBE = "maybe"
+
+class ApplicationStatus(str, Enum):
+    NEW = "new"
+    SCREENING = "screening"
+    INTERVIEW = "interview"
+    OFFER = "offer"
+    HIRED = "hired"
+    REJECTED = "rejected"
+
+class AdvancedSearchFilter(BaseModel):
+    locations: Optional[List[str]] = None
+    visa_status: Optional[List[VisaStatus]] = None
+    sponsorship_needed: Optional[bool] = None
+    min_experience_years: Optional[int] = None
+    max_experience_years: Optional[int] = None
+    rural_experience: Optional[bool] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    available_from: Optional[datetime] = None
+    relocation_willing: Optional[List[RelocationWillingness]] = None
+    required_skills: Optional[List[str]] = None
+    application_status: Optional[List[ApplicationStatus]] = None
+    applied_after: Optional[datetime] = None
+    applied_before: Optional[datetime] = None
+    search_query: Optional[str] = None
+
+class SavedSearchCreate(BaseModel):
+    name: str
+    filters: AdvancedSearchFilter
+
+# Interview scheduling models
+class InterviewAvailabilityRequest(BaseModel):
+    interviewer_emails: List[str] = Field(..., min_length=1, max_length=50)
+    start: datetime
+    end: datetime
+    min_minutes: int = Field(30, ge=5, le=480)
+
 # Email service functions
 async def send_email(to_email: str, subject: str, content: str):
+    started = time.perf_counter()
     try:
-        message = Mail(
+        message = sendgrid.helpers.mail.Mail(
             from_email='noreply@grolearning.com',
             to_emails=to_email,
             subject=subject,
             html_content=content
         )
-        response = sg.send(message)
+        response = sendgrid_client().send(message)
+        observe_outbound("sendgrid", started, ok=True)
         return True
     except Exception as e:
+        observe_outbound("sendgrid", started, ok=False)
         logging.error(f"Failed to send email: {e}")
         return False
 
@@ -95,8 +255,9 @@ async def log_audit_action(
 
 def render_email_template(template_content: str, merge_data: Dict[str, Any]) -> str:
     try:
-        template = Template(template_content)
-        return template.render(**merge_data)
+        with span("template_rendering"):
+            template = jinja2.Template(template_content)
+            return template.render(**merge_data)
     except Exception as e:
         logging.error(f"Template rendering error: {e}")
         return template_content
@@ -117,107 +278,83 @@ async def send_templated_email(template_id: uuid.UUID, recipient_email: str, mer
         return False
 
 # ADVANCED SQL SEARCH (refactored)
-async def search_candidates(filters: 'AdvancedSearchFilter') -> List[Dict[str, Any]]:
+# One prepared statement per canonical filter shape and pooled connection
+search_statements = PreparedStatementCache()
+
+async def search_candidates(filters: AdvancedSearchFilter) -> List[Dict[str, Any]]:
     """
-    Build and execute a SQL query for advanced candidate search.
+    Execute an advanced candidate search.
     """
-    query = "SELECT * FROM candidates WHERE TRUE"
-    values = []
-    idx = 1
-
-    # Location filter
-    if filters.locations:
-        query += f" AND location = ANY(${idx})"
-        values.append(filters.locations)
-        idx += 1
-
-    # Visa status filter
-    if filters.visa_status:
-        query += f" AND visa_status = ANY(${idx})"
-        values.append([v.value for v in filters.visa_status])
-        idx += 1
-
-    if filters.sponsorship_needed is not None:
-        query += f" AND sponsorship_needed = ${idx}"
-        values.append(filters.sponsorship_needed)
-        idx += 1
-
-    if filters.min_experience_years is not None:
-        query += f" AND experience_years >= ${idx}"
-        values.append(filters.min_experience_years)
-        idx += 1
-    if filters.max_experience_years is not None:
-        query += f" AND experience_years <= ${idx}"
-        values.append(filters.max_experience_years)
-        idx += 1
-
-    if filters.rural_experience is not None:
-        query += f" AND rural_experience = ${idx}"
-        values.append(filters.rural_experience)
-        idx += 1
-
-    if filters.min_score is not None:
-        query += f" AND score >= ${idx}"
-        values.append(filters.min_score)
-        idx += 1
-    if filters.max_score is not None:
-        query += f" AND score <= ${idx}"
-        values.append(filters.max_score)
-        idx += 1
-
-    if filters.available_from is not None:
-        query += f" AND availability_start >= ${idx}"
-        values.append(filters.available_from)
-        idx += 1
-
-    if filters.relocation_willing:
-        query += f" AND relocation_willing = ANY(${idx})"
-        values.append([w.value for w in filters.relocation_willing])
-        idx += 1
-
-    if filters.required_skills:
-        # PostgreSQL array overlap
-        query += f" AND (skills && ${idx})"
-        values.append(filters.required_skills)
-        idx += 1
-
-    if filters.application_status:
-        query += f" AND status = ANY(${idx})"
-        values.append([a.value for a in filters.application_status])
-        idx += 1
-
-    if filters.applied_after is not None:
-        query += f" AND created_at >= ${idx}"
-        values.append(filters.applied_after)
-        idx += 1
-    if filters.applied_before is not None:
-        query += f" AND created_at <= ${idx}"
-        values.append(filters.applied_before)
-        idx += 1
-
-    if filters.search_query:
-        query += f""" AND (
-            full_name ILIKE ${idx} OR
-            email ILIKE ${idx} OR
-            notes ILIKE ${idx} OR
-            resume_text ILIKE ${idx} OR
-            childcare_cert ILIKE ${idx}
-        )"""
-        values.append(f"%{filters.search_query}%")
-        idx += 1
-
+    with span("search_sql_build"):
+        query, values = build_search_query(filters)
     async with pool.acquire() as connection:
-        rows = await connection.fetch(query, *values)
+        rows = await search_statements.fetch(connection, query, *values)
         return [dict(row) for row in rows]
 
+async def search_candidates_with_facets(filters: AdvancedSearchFilter) -> Dict[str, Any]:
+    """
+    Execute an advanced candidate search and count location, visa status,
+    relocation and status values across the matches in the same query.
+    """
+    with span("search_sql_build"):
+        query, values = build_faceted_search_query(filters)
+    async with pool.acquire() as connection:
+        rows = await search_statements.fetch(connection, query, *values)
+    facets = json.loads(rows[0]['_facets']) if rows and rows[0]['_facets'] else {}
+    results = []
+    for row in rows:
+        if row['id'] is None:
+            continue
+        candidate = dict(row)
+        del candidate['_facets']
+        results.append(candidate)
+    return {
+        "total": len(results),
+        "results": results,
+        "facets": {column: facets.get(column, []) for column in FACET_COLUMNS},
+    }
+
+# SAVED SEARCHES: match sets are materialized and refreshed from a trigger-fed queue
+saved_searches = SavedSearches(AdvancedSearchFilter)
+saved_search_refresh_task: Optional[asyncio.Task] = None
+
+# CANDIDATE-JOB MATCHING: sparse scores precomputed as candidates and jobs change
+match_engine = MatchEngine()
+match_refresh_task: Optional[asyncio.Task] = None
+
+# DUPLICATE CANDIDATES: new and edited candidates are checked via blocking keys
+candidate_deduplicator = CandidateDeduplicator()
+dedup_task: Optional[asyncio.Task] = None
+event_loop_lag_task: Optional[asyncio.Task] = None
+
+# BACKGROUND SCHEDULER: one leader per cluster, claim jobs run on every worker
+scheduler = Scheduler(DATABASE_URL)
+
+@scheduler.every(REMINDER_INTERVAL, name="interview_reminders")
+async def interview_reminders_job(pool):
+    await send_interview_reminders(pool, send_email)
+
+@scheduler.every(ANALYTICS_REFRESH_INTERVAL, name="pipeline_stats", leader_only=True)
+async def pipeline_stats_job(pool):
+    await refresh_pipeline_stats(pool)
+
+@scheduler.every(AUDIT_MAINTENANCE_INTERVAL, name="audit_partitions", leader_only=True)
+async def audit_partitions_job(pool):
+    await maintain_audit_partitions(pool)
+
+@scheduler.every(WEBHOOK_RETRY_INTERVAL, name="webhook_retries")
+async def webhook_retries_job(pool):
+    await retry_webhooks(pool, CAREERS_WEBHOOK_SECRET)
+
 # COMPLIANCE REPORT (refactored)
+@db_router.replica_reads()
 async def generate_compliance_report(
     report_type: str,
     start_date: datetime,
     end_date: datetime,
     user_id: uuid.UUID
 ) -> Dict[str, Any]:
-    async with pool.acquire() as connection:
+    async with db_router.acquire() as connection:
         if report_type == "eeo":
             total_candidates = await connection.fetchval(
                 "SELECT COUNT(*) FROM candidates WHERE created_at BETWEEN $1 AND $2",
@@ -256,4 +393,237 @@ async def generate_compliance_report(
         # ... Add more report types as needed ...
         return {}
 
+# COMPLIANCE EXPORTS: row-level CSV/XLSX streamed from a cursor
+def stream_compliance_export(
+    report: str, export_format: str, start_date: datetime, end_date: datetime, accept_encoding: str
+) -> StreamingResponse:
+    export = EXPORTS[report]
+    # Rows are read while the response streams, after any replica_reads scope has ended
+    batches = fetch_batches(db_router.read_pool(), export.query, start_date, end_date)
+    headers = {"Content-Disposition": f'attachment; filename="{export_filename(report, start_date, end_date, export_format)}"'}
+    if export_format == "xlsx":
+        return StreamingResponse(xlsx_chunks(export.title, export.columns, batches),
+                                 media_type=XLSX_MEDIA_TYPE, headers=headers)
+    chunks = csv_chunks(export.columns, batches)
+    if accepts_gzip(accept_encoding):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(chunks, media_type="text/csv; charset=utf-8", headers=headers)
+
 # ... [Rest of your FastAPI endpoint definitions and startup/shutdown events] ...
+
+async def startup_db():
+    global pool, replica_pool, saved_search_refresh_task, match_refresh_task, dedup_task, event_loop_lag_task
+    started = time.perf_counter()
+    pool = await create_pool(DATABASE_URL, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE)
+    if RUN_MIGRATIONS_ON_STARTUP:
+        async with pool.acquire() as connection:
+            await apply_migrations(connection)
+    await warm_up(pool)
+    if REPLICA_DATABASE_URL:
+        try:
+            replica_pool = await create_pool(
+                REPLICA_DATABASE_URL, name="replica", min_size=REPLICA_POOL_MIN_SIZE, max_size=REPLICA_POOL_MAX_SIZE
+            )
+            await warm_up(replica_pool)
+        except (OSError, asyncpg.PostgresError) as e:
+            # Reporting reads use the primary until the next restart.
+            logging.error(f"Read replica unavailable at startup: {e}")
+    db_router.start(pool, replica_pool)
+    saved_search_refresh_task = asyncio.create_task(saved_searches.run_refresh_loop(lambda: pool))
+    match_refresh_task = asyncio.create_task(match_engine.run_refresh_loop(lambda: pool))
+    dedup_task = asyncio.create_task(candidate_deduplicator.run_refresh_loop(lambda: pool))
+    scheduler.start(lambda: pool)
+    event_loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    if hasattr(signal, "SIGUSR2"):
+        # kill -USR2 <pid> starts a profile; the next one writes it to PROFILE_DIR
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, toggle_from_signal)
+    try:
+        await invalidation_bus.connect()
+    except Exception as e:
+        # Without the listener, caches fall back to their TTLs.
+        logging.error(f"Cache invalidation bus unavailable: {e}")
+    WORKER_BOOT.set("startup", value=time.perf_counter() - started)
+    logging.info(
+        f"Worker {os.getpid()} ready: import {IMPORT_SECONDS * 1000:.0f} ms, "
+        f"startup {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+async def shutdown_db():
+    # Let requests that are still running finish before their pool goes away
+    if not await drain_limiters(route_limiters, SHUTDOWN_DRAIN_TIMEOUT):
+        logging.warning(f"Requests still running after {SHUTDOWN_DRAIN_TIMEOUT}s, shutting down anyway")
+    for task in (saved_search_refresh_task, match_refresh_task, dedup_task, event_loop_lag_task):
+        if task is not None:
+            task.cancel()
+    shutdown_cpu_pool()
+    await scheduler.stop()
+    await db_router.stop()
+    await invalidation_bus.close()
+    if replica_pool is not None:
+        await replica_pool.close()
+    if pool is not None:
+        await pool.close()
+
+@api_router.post("/candidates/advanced-search/facets", dependencies=[Depends(get_token_claims)])
+async def advanced_search_with_facets(filters: AdvancedSearchFilter):
+    return FastJSONResponse(await search_candidates_with_facets(filters))
+
+@api_router.post("/saved-searches")
+async def create_saved_search(saved_search: SavedSearchCreate, claims: Dict[str, Any] = Depends(get_token_claims)):
+    async with pool.acquire() as connection:
+        return await saved_searches.save(connection, claims["sub"], saved_search.name, saved_search.filters)
+
+@api_router.get("/saved-searches")
+async def get_saved_searches(claims: Dict[str, Any] = Depends(get_token_claims)):
+    async with pool.acquire() as connection:
+        return await saved_searches.list(connection, claims["sub"])
+
+@api_router.get("/saved-searches/{saved_search_id}/results")
+async def get_saved_search_results(saved_search_id: uuid.UUID, claims: Dict[str, Any] = Depends(get_token_claims)):
+    async with pool.acquire() as connection:
+        results = await saved_searches.results(connection, claims["sub"], saved_search_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return FastJSONResponse(results)
+
+@api_router.get("/saved-searches/{saved_search_id}/new-matches")
+async def get_saved_search_new_matches(saved_search_id: uuid.UUID, claims: Dict[str, Any] = Depends(get_token_claims)):
+    async with pool.acquire() as connection:
+        delta = await saved_searches.new_matches(connection, claims["sub"], saved_search_id)
+    if delta is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return FastJSONResponse(delta)
+
+@api_router.get("/jobs/{job_id}/matches", dependencies=[Depends(get_token_claims)])
+async def get_job_matches(job_id: uuid.UUID, limit: int = Query(20, ge=1, le=200)):
+    async with pool.acquire() as connection:
+        return FastJSONResponse(await match_engine.top_matches(connection, job_id, limit))
+
+@api_router.get("/duplicate-candidates", dependencies=[Depends(get_token_claims)])
+async def get_duplicate_candidates(limit: int = Query(50, ge=1, le=500)):
+    async with pool.acquire() as connection:
+        return FastJSONResponse(await candidate_deduplicator.pending(connection, limit))
+
+def require_admin(claims: Dict[str, Any] = Depends(get_token_claims)) -> Dict[str, Any]:
+    if claims.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return claims
+
+@api_router.get("/system/scheduler", dependencies=[Depends(require_admin)])
+async def get_scheduler_status():
+    return scheduler.snapshot()
+
+@api_router.get("/system/db-routing", dependencies=[Depends(require_admin)])
+async def get_db_routing_status():
+    return db_router.snapshot()
+
+@api_router.get("/system/profiler", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    return profiler.status()
+
+@api_router.post("/system/profiler/start", dependencies=[Depends(require_admin)])
+async def start_profiler(interval: Optional[float] = Query(None, ge=0.001, le=1.0)):
+    profiler.start(interval)
+    return profiler.status()
+
+@api_router.post("/system/profiler/stop", dependencies=[Depends(require_admin)])
+async def stop_profiler():
+    return PlainTextResponse(profiler.stop())
+
+@api_router.get("/system/profiler/requests/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_request_profile(profile_id: str):
+    profile = profiler.recent.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
+
+@api_router.get("/system/query-stats", dependencies=[Depends(require_admin)])
+async def get_query_stats(
+    limit: int = Query(50, ge=1, le=1000),
+    order_by: str = Query("total_ms", pattern="^(total_ms|mean_ms|max_ms|calls|rows)$"),
+):
+    return QUERY_STATS.top(limit, order_by)
+
+@api_router.delete("/system/query-stats", dependencies=[Depends(require_admin)])
+async def reset_query_stats():
+    QUERY_STATS.reset()
+    return {"reset": True}
+
+@api_router.get("/system/search-statement-cache", dependencies=[Depends(require_admin)])
+async def get_search_statement_cache_stats():
+    return search_statements.stats()
+
+@api_router.get("/compliance/exports/{report}", dependencies=[Depends(require_admin)])
+async def export_compliance_report(
+    report: str,
+    request: Request,
+    start_date: datetime,
+    end_date: datetime,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+):
+    if report not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {report}")
+    return stream_compliance_export(report, format, start_date, end_date, request.headers.get("accept-encoding", ""))
+
+@api_router.get("/audit-logs", dependencies=[Depends(require_admin)])
+@db_router.replica_reads(max_lag=5)
+async def query_audit_logs(
+    entity_type: Optional[str] = None,
+    entity_id: Optional[uuid.UUID] = None,
+    user_id: Optional[uuid.UUID] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    details: Optional[str] = Query(None, description='JSON object the entry details must contain'),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+):
+    try:
+        details_filter = json.loads(details) if details else None
+        if details_filter is not None and not isinstance(details_filter, dict):
+            raise ValueError("details must be a JSON object")
+        query, values = build_audit_query(
+            entity_type, entity_id, user_id, action, since, until, details_filter, cursor, limit
+        )
+    except (ValueError, InvalidCursorError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    async with db_router.acquire() as connection:
+        rows = await connection.fetch(query, *values)
+    return FastJSONResponse(paginate([dict(row) for row in rows], limit))
+
+@api_router.get("/interviews/conflicts", dependencies=[Depends(get_token_claims)])
+async def get_interview_conflicts(
+    interviewer_email: str,
+    scheduled_date: datetime,
+    duration_minutes: int = Query(60, ge=1, le=480),
+    exclude_id: Optional[uuid.UUID] = None,
+):
+    async with pool.acquire() as connection:
+        conflicts = await find_conflicts(connection, interviewer_email, scheduled_date, duration_minutes, exclude_id)
+    return {"conflict": bool(conflicts), "interviews": conflicts}
+
+@api_router.post("/interviews/availability", dependencies=[Depends(get_token_claims)])
+async def get_interviewer_availability(request: InterviewAvailabilityRequest):
+    try:
+        async with pool.acquire() as connection:
+            slots = await free_slots(
+                connection, request.interviewer_emails, request.start, request.end, request.min_minutes
+            )
+    except AvailabilityRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start": request.start, "end": request.end, "free_slots": slots}
+
+@app.exception_handler(asyncpg.exceptions.ExclusionViolationError)
+async def interview_overlap_handler(request: Request, exc: asyncpg.exceptions.ExclusionViolationError):
+    # Raised by the interviews_no_overlap constraint on any insert or reschedule.
+    if exc.constraint_name != OVERLAP_CONSTRAINT:
+        raise exc
+    return JSONResponse(status_code=409, content={"detail": "Interviewer is already booked for that time"})
+
+app.include_router(api_router)
+
+# Time from the first line of this module to here, i.e. import cost of a worker
+IMPORT_SECONDS = time.perf_counter() - BOOT_STARTED
+WORKER_BOOT.set("import", value=IMPORT_SECONDS)
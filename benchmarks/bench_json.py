@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare FastAPI's default JSON path with FastJSONResponse on 10k candidates.
+
+Usage: python benchmarks/bench_json.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fast_json import FastJSONResponse  # noqa: E402
+
+LOCATIONS = ["Mount Isa", "Moranbah", "Emerald", "Brisbane", "Townsville", "Longreach"]
+VISA_STATUSES = ["citizen", "permanent", "temporary", "needs_sponsorship"]
+
+
+def candidate_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "email": f"candidate{i}@example.com",
+            "full_name": f"Candidate {i}",
+            "location": rng.choice(LOCATIONS),
+            "visa_status": rng.choice(VISA_STATUSES),
+            "sponsorship_needed": rng.random() < 0.3,
+            "experience_years": rng.randint(0, 20),
+            "rural_experience": rng.random() < 0.4,
+            "score": Decimal(f"{rng.uniform(0, 10):.2f}"),
+            "skills": rng.sample(["first aid", "programming", "literacy", "nutrition", "leadership"], 3),
+            "availability_start": now + timedelta(days=rng.randint(0, 90)),
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+            "notes": "Experienced educator " * 5,
+        }
+        for i in range(count)
+    ]
+
+
+def default_path(rows):
+    # What FastAPI does for a route returning list[dict] with JSONResponse.
+    return json.dumps(jsonable_encoder(rows), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows):
+    return FastJSONResponse(rows).body
+
+
+def best_of(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = candidate_rows(args.rows)
+    baseline = best_of(default_path, rows, args.repeat)
+    fast = best_of(fast_path, rows, args.repeat)
+    print(f"{args.rows} candidate rows, best of {args.repeat}")
+    print(f"  jsonable_encoder + json: {baseline * 1000:8.1f} ms")
+    print(f"  FastJSONResponse:        {fast * 1000:8.1f} ms  ({baseline / fast:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Measure the per-request cost of MetricsMiddleware.
+
+Calls a minimal FastAPI app directly through ASGI (no sockets), with and
+without the middleware, and reports the added microseconds per request.
+
+Usage: python benchmarks/bench_metrics.py [--requests 20000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi import FastAPI  # noqa: E402
+from metrics import MetricsMiddleware  # noqa: E402
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/jobs/{job_id}/matches")
+    async def matches(job_id: str):
+        return {"job_id": job_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/jobs/{i}/matches", "raw_path": b"", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+async def best_of(app, requests: int, repeat: int) -> float:
+    await drive(app, 100)  # build the middleware stack and warm caches
+    return min([await drive(app, requests) for _ in range(repeat)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plain = asyncio.run(best_of(build_app(False), args.requests, args.repeat))
+    instrumented = asyncio.run(best_of(build_app(True), args.requests, args.repeat))
+    per_request = (instrumented - plain) / args.requests * 1e6
+    print(f"{args.requests} requests, best of {args.repeat}")
+    print(f"  without metrics: {plain / args.requests * 1e6:8.1f} us/request")
+    print(f"  with metrics:    {instrumented / args.requests * 1e6:8.1f} us/request  (+{per_request:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+-- Tables that the full application creates but backend/migrations does not.
+-- Applied to disposable benchmark databases before the migrations, so that
+-- migrations that depend on these tables (interview slots, job matching)
+-- run exactly as they do in production.
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    title TEXT NOT NULL,
+    description TEXT,
+    location TEXT NOT NULL,
+    employment_type TEXT NOT NULL DEFAULT 'full_time',
+    salary_min INTEGER,
+    salary_max INTEGER,
+    requirements JSONB NOT NULL DEFAULT '[]',
+    sponsorship_eligible BOOLEAN NOT NULL DEFAULT FALSE,
+    relocation_support BOOLEAN NOT NULL DEFAULT FALSE,
+    housing_support BOOLEAN NOT NULL DEFAULT FALSE,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS applications (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    candidate_id UUID NOT NULL,
+    job_id UUID NOT NULL,
+    status TEXT NOT NULL DEFAULT 'new',
+    cover_letter TEXT,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS interviews (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    candidate_id UUID NOT NULL,
+    application_id UUID,
+    interviewer_name TEXT,
+    interviewer_email TEXT NOT NULL,
+    scheduled_date TIMESTAMPTZ NOT NULL,
+    duration_minutes INTEGER NOT NULL DEFAULT 60,
+    interview_type TEXT,
+    location TEXT,
+    notes TEXT,
+    status TEXT NOT NULL DEFAULT 'scheduled',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS documents (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    candidate_id UUID NOT NULL,
+    document_type TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT,
+    size_bytes INTEGER,
+    uploaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS email_templates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    content TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,76 @@
+"""Deterministic document fixtures for benchmarks (no external files)."""
+import random
+from typing import List
+
+RESUME_SECTIONS = {
+    "Summary": "Dedicated early childhood educator with {years} years of experience in long day care, "
+               "kindergarten and outside school hours care across regional Queensland.",
+    "Qualifications": "Diploma of Early Childhood Education and Care (CHC50121); Certificate III in Early "
+                      "Childhood Education and Care (CHC30121); HLTAID012 Provide First Aid in an education "
+                      "and care setting; Working with Children Check (Blue Card).",
+    "Experience": "Lead Educator, {centre} ({start}-{end}): planned and documented play-based programs aligned "
+                  "with the Early Years Learning Framework, supported children with additional needs, "
+                  "mentored trainee educators and liaised with families on developmental goals.",
+    "Skills": "{skills}",
+}
+CENTRES = ["Mount Isa Early Learning", "Moranbah Kids Club", "Emerald Childcare Centre", "Longreach Little Stars"]
+SKILLS = ["first aid", "literacy", "numeracy", "music", "nutrition", "leadership", "behaviour support",
+          "inclusion", "programming", "outdoor play", "documentation", "NQS assessment"]
+
+
+def resume_text(seed: int = 0, roles: int = 4) -> str:
+    """A two-page-sized resume, roughly 3-4 KB of text."""
+    rng = random.Random(seed)
+    lines: List[str] = [f"Candidate {seed}", "Early Childhood Educator", ""]
+    lines += ["Summary", RESUME_SECTIONS["Summary"].format(years=rng.randint(2, 15)), ""]
+    lines += ["Qualifications", RESUME_SECTIONS["Qualifications"], ""]
+    lines.append("Experience")
+    year = 2024
+    for _ in range(roles):
+        start = year - rng.randint(1, 4)
+        lines.append(RESUME_SECTIONS["Experience"].format(centre=rng.choice(CENTRES), start=start, end=year))
+        year = start
+    lines += ["", "Skills", RESUME_SECTIONS["Skills"].format(skills=", ".join(rng.sample(SKILLS, 6)))]
+    return "\n".join(lines)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def resume_pdf(text: str, chars_per_line: int = 90, lines_per_page: int = 50) -> bytes:
+    """Render ``text`` as a plain multi-page PDF that PyPDF2 can extract."""
+    wrapped: List[str] = []
+    for paragraph in text.splitlines():
+        while len(paragraph) > chars_per_line:
+            cut = paragraph.rfind(" ", 0, chars_per_line)
+            cut = cut if cut > 0 else chars_per_line
+            wrapped.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        wrapped.append(paragraph)
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    objects: List[bytes] = []
+    page_ids = [3 + i * 2 for i in range(len(pages))]
+    font_id = 3 + len(pages) * 2
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    for page_id, page_lines in zip(page_ids, pages):
+        body = "BT /F1 10 Tf 50 790 Td 14 TL " + " ".join(f"({_escape(line)}) '" for line in page_lines) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {page_id + 1} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic data for performance work, loaded with COPY.
+
+Generates candidates, jobs, applications, interviews, documents and
+audit rows at any scale, from a few thousand rows up to millions of
+candidates. Rows are streamed to binary COPY, so memory use stays flat.
+
+Every table draws from its own ``random.Random`` derived from ``--seed``.
+Ids come from a hash of (seed, kind, index), see ``entity_id``. The same
+seed and ``--as-of`` date therefore produce byte-identical data, and
+callers can compute ids without reading the database back. Timestamps
+are relative to ``--as-of``, which defaults to today at 00:00 UTC.
+
+Distributions roughly follow production. Candidates are mostly citizens
+and permanent residents, and cluster in regional towns led by Mount Isa.
+Experience is right-skewed and scores sit around 6. Most candidates have
+resume text, and applications go through a status funnel. A few popular
+jobs take most of the applications. Upcoming interviews get
+non-overlapping slots per interviewer, so the interviews_no_overlap
+exclusion constraint holds. Audit rows fall in the months covered by
+the audit_logs partitions, which are created as needed.
+
+The candidates and jobs queue triggers (saved-search, match and dedup
+refresh) are disabled while loading. Otherwise every generated row would
+be queued for the background loops. Pass ``--queue-refresh`` to queue
+everything once at the end instead.
+
+Usage: python benchmarks/generate_data.py --dsn postgresql://... [--candidates 1000000]
+                                          [--seed 42] [--schema] [--truncate] [--queue-refresh]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import asyncpg
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BASE_SCHEMA = BENCHMARKS_DIR / "fixtures" / "base_schema.sql"
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "backend"))
+sys.path.insert(0, str(BENCHMARKS_DIR / "fixtures"))
+
+from documents import resume_text  # noqa: E402
+from interview_scheduling import SCHEDULING_TIMEZONE  # noqa: E402
+
+LOCATIONS = ["Mount Isa", "Moranbah", "Emerald", "Longreach", "Roma", "Charleville", "Townsville", "Brisbane"]
+LOCATION_WEIGHTS = [24, 14, 12, 8, 8, 6, 16, 12]
+VISA_STATUSES = ["citizen", "permanent", "temporary", "needs_sponsorship"]
+VISA_WEIGHTS = [48, 22, 18, 12]
+SKILLS = ["first aid", "literacy", "numeracy", "music", "nutrition", "leadership", "behaviour support",
+          "inclusion", "programming", "outdoor play"]
+SKILL_WEIGHTS = [30, 14, 12, 6, 8, 7, 9, 7, 10, 7]
+STATUSES = ["new", "screening", "interview", "offer", "hired", "rejected"]
+STATUS_WEIGHTS = [34, 24, 14, 5, 6, 17]
+CERTIFICATES = ["Certificate III in Early Childhood Education and Care",
+                "Diploma of Early Childhood Education and Care", "Bachelor of Early Childhood Education", None]
+CERTIFICATE_WEIGHTS = [45, 35, 10, 10]
+JOB_TITLES = ["Early Childhood Educator", "Lead Educator", "Room Leader", "Centre Director",
+              "Assistant Educator", "Early Childhood Teacher", "Cook", "OSHC Coordinator"]
+JOB_REQUIREMENTS = ["Certificate III in Early Childhood Education and Care", "Diploma of Early Childhood Education "
+                    "and Care", "first aid", "2+ years experience", "5+ years experience", "leadership", "literacy"]
+AUDIT_ACTIONS = ["candidate.created", "candidate.updated", "candidate.viewed", "application.status_changed",
+                 "document.uploaded", "email.sent"]
+AUDIT_WEIGHTS = [10, 25, 35, 15, 8, 7]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Riley", "Casey", "Jamie", "Harper", "Charlie",
+               "Olivia", "Noah", "Mia", "Liam", "Ava", "Ethan", "Priya", "Arjun", "Mei", "Kenji"]
+LAST_NAMES = ["Smith", "Nguyen", "Williams", "Brown", "Wilson", "Taylor", "Singh", "Patel", "Kelly", "Walker",
+              "Chen", "Martin", "Thompson", "White", "Harris", "Lee", "Clarke", "Ryan", "Murphy", "Hughes"]
+
+COPY_COLUMNS = {
+    "candidates": ["id", "email", "phone", "full_name", "location", "visa_status", "sponsorship_needed",
+                   "childcare_cert", "experience_years", "rural_experience", "relocation_willing",
+                   "housing_needed", "availability_start", "resume_filename", "resume_text", "skills", "score",
+                   "status", "created_at", "updated_at"],
+    "jobs": ["id", "title", "description", "location", "employment_type", "salary_min", "salary_max",
+             "requirements", "sponsorship_eligible", "relocation_support", "housing_support", "status",
+             "created_at"],
+    "applications": ["id", "candidate_id", "job_id", "status", "applied_at"],
+    "interviews": ["id", "candidate_id", "application_id", "interviewer_name", "interviewer_email",
+                   "scheduled_date", "duration_minutes", "interview_type", "status", "created_at"],
+    "documents": ["id", "candidate_id", "document_type", "filename", "content_type", "size_bytes", "uploaded_at"],
+    "audit_logs": ["id", "user_id", "user_email", "action", "entity_type", "entity_id", "details", "ip_address",
+                   "timestamp"],
+}
+QUEUE_TRIGGER_TABLES = ("candidates", "jobs")
+HISTORY_DAYS = 730
+SLOTS_PER_DAY = 6  # hourly slots from 09:00, weekdays only
+WORKDAY_TZ = ZoneInfo(SCHEDULING_TIMEZONE)
+
+
+class Scale(NamedTuple):
+    candidates: int
+    jobs: int
+    interviewers: int
+    applications_per_candidate: float = 1.6
+    audit_per_candidate: float = 3.0
+    resume_ratio: float = 0.8
+
+    @classmethod
+    def for_candidates(cls, candidates: int, **overrides) -> "Scale":
+        return cls(candidates, max(candidates // 200, 10), max(candidates // 2000, 10))._replace(**overrides)
+
+
+def entity_id(seed: int, kind: str, index: int) -> uuid.UUID:
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def table_rng(seed: int, table: str) -> random.Random:
+    return random.Random(f"{seed}:{table}")
+
+
+def interviewer(index: int) -> Tuple[str, str]:
+    return f"Interviewer {index}", f"interviewer{index}@example.com"
+
+
+def candidate_records(seed: int, scale: Scale, as_of: datetime) -> Iterator[tuple]:
+    rng = table_rng(seed, "candidates")
+    for i in range(scale.candidates):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        visa_status = rng.choices(VISA_STATUSES, VISA_WEIGHTS)[0]
+        created_at = as_of - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        resume = None
+        if rng.random() < scale.resume_ratio:
+            resume = resume_text(seed * 1_000_003 + i, roles=rng.randint(1, 5))
+        skills = list(dict.fromkeys(rng.choices(SKILLS, SKILL_WEIGHTS, k=rng.randint(1, 6))))
+        yield (
+            entity_id(seed, "candidate", i), f"{first}.{last}.{i}@example.com".lower(),
+            f"+61 4{rng.randrange(10**8):08d}" if rng.random() < 0.85 else None, f"{first} {last}",
+            rng.choices(LOCATIONS, LOCATION_WEIGHTS)[0], visa_status,
+            visa_status == "needs_sponsorship" or (visa_status == "temporary" and rng.random() < 0.3),
+            rng.choices(CERTIFICATES, CERTIFICATE_WEIGHTS)[0], min(int(rng.expovariate(1 / 4.5)), 35),
+            rng.random() < 0.4, rng.choices(["yes", "maybe", "no", None], [30, 30, 30, 10])[0], rng.random() < 0.2,
+            as_of + timedelta(days=rng.randint(-30, 120)) if rng.random() < 0.7 else None,
+            f"resume_{i}.pdf" if resume else None, resume, skills,
+            round(min(max(rng.gauss(6.2, 1.8), 0.0), 10.0), 2), rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            created_at, created_at + timedelta(days=rng.randint(0, 60)),
+        )
+
+
+def job_records(seed: int, scale: Scale, as_of: datetime) -> Iterator[tuple]:
+    rng = table_rng(seed, "jobs")
+    for i in range(scale.jobs):
+        salary = rng.randrange(55_000, 110_000, 1000)
+        yield (
+            entity_id(seed, "job", i), rng.choice(JOB_TITLES), "Join our regional early learning team. " * 8,
+            rng.choices(LOCATIONS, LOCATION_WEIGHTS)[0], rng.choice(["full_time", "part_time", "casual"]),
+            salary, salary + rng.randrange(5_000, 20_000, 1000),
+            json.dumps(rng.sample(JOB_REQUIREMENTS, rng.randint(1, 4))), rng.random() < 0.5, rng.random() < 0.6,
+            rng.random() < 0.35, "active" if rng.random() < 0.8 else "closed",
+            as_of - timedelta(days=rng.randint(0, HISTORY_DAYS)),
+        )
+
+
+class Workdays(list):
+    """Weekdays from ``first``, extended on demand: ``days[n]`` is the n-th workday."""
+
+    def __init__(self, first: date):
+        super().__init__()
+        self.next = first
+
+    def __getitem__(self, index: int) -> date:
+        while index >= len(self):
+            if self.next.weekday() < 5:
+                self.append(self.next)
+            self.next += timedelta(days=1)
+        return super().__getitem__(index)
+
+
+def _popular_job(rng: random.Random, jobs: int) -> int:
+    # Squaring skews picks towards low indexes: a few jobs draw most applicants.
+    return int(jobs * rng.random() ** 2)
+
+
+def application_and_interview_records(seed: int, scale: Scale, as_of: datetime):
+    """Applications, plus interviews for those that reached the interview stage."""
+    rng = table_rng(seed, "applications")
+    next_slot = [0] * scale.interviewers
+    days = Workdays((as_of + timedelta(days=1)).date())
+    applications: List[tuple] = []
+    interviews: List[tuple] = []
+    index = 0
+    for candidate in range(scale.candidates):
+        count = min(round(rng.expovariate(1 / scale.applications_per_candidate)), 8)
+        for _ in range(count):
+            application_id = entity_id(seed, "application", index)
+            candidate_id = entity_id(seed, "candidate", candidate)
+            status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+            applied_at = as_of - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+            applications.append((application_id, candidate_id,
+                                 entity_id(seed, "job", _popular_job(rng, scale.jobs)), status, applied_at))
+            if status in ("interview", "offer", "hired"):
+                who = rng.randrange(scale.interviewers)
+                if status == "interview":
+                    day, hour = divmod(next_slot[who], SLOTS_PER_DAY)
+                    scheduled = datetime.combine(days[day], dt_time(9 + hour), tzinfo=WORKDAY_TZ)
+                    interview_status = "scheduled"
+                    next_slot[who] += 1
+                else:
+                    scheduled = applied_at + timedelta(days=rng.randint(3, 21), hours=rng.randint(0, 8))
+                    interview_status = "completed"
+                interviews.append((entity_id(seed, "interview", index), candidate_id, application_id,
+                                   *interviewer(who), scheduled, rng.choice([30, 45, 60]),
+                                   rng.choice(["phone", "video", "onsite"]), interview_status, applied_at))
+            index += 1
+            if len(applications) >= 10_000:
+                yield applications, interviews
+                applications, interviews = [], []
+    yield applications, interviews
+
+
+def document_records(seed: int, scale: Scale, as_of: datetime) -> Iterator[tuple]:
+    rng = table_rng(seed, "documents")
+    index = 0
+    for candidate in range(scale.candidates):
+        candidate_id = entity_id(seed, "candidate", candidate)
+        uploads = [("resume", f"resume_{candidate}.pdf")] if rng.random() < scale.resume_ratio else []
+        if rng.random() < 0.5:
+            uploads.append(("certificate", f"certificate_{candidate}.pdf"))
+        if rng.random() < 0.7:
+            uploads.append(("blue_card", f"blue_card_{candidate}.pdf"))
+        for document_type, filename in uploads:
+            yield (entity_id(seed, "document", index), candidate_id, document_type, filename, "application/pdf",
+                   rng.randint(40_000, 2_000_000), as_of - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)))
+            index += 1
+
+
+def audit_records(seed: int, scale: Scale, as_of: datetime) -> Iterator[tuple]:
+    rng = table_rng(seed, "audit_logs")
+    users = [(entity_id(seed, "user", n), f"recruiter{n}@example.com") for n in range(max(scale.interviewers, 5))]
+    index = 0
+    for candidate in range(scale.candidates):
+        candidate_id = entity_id(seed, "candidate", candidate)
+        for _ in range(min(round(rng.expovariate(1 / scale.audit_per_candidate)), 40)):
+            user_id, user_email = rng.choice(users)
+            action = rng.choices(AUDIT_ACTIONS, AUDIT_WEIGHTS)[0]
+            details = {"source": "generate_data"}
+            if action == "application.status_changed":
+                details.update(zip(("from", "to"), rng.sample(STATUSES, 2)))
+            yield (entity_id(seed, "audit", index), user_id, user_email, action, "candidate", candidate_id,
+                   json.dumps(details), f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                   as_of - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)))
+            index += 1
+
+
+def batches(records: Iterator[tuple], size: int = 10_000) -> Iterator[List[tuple]]:
+    batch: List[tuple] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def prepare_schema(dsn: str):
+    """Apply the base schema and the migrations to an empty database."""
+    from migrate import apply_migrations
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(BASE_SCHEMA.read_text())
+        await apply_migrations(connection)
+    finally:
+        await connection.close()
+
+
+async def _copy(connection, table: str, records: Iterator[tuple]) -> int:
+    total = 0
+    for batch in batches(records):
+        await connection.copy_records_to_table(table, records=batch, columns=COPY_COLUMNS[table])
+        total += len(batch)
+    return total
+
+
+async def _create_audit_partitions(connection, as_of: datetime):
+    month = (as_of - timedelta(days=HISTORY_DAYS)).date().replace(day=1)
+    while month <= as_of.date():
+        await connection.execute("SELECT create_audit_log_partition($1::date)", month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+async def populate(dsn: str, scale: Scale, seed: int, as_of: datetime, truncate: bool = False,
+                   queue_refresh: bool = False, log=print) -> Dict[str, int]:
+    """Load the generated data set into ``dsn``; returns rows copied per table."""
+    counts: Dict[str, int] = {}
+    connection = await asyncpg.connect(dsn)
+    try:
+        if truncate:
+            await connection.execute(f"TRUNCATE {', '.join(COPY_COLUMNS)} CASCADE")
+        for table in QUEUE_TRIGGER_TABLES:
+            await connection.execute(f"ALTER TABLE {table} DISABLE TRIGGER USER")
+        try:
+            for table, records in (("candidates", candidate_records(seed, scale, as_of)),
+                                   ("jobs", job_records(seed, scale, as_of))):
+                started = time.perf_counter()
+                counts[table] = await _copy(connection, table, records)
+                log(f"{table:<14}{counts[table]:>12,} rows in {time.perf_counter() - started:6.1f}s")
+        finally:
+            for table in QUEUE_TRIGGER_TABLES:
+                await connection.execute(f"ALTER TABLE {table} ENABLE TRIGGER USER")
+
+        started = time.perf_counter()
+        counts["applications"] = counts["interviews"] = 0
+        for applications, interviews in application_and_interview_records(seed, scale, as_of):
+            await connection.copy_records_to_table("applications", records=applications,
+                                                   columns=COPY_COLUMNS["applications"])
+            await connection.copy_records_to_table("interviews", records=interviews,
+                                                   columns=COPY_COLUMNS["interviews"])
+            counts["applications"] += len(applications)
+            counts["interviews"] += len(interviews)
+        log(f"{'applications':<14}{counts['applications']:>12,} rows, {counts['interviews']:,} interviews "
+            f"in {time.perf_counter() - started:6.1f}s")
+
+        await _create_audit_partitions(connection, as_of)
+        for table, records in (("documents", document_records(seed, scale, as_of)),
+                               ("audit_logs", audit_records(seed, scale, as_of))):
+            started = time.perf_counter()
+            counts[table] = await _copy(connection, table, records)
+            log(f"{table:<14}{counts[table]:>12,} rows in {time.perf_counter() - started:6.1f}s")
+
+        if queue_refresh:
+            await connection.execute('''
+                INSERT INTO match_refresh_queue (entity_type, entity_id)
+                SELECT 'candidate', id FROM candidates UNION ALL SELECT 'job', id FROM jobs
+                ON CONFLICT DO NOTHING
+            ''')
+            await connection.execute('INSERT INTO dedup_queue (candidate_id) SELECT id FROM candidates '
+                                     'ON CONFLICT DO NOTHING')
+            await connection.execute('INSERT INTO saved_search_refresh_queue (candidate_id) SELECT id FROM candidates '
+                                     'ON CONFLICT DO NOTHING')
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
+    return counts
+
+
+def start_of_day(value: Optional[str] = None) -> datetime:
+    day = date.fromisoformat(value) if value else datetime.now(timezone.utc).date()
+    return datetime.combine(day, dt_time(), tzinfo=timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, help="default: candidates / 200")
+    parser.add_argument("--interviewers", type=int, help="default: candidates / 2000")
+    parser.add_argument("--applications-per-candidate", type=float, default=1.6)
+    parser.add_argument("--audit-per-candidate", type=float, default=3.0)
+    parser.add_argument("--resume-ratio", type=float, default=0.8, help="share of candidates with resume text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", help="reference date (YYYY-MM-DD) for all timestamps; default today")
+    parser.add_argument("--schema", action="store_true", help="apply base schema and migrations first")
+    parser.add_argument("--truncate", action="store_true", help="empty the generated tables first")
+    parser.add_argument("--queue-refresh", action="store_true",
+                        help="queue every candidate and job for match, dedup and saved-search refresh")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+
+    overrides = {key: getattr(args, key) for key in ("jobs", "interviewers") if getattr(args, key)}
+    scale = Scale.for_candidates(args.candidates, applications_per_candidate=args.applications_per_candidate,
+                                 audit_per_candidate=args.audit_per_candidate, resume_ratio=args.resume_ratio,
+                                 **overrides)
+
+    async def run():
+        if args.schema:
+            await prepare_schema(args.dsn)
+        started = time.perf_counter()
+        counts = await populate(args.dsn, scale, args.seed, start_of_day(args.as_of), args.truncate,
+                                args.queue_refresh)
+        print(f"{sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""In-process load test against a disposable local Postgres.
+
+Starts a throwaway database, applies benchmarks/fixtures/base_schema.sql
+and the migrations, and seeds it with benchmarks/generate_data.py. Then
+runs the FastAPI app in-process through httpx's ASGI transport. No
+sockets or uvicorn are involved, so the numbers measure the app and the
+database only. Requests carry an admin token, so admin-only routes
+(exports, audit logs) are measured rather than rejected. Each scenario
+is driven by ``--concurrency`` concurrent clients, capped at what its
+route class's limiter can admit or queue without shedding (the reports
+class takes 5), so a 503 from load shedding is never counted as an
+error. The report gives p50/p95/p99 latency, throughput, error count and
+the concurrency used per scenario.
+
+Results are compared with a stored baseline (benchmarks/baselines/
+loadtest.json). The run fails, exiting with 1, if any scenario's p95
+grows or its throughput drops by more than ``--tolerance``, or if any
+request errors. Record a new baseline with ``--update-baseline`` on the
+machine that will run the comparison. Numbers from different machines
+are not comparable.
+
+Disposable database, in order of preference:
+  --admin-dsn / LOADTEST_ADMIN_DSN  create and drop a database on that server
+  initdb and pg_ctl on PATH         start a temporary cluster in a temp dir
+
+Scenarios whose route is not registered in this build are reported as
+skipped, not failed.
+
+Usage: python benchmarks/loadtest.py [--candidates 20000] [--requests 400]
+                                     [--concurrency 16] [--update-baseline]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import asyncpg
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / "backend"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baselines" / "loadtest.json"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BENCHMARKS_DIR / "fixtures"))
+
+from documents import resume_pdf, resume_text  # noqa: E402
+from generate_data import (  # noqa: E402
+    LOCATIONS, SKILLS, VISA_STATUSES, Scale, entity_id, interviewer, populate, prepare_schema, start_of_day,
+)
+
+
+# Disposable database ----------------------------------------------------------
+
+@contextlib.asynccontextmanager
+async def database_from_server(admin_dsn: str):
+    name = f"ats_loadtest_{os.getpid()}_{uuid.uuid4().hex[:6]}"
+    admin = await asyncpg.connect(admin_dsn)
+    try:
+        await admin.execute(f'CREATE DATABASE "{name}"')
+        parts = admin_dsn.rsplit("/", 1)
+        query = "?" + parts[1].split("?", 1)[1] if "?" in parts[1] else ""
+        yield f"{parts[0]}/{name}{query}"
+    finally:
+        await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        await admin.close()
+
+
+@contextlib.asynccontextmanager
+async def temporary_cluster():
+    directory = tempfile.mkdtemp(prefix="ats-loadtest-")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    data = os.path.join(directory, "data")
+    try:
+        subprocess.run(["initdb", "-D", data, "-A", "trust", "-U", "postgres"], check=True,
+                       stdout=subprocess.DEVNULL)
+        subprocess.run(["pg_ctl", "-D", data, "-l", os.path.join(directory, "postgres.log"), "-w", "-o",
+                        f"-p {port} -k {directory} -c listen_addresses='' -c fsync=off", "start"],
+                       check=True, stdout=subprocess.DEVNULL)
+        yield f"postgresql://postgres@/postgres?host={directory}&port={port}"
+    finally:
+        subprocess.run(["pg_ctl", "-D", data, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def disposable_database(admin_dsn: Optional[str]):
+    if admin_dsn:
+        return database_from_server(admin_dsn)
+    if shutil.which("initdb") and shutil.which("pg_ctl"):
+        return temporary_cluster()
+    raise SystemExit("No Postgres available: pass --admin-dsn or put initdb/pg_ctl on PATH")
+
+
+# Seed data -------------------------------------------------------------------
+
+async def seed(dsn: str, candidates: int, seed_value: int) -> Dict[str, List[Any]]:
+    scale = Scale.for_candidates(candidates)
+    await populate(dsn, scale, seed_value, start_of_day(), log=lambda line: None)
+    return {
+        "candidate_ids": [entity_id(seed_value, "candidate", i) for i in range(min(candidates, 10_000))],
+        "job_ids": [entity_id(seed_value, "job", i) for i in range(scale.jobs)],
+        "interviewer_emails": [interviewer(i)[1] for i in range(scale.interviewers)],
+    }
+
+
+# Scenarios -------------------------------------------------------------------
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: Callable[[random.Random, Dict[str, Any]], str]
+    body: Optional[Callable[[random.Random, Dict[str, Any]], Any]] = None
+    files: Optional[Callable[[random.Random], Dict[str, Any]]] = None
+
+
+def search_body(rng: random.Random, seeded: Dict[str, Any]) -> Dict[str, Any]:
+    return {"locations": rng.sample(LOCATIONS, 2), "visa_status": [rng.choice(VISA_STATUSES)],
+            "min_score": rng.choice([None, 5.0, 7.0]), "required_skills": rng.sample(SKILLS, 1)}
+
+
+def period(days: int) -> str:
+    end = datetime.now(timezone.utc)
+    return f"start_date={(end - timedelta(days=days)).date()}T00:00:00Z&end_date={end.date()}T23:59:59Z"
+
+
+SCENARIOS = [
+    Scenario("jobs_feed", "GET", lambda rng, s: "/api/jobs?status=active"),
+    Scenario("candidates_list", "GET", lambda rng, s: "/api/candidates"),
+    Scenario("applications_list", "GET", lambda rng, s: "/api/applications"),
+    Scenario("advanced_search", "POST", lambda rng, s: "/api/candidates/advanced-search", search_body),
+    Scenario("advanced_search_facets", "POST", lambda rng, s: "/api/candidates/advanced-search/facets", search_body),
+    Scenario("resume_upload", "POST", lambda rng, s: "/api/candidates/upload-resume",
+             files=lambda rng: {"file": ("resume.pdf", resume_pdf(resume_text(rng.randint(0, 999))),
+                                         "application/pdf")}),
+    Scenario("job_matches", "GET", lambda rng, s: f"/api/jobs/{rng.choice(s['job_ids'])}/matches?limit=20"),
+    Scenario("duplicate_candidates", "GET", lambda rng, s: "/api/duplicate-candidates"),
+    Scenario("eeo_report", "GET", lambda rng, s: f"/api/compliance/eeo-report?{period(365)}"),
+    Scenario("eeo_export_csv", "GET", lambda rng, s: f"/api/compliance/exports/eeo?{period(30)}"),
+    Scenario("dashboard_stats", "GET", lambda rng, s: "/api/dashboard/stats"),
+    Scenario("candidate_audit_trail", "GET",
+             lambda rng, s: f"/api/audit-logs?entity_type=candidate&entity_id={rng.choice(s['candidate_ids'])}"),
+    Scenario("interviewer_availability", "POST", lambda rng, s: "/api/interviews/availability",
+             lambda rng, s: {"interviewer_emails": rng.sample(s["interviewer_emails"], 2),
+                             "start": datetime.now(timezone.utc).isoformat(),
+                             "end": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()}),
+]
+
+
+def route_exists(app, method: str, path: str) -> bool:
+    from starlette.routing import Match
+
+    scope = {"type": "http", "method": method, "path": path.split("?", 1)[0], "root_path": ""}
+    return any(route.matches(scope)[0] == Match.FULL for route in app.routes)
+
+
+def scenario_concurrency(path: str, concurrency: int) -> int:
+    """``concurrency`` capped so the route class's limiter never has to shed."""
+    from concurrency import ROUTE_CLASS_LIMITS, classify_route
+
+    route_class = classify_route(path.split("?", 1)[0])
+    if route_class is None:
+        return concurrency
+    _, min_limit, _, max_queue, _ = ROUTE_CLASS_LIMITS[route_class]
+    return min(concurrency, min_limit + max_queue)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile.
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, scenario: Scenario, seeded, requests: int, concurrency: int, seed_value: int):
+    latencies: List[float] = []
+    errors: List[str] = []
+    per_client = max(1, requests // concurrency)
+
+    async def worker(index: int):
+        rng = random.Random(seed_value * 1000 + index)
+        for _ in range(per_client):
+            path = scenario.path(rng, seeded)
+            body = scenario.body(rng, seeded) if scenario.body else None
+            files = scenario.files(rng) if scenario.files else None
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body, files=files)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors.append(f"{response.status_code} {path}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "rps": round(len(latencies) / elapsed, 1),
+        "concurrency": concurrency,
+    }
+
+
+async def run_load(dsn: str, args) -> Dict[str, Any]:
+    os.environ["DATABASE_URL"] = dsn
+    os.environ.setdefault("RUN_MIGRATIONS_ON_STARTUP", "false")
+    import httpx
+    import server
+    from auth import create_access_token
+
+    await prepare_schema(dsn)
+    seeded = await seed(dsn, args.candidates, args.seed)
+    results: Dict[str, Any] = {}
+    token = create_access_token({"sub": "loadtest@example.com", "role": "admin"})
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60,
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            for scenario in SCENARIOS:
+                if args.only and scenario.name not in args.only:
+                    continue
+                sample_path = scenario.path(random.Random(0), seeded)
+                if not route_exists(server.app, scenario.method, sample_path):
+                    results[scenario.name] = {"skipped": "route not registered"}
+                    continue
+                concurrency = scenario_concurrency(sample_path, args.concurrency)
+                await run_scenario(client, scenario, seeded, concurrency, concurrency, args.seed)  # warm-up
+                results[scenario.name] = await run_scenario(
+                    client, scenario, seeded, args.requests, concurrency, args.seed
+                )
+    return results
+
+
+# Reporting -------------------------------------------------------------------
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    failures = []
+    for name, result in results.items():
+        if "skipped" in result:
+            continue
+        if result["errors"]:
+            failures.append(f"{name}: {result['errors']} failed requests (first: {result['first_error']})")
+        previous = baseline.get(name)
+        if not previous or "skipped" in previous:
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {result['p95_ms']} ms vs baseline {previous['p95_ms']} ms")
+        if result["rps"] < previous["rps"] * (1 - tolerance):
+            failures.append(f"{name}: {result['rps']} req/s vs baseline {previous['rps']} req/s")
+    return failures
+
+
+def print_report(results: Dict[str, Any]):
+    print(f"{'scenario':<28}{'conc':>5}{'reqs':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<28}  skipped ({result['skipped']})")
+            continue
+        print(f"{name:<28}{result['concurrency']:>5}{result['requests']:>7}{result['errors']:>5}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['rps']:>10}")
+
+
+async def main_async(args) -> int:
+    async with disposable_database(args.admin_dsn) as dsn:
+        results = await run_load(dsn, args)
+    print_report(results)
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    else:
+        print(f"No baseline at {args.baseline}; checking errors only (record one with --update-baseline)")
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admin-dsn", default=os.environ.get("LOADTEST_ADMIN_DSN"))
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=400, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95/throughput change")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
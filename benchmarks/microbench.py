@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the CPU-bound backend hot paths, with history.
+
+Each benchmark runs one operation on a representative fixture, such as
+a two-page resume PDF, a large email template or 10k candidate rows. It
+is timed with ``timeit``, and the best and median per-call times over
+``--repeat`` rounds are kept.
+
+Every run appends a record to ``benchmarks/history/microbench.jsonl``
+with the git commit, host and Python version. ``--check`` compares the
+run with the latest earlier record from the same host and Python
+version. It exits 1 if any benchmark's best time is more than
+``--threshold`` slower, so a slowdown shows up in review alongside the
+history diff.
+
+Resume skill extraction and visa evaluation live in parts of server.py
+that are not in this tree. ``candidate_scoring`` covers the visa
+weighting through ``matching.match_score``.
+
+Usage: python benchmarks/microbench.py [--filter NAME] [--repeat 7] [--check] [--no-save]
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "backend"))
+sys.path.insert(0, str(BENCHMARKS_DIR / "fixtures"))
+
+HISTORY = BENCHMARKS_DIR / "history" / "microbench.jsonl"
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function that returns the zero-argument callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("pdf_text_extraction")
+def _pdf_text_extraction():
+    import PyPDF2
+    from documents import resume_pdf, resume_text
+
+    pdf = resume_pdf(resume_text(7, roles=12))
+
+    def run():
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf))
+        return "\n".join(page.extract_text() for page in reader.pages)
+    return run
+
+
+@benchmark("candidate_scoring")
+def _candidate_scoring():
+    from matching import score_pairs
+    from bench_json import candidate_rows
+
+    rng = random.Random(3)
+    candidates = candidate_rows(2000)
+    for candidate in candidates:
+        candidate.update(relocation_willing=rng.choice(["yes", "no", "maybe"]), housing_needed=rng.random() < 0.3,
+                         childcare_cert="Diploma in Early Childhood Education")
+    jobs = [{"id": uuid.uuid4(), "location": "Mount Isa", "sponsorship_eligible": i % 2 == 0,
+             "relocation_support": True, "housing_support": i % 3 == 0,
+             "requirements": ["Diploma in Early Childhood Education", "2+ years experience", "first aid"]}
+            for i in range(10)]
+    return lambda: score_pairs(jobs, candidates)
+
+
+@benchmark("render_email_template")
+def _render_email_template():
+    from server import render_email_template
+
+    template = (
+        "<h1>Hello {{ candidate.full_name }}</h1>\n"
+        "{% for job in jobs %}<div class='job'><h2>{{ job.title }} - {{ job.location }}</h2>"
+        "<p>{{ job.description }}</p><ul>{% for r in job.requirements %}<li>{{ r }}</li>{% endfor %}</ul>"
+        "{% if job.sponsorship_eligible %}<p>Visa sponsorship available</p>{% endif %}</div>\n{% endfor %}"
+        "<p>Regards,<br>{{ recruiter }}</p>" + "<p>{{ footer }}</p>" * 20
+    )
+    merge_data = {
+        "candidate": {"full_name": "Alex Example"},
+        "recruiter": "Regional Childcare Recruitment",
+        "footer": "You are receiving this email because you applied for a role with us. " * 3,
+        "jobs": [{"title": f"Educator {i}", "location": "Mount Isa", "description": "Play-based learning. " * 20,
+                  "requirements": ["Certificate III", "First Aid", "Blue Card"], "sponsorship_eligible": i % 2 == 0}
+                 for i in range(25)],
+    }
+    return lambda: render_email_template(template, merge_data)
+
+
+@benchmark("search_sql_build")
+def _search_sql_build():
+    from candidate_search import build_faceted_search_query, build_search_query
+
+    filters = SimpleNamespace(
+        locations=["Mount Isa", "Moranbah"], visa_status=["citizen", "permanent"], sponsorship_needed=False,
+        min_experience_years=2, max_experience_years=15, rural_experience=True, min_score=6.0, max_score=None,
+        available_from=date(2026, 1, 1), relocation_willing=None, required_skills=["first aid", "literacy"],
+        application_status=None, applied_after=None, applied_before=None, search_query="kindergarten teacher",
+    )
+
+    def run():
+        build_search_query(filters)
+        return build_faceted_search_query(filters)
+    return run
+
+
+@benchmark("webhook_hmac_signing")
+def _webhook_hmac_signing():
+    from background_jobs import webhook_signature
+
+    body = json.dumps({"event": "job.updated", "jobs": [{"id": str(uuid.uuid4()), "title": "Educator " * 10}
+                                                         for _ in range(50)]}).encode()
+    return lambda: webhook_signature("careers-webhook-secret", body)
+
+
+@benchmark("json_large_rowset")
+def _json_large_rowset():
+    from fast_json import dumps
+    from bench_json import candidate_rows
+
+    rows = candidate_rows(10000)
+    return lambda: dumps(rows)
+
+
+@benchmark("dedup_fingerprint")
+def _dedup_fingerprint():
+    from dedup import fingerprint
+    from documents import resume_text
+
+    candidate = {"id": uuid.uuid4(), "full_name": "Alex Example", "email": "Alex.Example@Example.com",
+                 "phone": "+61 7 4000 0000", "resume_text": resume_text(11)}
+    return lambda: fingerprint(candidate)
+
+
+def measure(run: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best_us": round(min(timings) * 1e6, 2), "median_us": round(statistics.median(timings) * 1e6, 2),
+            "loops": number}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BENCHMARKS_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_record(host: str, python: str) -> Dict:
+    if not HISTORY.exists():
+        return {}
+    matching = [record for record in map(json.loads, HISTORY.read_text().splitlines())
+                if record["host"] == host and record["python"] == python]
+    return matching[-1] if matching else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", nargs="*", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs previous run")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a slowdown beyond --threshold")
+    parser.add_argument("--no-save", action="store_true", help="do not append to the history file")
+    args = parser.parse_args()
+
+    host, python = socket.gethostname(), platform.python_version()
+    previous = previous_record(host, python).get("results", {})
+    results, slower = {}, []
+    print(f"{'benchmark':<24}{'best':>16}{'median':>16}{'vs previous':>14}")
+    for name, setup in BENCHMARKS.items():
+        if args.filter and not any(part in name for part in args.filter):
+            continue
+        results[name] = measure(setup(), args.repeat)
+        change = ""
+        if name in previous:
+            ratio = results[name]["best_us"] / previous[name]["best_us"] - 1
+            change = f"{ratio:+.1%}"
+            if ratio > args.threshold:
+                slower.append(f"{name}: {previous[name]['best_us']} us -> {results[name]['best_us']} us")
+        print(f"{name:<24}{results[name]['best_us']:>13.1f} us{results[name]['median_us']:>13.1f} us{change:>14}")
+
+    if not args.no_save:
+        HISTORY.parent.mkdir(parents=True, exist_ok=True)
+        record = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+                  "host": host, "python": python, "results": results}
+        with HISTORY.open("a") as history:
+            history.write(json.dumps(record, sort_keys=True) + "\n")
+    for line in slower:
+        print(f"SLOWER {line}")
+    if args.check and slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,8 @@ set -e
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Start gunicorn-managed uvicorn workers (see backend/gunicorn.conf.py)
+gunicorn server:app --config gunicorn.conf.py &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."
@@ -21,8 +21,8 @@ fi
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# Handle termination signals; wait for gunicorn to drain in-flight requests
+trap 'kill $BACKEND_PID $NGINX_PID; wait $BACKEND_PID; exit 0' SIGTERM SIGINT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
@@ -0,0 +1,24 @@
+"""Stand-ins for AdvancedSearchFilter used by the search tests."""
+from enum import Enum
+from types import SimpleNamespace
+
+
+class VisaStatus(str, Enum):
+    NEEDS_SPONSORSHIP = "needs_sponsorship"
+    CITIZEN = "citizen"
+
+
+class ApplicationStatus(str, Enum):
+    OFFER = "offer"
+
+
+def search_filters(**overrides):
+    fields = dict(
+        locations=None, visa_status=None, sponsorship_needed=None,
+        min_experience_years=None, max_experience_years=None, rural_experience=None,
+        min_score=None, max_score=None, available_from=None, relocation_willing=None,
+        required_skills=None, application_status=None, applied_after=None,
+        applied_before=None, search_query=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
@@ -0,0 +1,142 @@
+"""Partition naming and retention rules, plus partition creation, routing
+and archiving against a disposable Postgres when TEST_DATABASE_URL is set."""
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+
+from audit_partitions import (
+    add_months, archive_partition, audit_partition_names, ensure_future_partitions, expired_partitions,
+    month_bounds, partition_month, partition_name,
+)
+from migrate import apply_migrations, discover_migrations
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+MIGRATION = Path(__file__).resolve().parents[1] / "backend" / "migrations" / "0008_audit_log_partitions.sql"
+
+
+class AuditPartitionTest(unittest.TestCase):
+    def test_month_arithmetic_crosses_years(self):
+        self.assertEqual(add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+
+    def test_names_round_trip(self):
+        self.assertEqual(partition_name(date(2025, 3, 1)), "audit_logs_2025_03")
+        self.assertEqual(partition_month("audit_logs_2025_03"), date(2025, 3, 1))
+        self.assertIsNone(partition_month("audit_logs_default"))
+
+    def test_only_months_wholly_outside_retention_expire(self):
+        names = ["audit_logs_default", "audit_logs_2023_04", "audit_logs_2023_05", "audit_logs_2023_06"]
+        self.assertEqual(expired_partitions(names, date(2025, 5, 20), retention_months=24), ["audit_logs_2023_04"])
+
+    def test_migration_partitions_by_timestamp_with_default(self):
+        sql = MIGRATION.read_text()
+        self.assertIn("PARTITION BY RANGE (timestamp)", sql)
+        self.assertIn("PARTITION OF audit_logs DEFAULT", sql)
+        self.assertIn("PRIMARY KEY (id, timestamp)", sql)
+
+    def test_month_bounds_are_utc(self):
+        start, end = month_bounds(date(2025, 12, 1))
+        self.assertEqual(start, datetime(2025, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(end, datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+    def test_a_failing_month_does_not_stop_the_others(self):
+        class Connection:
+            @asynccontextmanager
+            async def transaction(self):
+                yield
+
+            async def fetchval(self, query, *args):
+                if "audit_logs_default" in query:
+                    return False
+                if args[0] == date(2025, 6, 1):
+                    raise asyncpg.PostgresError("default partition would be violated")
+                return partition_name(args[0])
+
+        with self.assertLogs(level="ERROR"):
+            created = asyncio.run(ensure_future_partitions(Connection(), date(2025, 5, 20), ahead=2))
+        self.assertEqual(created, ["audit_logs_2025_05", "audit_logs_2025_07"])
+
+
+def month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class AuditPartitionDatabaseTest(unittest.TestCase):
+    """Partitions are created ahead, rows land by UTC month, and expiry drops the right one"""
+
+    def setUp(self):
+        self.schema = f"audit_partitions_{uuid.uuid4().hex[:8]}"
+        self.today = datetime.now(timezone.utc).date()
+        self.current = self.today.replace(day=1)
+        self.loop = asyncio.new_event_loop()
+        self.connection = self.run_async(asyncpg.connect(TEST_DATABASE_URL))
+        self.run_async(self.connection.execute(f"CREATE SCHEMA {self.schema}"))
+        self.run_async(self.connection.execute(f"SET search_path TO {self.schema}, public"))
+        migrations = [m for m in discover_migrations() if m.path.name == MIGRATION.name]
+        self.run_async(apply_migrations(self.connection, migrations))
+
+    def tearDown(self):
+        self.run_async(self.connection.execute(f"DROP SCHEMA {self.schema} CASCADE"))
+        self.run_async(self.connection.close())
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def insert(self, at: datetime) -> str:
+        """Insert an audit row at ``at`` and return the partition it landed in."""
+        return self.run_async(self.connection.fetchval('''
+            INSERT INTO audit_logs (action, timestamp) VALUES ('candidate.viewed', $1)
+            RETURNING tableoid::regclass::text
+        ''', at))
+
+    def test_rows_route_across_the_month_boundary(self):
+        next_month = add_months(self.current, 1)
+        created = self.run_async(ensure_future_partitions(self.connection, self.today, ahead=1))
+        self.assertEqual(created, [partition_name(self.current), partition_name(next_month)])
+        boundary = month_start(next_month)
+        self.assertEqual(self.insert(boundary - timedelta(microseconds=1)), partition_name(self.current))
+        self.assertEqual(self.insert(boundary), partition_name(next_month))
+
+    def test_rows_stranded_in_default_move_to_the_new_partition(self):
+        late_month = add_months(self.current, 6)
+        self.assertEqual(self.insert(month_start(late_month) + timedelta(days=2)), "audit_logs_default")
+        created = self.run_async(ensure_future_partitions(self.connection, self.today, ahead=6))
+        self.assertIn(partition_name(late_month), created)
+        self.assertEqual(self.run_async(self.connection.fetchval("SELECT COUNT(*) FROM audit_logs_default")), 0)
+        self.assertEqual(self.run_async(self.connection.fetchval(
+            f"SELECT COUNT(*) FROM {partition_name(late_month)}"
+        )), 1)
+        # The default partition is attached again and still catches stray rows.
+        self.assertEqual(self.insert(month_start(add_months(late_month, 3))), "audit_logs_default")
+
+    def test_retention_archives_and_drops_only_expired_partitions(self):
+        expired_month, kept_month = add_months(self.current, -25), add_months(self.current, -24)
+        for month in (expired_month, kept_month):
+            self.run_async(self.connection.fetchval("SELECT create_audit_log_partition($1)", month))
+            self.assertEqual(self.insert(month_start(month) + timedelta(days=3)), partition_name(month))
+
+        names = self.run_async(audit_partition_names(self.connection))
+        expired = expired_partitions(names, self.today, retention_months=24)
+        self.assertEqual(expired, [partition_name(expired_month)])
+
+        archive_dir = Path(tempfile.mkdtemp())
+        target = self.run_async(archive_partition(self.connection, expired[0], archive_dir))
+        with gzip.open(target, "rt") as archive:
+            lines = archive.read().splitlines()
+        self.assertEqual(len(lines), 2)  # header + the one row
+        self.assertIn("candidate.viewed", lines[1])
+
+        remaining = self.run_async(audit_partition_names(self.connection))
+        self.assertNotIn(partition_name(expired_month), remaining)
+        self.assertIn(partition_name(kept_month), remaining)
+        self.assertEqual(self.run_async(self.connection.fetchval("SELECT COUNT(*) FROM audit_logs")), 1)
@@ -0,0 +1,44 @@
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from audit_query import (
+    MAX_AUDIT_PAGE, InvalidCursorError, build_audit_query, decode_cursor, encode_cursor, paginate,
+)
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class AuditQueryTest(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        entry_id = uuid.uuid4()
+        self.assertEqual(decode_cursor(encode_cursor(NOW, entry_id)), (NOW, entry_id))
+        with self.assertRaises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_entity_history_uses_keyset_not_offset(self):
+        entity_id = uuid.uuid4()
+        cursor = encode_cursor(NOW, uuid.uuid4())
+        query, values = build_audit_query(entity_type="candidate", entity_id=entity_id, cursor=cursor, limit=50)
+        self.assertIn("entity_type = $1::text AND entity_id = $2::uuid", query)
+        self.assertIn("(timestamp, id) < ($3::timestamptz, $4::uuid)", query)
+        self.assertIn("ORDER BY timestamp DESC, id DESC", query)
+        self.assertNotIn("OFFSET", query)
+        self.assertEqual(values[-1], 51)
+
+    def test_details_filter_uses_containment(self):
+        query, values = build_audit_query(details={"field": "status"})
+        self.assertIn("details @> $1::jsonb", query)
+        self.assertEqual(values[0], '{"field": "status"}')
+
+    def test_page_size_is_capped(self):
+        _, values = build_audit_query(limit=10_000)
+        self.assertEqual(values[-1], MAX_AUDIT_PAGE + 1)
+
+    def test_next_cursor_only_when_more_rows(self):
+        rows = [{"id": uuid.uuid4(), "timestamp": NOW - timedelta(minutes=i), "details": "{}"} for i in range(3)]
+        page = paginate([dict(r) for r in rows], limit=2)
+        self.assertEqual(len(page["entries"]), 2)
+        self.assertEqual(decode_cursor(page["next_cursor"]), (rows[1]["timestamp"], rows[1]["id"]))
+        self.assertEqual(page["entries"][0]["details"], {})
+        self.assertIsNone(paginate([dict(r) for r in rows], limit=3)["next_cursor"])
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from jose import JWTError
+
+import auth
+import server
+
+
+class PasswordHashingTest(unittest.TestCase):
+    """bcrypt hashing runs in the auth thread pool"""
+
+    def test_hash_and_verify_round_trip(self):
+        async def run():
+            hashed = await auth.hash_password("shift-change")
+            return (
+                await auth.verify_password("shift-change", hashed),
+                await auth.verify_password("wrong", hashed),
+            )
+
+        self.assertEqual(asyncio.run(run()), (True, False))
+
+
+class TokenClaimsCacheTest(unittest.TestCase):
+    """Decoded JWT claims are cached by token digest"""
+
+    def setUp(self):
+        auth.token_claims_cache.clear()
+
+    def test_second_decode_skips_verification(self):
+        token = auth.create_access_token({"sub": "recruiter@example.com"})
+        self.assertEqual(auth.decode_access_token(token)["sub"], "recruiter@example.com")
+        with patch.object(auth.jwt, "decode", side_effect=AssertionError("not cached")):
+            self.assertEqual(auth.decode_access_token(token)["sub"], "recruiter@example.com")
+
+    def test_expired_token_is_rejected(self):
+        token = auth.create_access_token({"sub": "a"}, expires_delta=timedelta(seconds=-1))
+        with self.assertRaises(JWTError):
+            auth.decode_access_token(token)
+
+    def test_cache_entry_never_outlives_exp(self):
+        cache = auth.TokenClaimsCache(ttl_seconds=60)
+        cache.set("token", {"sub": "a", "exp": 0})
+        self.assertIsNone(cache.get("token"))
+
+    def test_lru_eviction(self):
+        cache = auth.TokenClaimsCache(max_entries=2)
+        cache.set("a", {"sub": "a"})
+        cache.set("b", {"sub": "b"})
+        cache.get("a")
+        cache.set("c", {"sub": "c"})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+
+class AdminRoutesTest(unittest.TestCase):
+    """Operational and audit endpoints reject anyone but admins"""
+
+    ADMIN_ROUTES = [
+        ("GET", "/api/audit-logs"),
+        ("GET", "/api/system/query-stats"),
+        ("DELETE", "/api/system/query-stats"),
+        ("GET", "/api/system/scheduler"),
+        ("GET", "/api/system/db-routing"),
+        ("GET", "/api/system/profiler"),
+        ("GET", "/api/system/search-statement-cache"),
+    ]
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+
+    def request(self, method, path, role=None):
+        headers = {}
+        if role is not None:
+            token = auth.create_access_token({"sub": f"{role}@example.com", "role": role})
+            headers["Authorization"] = f"Bearer {token}"
+        return self.client.request(method, path, headers=headers)
+
+    def test_anonymous_and_non_admin_callers_are_rejected(self):
+        for method, path in self.ADMIN_ROUTES:
+            with self.subTest(route=f"{method} {path}"):
+                self.assertIn(self.request(method, path).status_code, (401, 403))
+                self.assertEqual(self.request(method, path, role="recruiter").status_code, 403)
+
+
+class AuthenticatedRoutesTest(unittest.TestCase):
+    """Candidate and scheduling routes reject callers without a token"""
+
+    AUTHENTICATED_ROUTES = [
+        ("POST", "/api/candidates/advanced-search/facets"),
+        ("POST", "/api/saved-searches"),
+        ("GET", "/api/saved-searches"),
+        ("GET", f"/api/saved-searches/{uuid.uuid4()}/results"),
+        ("GET", f"/api/saved-searches/{uuid.uuid4()}/new-matches"),
+        ("GET", f"/api/jobs/{uuid.uuid4()}/matches"),
+        ("GET", "/api/duplicate-candidates"),
+        ("GET", "/api/interviews/conflicts"),
+        ("POST", "/api/interviews/availability"),
+    ]
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+
+    def test_anonymous_callers_are_rejected(self):
+        for method, path in self.AUTHENTICATED_ROUTES:
+            with self.subTest(route=f"{method} {path}"):
+                self.assertIn(self.client.request(method, path, json={}).status_code, (401, 403))
+
+
+if __name__ == "__main__":
+    unittest.main()
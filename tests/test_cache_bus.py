@@ -0,0 +1,145 @@
+import asyncio
+import json
+import multiprocessing
+import unittest
+import uuid
+from unittest import mock
+
+from cache_bus import ALL_KEYS, InvalidationBus, NamespacedCache, channel_for
+
+
+class FakeConnection:
+    def __init__(self, in_transaction: bool = False):
+        self.executed = []
+        self.in_transaction = in_transaction
+
+    def is_in_transaction(self):
+        return self.in_transaction
+
+    async def execute(self, query, *args):
+        self.executed.append((query, args))
+
+
+class FakeListenerConnection:
+    def add_termination_listener(self, callback):
+        pass
+
+    async def add_listener(self, channel, callback):
+        pass
+
+
+async def fake_connect(dsn):
+    return FakeListenerConnection()
+
+
+def connect_in_child(bus, results):
+    with mock.patch("cache_bus.asyncpg.connect", fake_connect):
+        asyncio.run(bus.connect())
+    results.put(bus.worker_id)
+
+
+class NamespacedCacheTest(unittest.TestCase):
+    """NamespacedCache TTL and invalidation behaviour"""
+
+    def test_expired_entries_are_dropped(self):
+        cache = NamespacedCache("jobs", ttl_seconds=60)
+        cache.set("active", [1, 2], ttl_seconds=-1)
+        self.assertIsNone(cache.get("active"))
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_oldest_when_full(self):
+        cache = NamespacedCache("jobs", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_invalidate_all(self):
+        cache = NamespacedCache("jobs")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate(ALL_KEYS)
+        self.assertEqual(len(cache), 0)
+
+    def test_non_string_keys_match_their_string_form(self):
+        cache = NamespacedCache("candidates")
+        candidate_id = uuid.uuid4()
+        cache.set(candidate_id, "profile")
+        cache.set((candidate_id, 3), "matches")
+        self.assertEqual(cache.get(str(candidate_id)), "profile")
+        cache.invalidate(str(candidate_id))
+        self.assertIsNone(cache.get(candidate_id))
+        self.assertEqual(cache.get((candidate_id, 3)), "matches")
+
+
+class InvalidationBusTest(unittest.TestCase):
+    """InvalidationBus dispatch without a live Postgres listener"""
+
+    def setUp(self):
+        self.bus = InvalidationBus("postgresql://unused")
+        self.cache = self.bus.register(NamespacedCache("templates"))
+        self.cache.set("welcome", "cached")
+        self.cache.set("reminder", "cached")
+
+    def test_publish_invalidates_locally_and_notifies(self):
+        connection = FakeConnection()
+        asyncio.run(self.bus.publish(connection, "templates", "welcome"))
+        self.assertIsNone(self.cache.get("welcome"))
+        self.assertEqual(self.cache.get("reminder"), "cached")
+        query, (channel, payload) = connection.executed[0]
+        self.assertIn("pg_notify", query)
+        self.assertEqual(channel, channel_for("templates"))
+        self.assertEqual(json.loads(payload)["key"], "welcome")
+
+    def test_publish_in_transaction_waits_for_commit(self):
+        connection = FakeConnection(in_transaction=True)
+        asyncio.run(self.bus.publish(connection, "templates", "welcome"))
+        self.assertEqual(self.cache.get("welcome"), "cached")
+        # Postgres delivers our own NOTIFY once the transaction commits
+        _, (channel, payload) = connection.executed[0]
+        self.bus._on_notification(None, 1, channel, payload)
+        self.assertIsNone(self.cache.get("welcome"))
+
+    def test_publish_normalizes_keys(self):
+        cache = self.bus.register(NamespacedCache("candidates"))
+        candidate_id = uuid.uuid4()
+        cache.set((candidate_id, 3), "matches")
+        connection = FakeConnection(in_transaction=True)
+        asyncio.run(self.bus.publish(connection, "candidates", (candidate_id, 3)))
+        _, (channel, payload) = connection.executed[0]
+        self.bus._on_notification(None, 1, channel, payload)
+        self.assertIsNone(cache.get((candidate_id, 3)))
+
+    def test_notification_from_other_worker(self):
+        payload = json.dumps({"key": "reminder", "origin": "other-worker"})
+        self.bus._on_notification(None, 1, channel_for("templates"), payload)
+        self.assertIsNone(self.cache.get("reminder"))
+        self.assertEqual(self.cache.get("welcome"), "cached")
+
+    def test_own_notification_is_applied(self):
+        payload = json.dumps({"key": "welcome", "origin": self.bus.worker_id})
+        self.bus._on_notification(None, 1, channel_for("templates"), payload)
+        self.assertIsNone(self.cache.get("welcome"))
+
+
+class ForkedWorkerIdTest(unittest.TestCase):
+    """A bus built before gunicorn forks gets a distinct id in every worker"""
+
+    def test_forked_workers_get_their_own_ids(self):
+        bus = InvalidationBus("postgresql://unused")
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [context.Process(target=connect_in_child, args=(bus, results)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        ids = {results.get(timeout=10) for _ in workers}
+        for worker in workers:
+            worker.join(10)
+        self.assertEqual(len(ids), 2)
+        self.assertNotIn(bus.worker_id, ids)
+        self.assertEqual({worker_id.split("-")[0] for worker_id in ids}, {str(worker.pid) for worker in workers})
+
+
+if __name__ == "__main__":
+    unittest.main()
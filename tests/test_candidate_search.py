@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from datetime import datetime
+
+from candidate_search import (
+    FACET_COLUMNS, PreparedStatementCache, build_faceted_search_query, build_search_clauses, build_search_query,
+)
+from tests.search_fixtures import ApplicationStatus, VisaStatus, search_filters
+
+
+class SearchShapeTest(unittest.TestCase):
+    """Filter combinations collapse onto a bounded set of statements"""
+
+    def test_same_filters_share_one_statement(self):
+        first, _ = build_search_query(search_filters(locations=["Mount Isa"], min_experience_years=2))
+        second, values = build_search_query(search_filters(locations=["Cairns", "Roma"], min_experience_years=5))
+        self.assertEqual(first, second)
+        self.assertEqual(values, [["Cairns", "Roma"], 5, None])
+
+    def test_unset_filters_add_no_clause(self):
+        query, values = build_search_query(search_filters())
+        self.assertEqual(query, "SELECT * FROM candidates WHERE TRUE")
+        self.assertEqual(values, [])
+
+    def test_no_null_guards(self):
+        # "$n IS NULL OR ..." keeps generic plans off the indexes
+        query, values = build_search_query(search_filters(
+            locations=["Mount Isa"], rural_experience=True, min_experience_years=2,
+            search_query="diploma", available_from=datetime(2025, 7, 1), relocation_willing=["yes"],
+        ))
+        self.assertNotIn("IS NULL", query)
+        self.assertIn("availability_start BETWEEN ", query)
+        self.assertIn("%diploma%", values)
+
+    def test_range_bounds_share_one_statement(self):
+        low, low_values = build_search_query(search_filters(min_score=5.0))
+        both, _ = build_search_query(search_filters(min_score=5.0, max_score=10.0))
+        self.assertEqual(low, both)
+        self.assertEqual(low_values[:2], [5.0, None])
+
+    def test_filters_change_shape(self):
+        _, _, bare = build_search_clauses(search_filters())
+        _, _, driven = build_search_clauses(search_filters(
+            visa_status=[VisaStatus.NEEDS_SPONSORSHIP], application_status=[ApplicationStatus.OFFER],
+        ))
+        _, _, available = build_search_clauses(search_filters(available_from=datetime(2025, 7, 1)))
+        self.assertEqual(bare, 0)
+        self.assertNotEqual(driven, bare)
+        self.assertNotIn(available, (bare, driven))
+
+    def test_enum_values_are_bound(self):
+        _, values = build_search_query(search_filters(visa_status=[VisaStatus.CITIZEN]))
+        self.assertEqual(values[0], ["citizen"])
+
+    def test_faceted_query_reuses_search_clauses(self):
+        filters = search_filters(locations=["Mount Isa"], rural_experience=True)
+        query, values = build_faceted_search_query(filters)
+        where, where_values, _ = build_search_clauses(filters)
+        self.assertIn(where, query)
+        self.assertEqual(values, where_values)
+        self.assertIn("GROUPING SETS ((location), (visa_status), (relocation_willing), (status))", query)
+        self.assertEqual(len(FACET_COLUMNS), query.count("WHEN GROUPING("))
+
+
+class FakeStatement:
+    async def fetch(self, *args):
+        return list(args)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared = 0
+
+    async def prepare(self, query):
+        self.prepared += 1
+        return FakeStatement()
+
+
+class PreparedStatementCacheTest(unittest.TestCase):
+    def test_repeat_queries_reuse_statement(self):
+        cache = PreparedStatementCache()
+        connection = FakeConnection()
+
+        async def run():
+            for _ in range(3):
+                await cache.fetch(connection, "SELECT $1::int", 1)
+
+        asyncio.run(run())
+        self.assertEqual(connection.prepared, 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["hit_rate"], round(2 / 3, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
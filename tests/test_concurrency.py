@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from concurrency import ROUTE_CLASS_LIMITS, AdaptiveLimiter, ConcurrencyLimitMiddleware, build_limiters, classify_route, drain_limiters
+
+
+class ClassifyRouteTest(unittest.TestCase):
+    def test_route_classes(self):
+        self.assertEqual(classify_route("/api/candidates/advanced-search"), "search")
+        self.assertEqual(classify_route("/api/candidates/123/upload-resume"), "uploads")
+        self.assertEqual(classify_route("/api/compliance/eeo-report"), "reports")
+        self.assertEqual(classify_route("/api/candidates/123"), "crud")
+        self.assertIsNone(classify_route("/docs"))
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    """Queueing, shedding and latency-driven limit changes"""
+
+    def test_sheds_when_queue_is_full(self):
+        async def run():
+            limiter = AdaptiveLimiter("reports", 1, 1, 4, max_queue=1, queue_timeout=1)
+            self.assertTrue(await limiter.acquire())
+            queued = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            self.assertFalse(await limiter.acquire())
+            limiter.release(0.01)
+            self.assertTrue(await queued)
+            return limiter
+
+        limiter = asyncio.run(run())
+        self.assertEqual(limiter.shed, 1)
+        self.assertEqual(limiter.in_flight, 1)
+
+    def test_queue_timeout_sheds(self):
+        async def run():
+            limiter = AdaptiveLimiter("reports", 1, 1, 4, max_queue=4, queue_timeout=0.01)
+            await limiter.acquire()
+            return await limiter.acquire(), limiter
+
+        acquired, limiter = asyncio.run(run())
+        self.assertFalse(acquired)
+        self.assertEqual(limiter.queued, 0)
+
+    def test_limit_shrinks_when_latency_rises(self):
+        limiter = AdaptiveLimiter("search", 16, 2, 32, 32, 5)
+        limiter.in_flight = 100
+        for _ in range(10):
+            limiter.release(0.01)
+        healthy = limiter.limit
+        for _ in range(50):
+            limiter.release(0.5)
+        self.assertGreater(healthy, 16)
+        self.assertLess(limiter.limit, healthy)
+
+    def test_small_limits_shrink_below_their_start_under_load(self):
+        for name, (initial, min_limit, max_limit, max_queue, timeout) in ROUTE_CLASS_LIMITS.items():
+            with self.subTest(route_class=name):
+                limiter = AdaptiveLimiter(name, initial, min_limit, max_limit, max_queue, timeout)
+                limiter.in_flight = 1000
+                for _ in range(10):
+                    limiter.release(0.05)
+                for _ in range(200):
+                    limiter.release(0.5)  # sustained 10x latency
+                self.assertLess(limiter.limit, initial)
+                self.assertEqual(int(limiter.limit), min_limit)
+
+
+class DrainTest(unittest.TestCase):
+    """Shutdown: running requests finish, new ones are shed"""
+
+    def test_in_flight_requests_finish_and_new_ones_are_shed(self):
+        async def run():
+            limiters = build_limiters({"crud": (1, 1, 1, 4, 1.0)})
+            limiter = limiters["crud"]
+            finished = []
+
+            async def request(duration):
+                if not await limiter.acquire():
+                    return "shed"
+                await asyncio.sleep(duration)
+                finished.append(duration)
+                limiter.release(duration)
+                return "served"
+
+            running = asyncio.ensure_future(request(0.05))
+            queued = asyncio.ensure_future(request(0.01))
+            await asyncio.sleep(0)
+            drained = asyncio.ensure_future(drain_limiters(limiters, timeout=1))
+            await asyncio.sleep(0)
+            late = await request(0.01)
+            return await running, await queued, late, await drained, finished, limiter
+
+        running, queued, late, drained, finished, limiter = asyncio.run(run())
+        self.assertEqual((running, queued, late), ("served", "served", "shed"))
+        self.assertTrue(drained)
+        self.assertEqual(finished, [0.05, 0.01])
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_drain_times_out_on_stuck_requests(self):
+        async def run():
+            limiters = build_limiters({"crud": (1, 1, 1, 4, 1.0)})
+            await limiters["crud"].acquire()
+            return await drain_limiters(limiters, timeout=0.05)
+
+        self.assertFalse(asyncio.run(run()))
+
+    def test_draining_rejection_closes_connection(self):
+        app = FastAPI()
+
+        @app.get("/api/candidates")
+        async def candidates():
+            return []
+
+        limiters = build_limiters({"crud": (1, 1, 1, 4, 1.0)})
+        limiters["crud"].drain()
+        app.add_middleware(ConcurrencyLimitMiddleware, limiters=limiters)
+        response = TestClient(app).get("/api/candidates")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["connection"], "close")
+
+
+class ConcurrencyLimitMiddlewareTest(unittest.TestCase):
+    def test_rejects_with_retry_after(self):
+        app = FastAPI()
+
+        @app.get("/api/compliance/eeo-report")
+        async def report():
+            return {"ok": True}
+
+        limiters = build_limiters({"reports": (1, 1, 1, 0, 0.01)})
+        limiters["reports"].in_flight = 1
+        app.add_middleware(ConcurrencyLimitMiddleware, limiters=limiters)
+        response = TestClient(app).get("/api/compliance/eeo-report")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("retry-after", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
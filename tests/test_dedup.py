@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+import uuid
+
+from cpu_pool import run_cpu_bound, shutdown_cpu_pool
+from dedup import DUPLICATE_THRESHOLD, compare, fingerprint, fingerprint_all, normalize_email, normalize_phone
+
+RESUME = (
+    "Diploma qualified early childhood educator with five years experience in regional "
+    "long day care centres, leading toddler rooms, planning play based programs and "
+    "working closely with families in Mount Isa and Cloncurry."
+)
+
+
+def candidate(**fields):
+    base = {"id": uuid.uuid4(), "email": None, "phone": None, "full_name": None, "resume_text": None}
+    base.update(fields)
+    return base
+
+
+class NormalizationTest(unittest.TestCase):
+    def test_phone(self):
+        self.assertEqual(normalize_phone("+61 412 345 678"), "0412345678")
+        self.assertEqual(normalize_phone("0412-345-678"), "0412345678")
+        self.assertIsNone(normalize_phone("123"))
+
+    def test_email(self):
+        self.assertEqual(normalize_email(" Jane.Smith+careers@Example.com"), ("janesmith@example.com", "janesmith"))
+        self.assertEqual(normalize_email("not-an-email"), (None, None))
+
+
+class DuplicateScoringTest(unittest.TestCase):
+    """Blocking keys and similarity scoring for likely duplicates"""
+
+    def test_reordered_name_and_same_resume_is_duplicate(self):
+        a = fingerprint(candidate(full_name="Jane Smith", email="jane.smith@gmail.com", resume_text=RESUME))
+        b = fingerprint(candidate(full_name="Smith, Jane", email="jsmith@outlook.com", resume_text=RESUME))
+        self.assertTrue(set(a["keys"]) & set(b["keys"]))
+        score, reasons = compare(a, b)
+        self.assertGreaterEqual(score, DUPLICATE_THRESHOLD)
+        self.assertEqual(reasons, ["name", "resume"])
+
+    def test_same_phone_and_similar_name(self):
+        a = fingerprint(candidate(full_name="Jonathan Lee", phone="0412 345 678"))
+        b = fingerprint(candidate(full_name="Jonathon Lee", phone="+61412345678"))
+        self.assertIn("phone:0412345678", set(a["keys"]) & set(b["keys"]))
+        self.assertGreaterEqual(compare(a, b)[0], DUPLICATE_THRESHOLD)
+
+    def test_different_people_do_not_match(self):
+        a = fingerprint(candidate(full_name="Jane Smith", phone="0412345678", resume_text=RESUME))
+        b = fingerprint(candidate(full_name="Priya Patel", phone="0498765432",
+                                  resume_text="Certificate III trainee seeking first role in Townsville."))
+        self.assertLess(compare(a, b)[0], DUPLICATE_THRESHOLD)
+
+    def test_same_email_is_certain(self):
+        a = fingerprint(candidate(full_name="J Smith", email="Jane.Smith@example.com"))
+        b = fingerprint(candidate(full_name="Jane Smith", email="janesmith@example.com"))
+        self.assertEqual(compare(a, b), (1.0, ["email"]))
+
+    def test_pool_fingerprints_match_in_process_ones(self):
+        # Signatures computed in the CPU pool must be comparable with stored ones.
+        candidates = [candidate(full_name="Jane Smith", phone="0412345678", resume_text=RESUME)]
+        try:
+            pooled = asyncio.run(run_cpu_bound(fingerprint_all, candidates))
+        finally:
+            shutdown_cpu_pool()
+        self.assertEqual(pooled, [fingerprint(candidates[0])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import csv
+import gzip
+import importlib.util
+import io
+import unittest
+import uuid
+import zipfile
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+import server
+from auth import create_access_token
+from exports import EXPORTS, accepts_gzip, cell, csv_chunks, gzip_chunks, xlsx_chunks
+
+COLUMNS = ["id", "created_at", "skills", "notes"]
+CREATED = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+async def batches(count, size=3):
+    for b in range(count):
+        yield [(uuid.uuid4(), CREATED, ["first aid", "music"], f"=row {b}-{i}") for i in range(size)]
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, count):
+        batch, self.rows = self.rows[:count], self.rows[count:]
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def cursor(self, query, *args):
+        return FakeCursor(list(self.rows))
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self.rows)
+
+
+class ExportEncodingTest(unittest.TestCase):
+    def test_csv_streams_one_chunk_per_batch(self):
+        chunks = asyncio.run(collect(csv_chunks(COLUMNS, batches(4))))
+        self.assertEqual(len(chunks), 4)
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(rows[0], COLUMNS)
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[1][1:], ["2025-01-02T03:04:05", "first aid; music", "'=row 0-0"])
+
+    def test_empty_export_still_has_header(self):
+        chunks = asyncio.run(collect(csv_chunks(COLUMNS, batches(0))))
+        self.assertEqual(b"".join(chunks).decode().strip(), ",".join(COLUMNS))
+
+    def test_gzip_round_trip(self):
+        plain = b"".join(asyncio.run(collect(csv_chunks(COLUMNS, batches(5)))))
+        zipped = b"".join(asyncio.run(collect(gzip_chunks(csv_chunks(COLUMNS, batches(5))))))
+        self.assertEqual(len(gzip.decompress(zipped).splitlines()), len(plain.splitlines()))
+
+    def test_accept_encoding(self):
+        self.assertTrue(accepts_gzip("br, gzip;q=0.8"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("identity"))
+
+    def test_cells_are_spreadsheet_safe(self):
+        self.assertEqual(cell(None), "")
+        self.assertEqual(cell(CREATED), datetime(2025, 1, 2, 3, 4, 5))
+        self.assertEqual(cell("+61 7 4000 0000"), "+61 7 4000 0000")
+        self.assertEqual(cell("@cmd"), "'@cmd")
+
+    def test_export_queries_are_ordered_for_stable_output(self):
+        for export in EXPORTS.values():
+            self.assertIn("ORDER BY created_at, id", export.query)
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl not installed")
+    def test_xlsx_is_a_zip_archive(self):
+        data = b"".join(asyncio.run(collect(xlsx_chunks("Candidates", COLUMNS, batches(2)))))
+        self.assertEqual(data[:2], b"PK")
+
+
+class ExportEndpointTest(unittest.TestCase):
+    """The export endpoint streams rows to admins only"""
+
+    def setUp(self):
+        export = EXPORTS["eeo"]
+        self.rows = [
+            (uuid.uuid4(), CREATED, "Mount Isa", "citizen", "new", 7.5, i, True) for i in range(5)
+        ]
+        self.assertEqual(len(self.rows[0]), len(export.columns))
+        self.primary = server.db_router.primary
+        server.db_router.primary = FakePool(self.rows)
+        self.client = TestClient(server.app)
+        self.url = "/api/compliance/exports/eeo?start_date=2025-01-01T00:00:00Z&end_date=2025-02-01T00:00:00Z"
+
+    def tearDown(self):
+        server.db_router.primary = self.primary
+
+    def get(self, url, role="admin"):
+        token = create_access_token({"sub": f"{role}@example.com", "role": role})
+        return self.client.get(url, headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"})
+
+    def test_requires_admin(self):
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+        self.assertEqual(self.get(self.url, role="recruiter").status_code, 403)
+
+    def test_streams_csv_rows(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(response.text)))
+        self.assertEqual(rows[0], EXPORTS["eeo"].columns)
+        self.assertEqual([row[0] for row in rows[1:]], [str(row[0]) for row in self.rows])
+        self.assertEqual(rows[1][1:3], ["2025-01-02T03:04:05", "Mount Isa"])
+        self.assertIn("eeo_20250101-20250201.csv", response.headers["content-disposition"])
+
+    @unittest.skipUnless(importlib.util.find_spec("openpyxl"), "openpyxl not installed")
+    def test_streams_xlsx_rows(self):
+        from openpyxl import load_workbook
+
+        response = self.get(self.url + "&format=xlsx")
+        self.assertEqual(response.status_code, 200)
+        sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+        values = list(sheet.values)
+        self.assertEqual(list(values[0]), EXPORTS["eeo"].columns)
+        self.assertEqual([row[0] for row in values[1:]], [str(row[0]) for row in self.rows])
+        self.assertTrue(zipfile.is_zipfile(io.BytesIO(response.content)))
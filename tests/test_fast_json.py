@@ -0,0 +1,36 @@
+import json
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from fast_json import FastJSONResponse, dumps
+
+
+class FastJSONTest(unittest.TestCase):
+    """orjson serialization matches what jsonable_encoder would produce"""
+
+    def test_matches_default_encoding(self):
+        row = {
+            "id": uuid.uuid4(),
+            "score": Decimal("7.50"),
+            "created_at": datetime(2025, 7, 1, 9, 30),
+            "skills": ["first aid", "literacy"],
+            "notes": None,
+        }
+        self.assertEqual(json.loads(dumps([row])), jsonable_encoder([row]))
+
+    def test_response_body(self):
+        response = FastJSONResponse({"total": 1})
+        self.assertEqual(response.body, b'{"total":1}')
+        self.assertEqual(response.media_type, "application/json")
+
+    def test_unknown_types_raise(self):
+        with self.assertRaises(TypeError):
+            dumps({"value": object()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Availability helpers, plus the exclusion constraint and availability
+queries against a disposable Postgres when TEST_DATABASE_URL is set."""
+import asyncio
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import asyncpg
+
+from interview_scheduling import (
+    FREE_SLOTS_QUERY, MAX_AVAILABILITY_DAYS, OVERLAP_CONSTRAINT, AvailabilityRangeError, check_range, find_conflicts,
+    free_slots, group_slots,
+)
+from migrate import apply_migrations, discover_migrations
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+MIGRATION = Path(__file__).resolve().parents[1] / "backend" / "migrations" / "0006_interview_slots.sql"
+START = datetime(2025, 3, 3, tzinfo=timezone.utc)
+BRISBANE = ZoneInfo("Australia/Brisbane")
+
+INTERVIEWS_TABLE = '''
+    CREATE TABLE interviews (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        candidate_id UUID NOT NULL,
+        interviewer_email TEXT NOT NULL,
+        scheduled_date TIMESTAMPTZ NOT NULL,
+        duration_minutes INTEGER NOT NULL DEFAULT 60,
+        status TEXT NOT NULL DEFAULT 'scheduled'
+    )
+'''
+
+
+class AvailabilityTest(unittest.TestCase):
+    def test_range_must_be_forward_and_bounded(self):
+        check_range(START, START + timedelta(days=5))
+        with self.assertRaises(AvailabilityRangeError):
+            check_range(START, START)
+        with self.assertRaises(AvailabilityRangeError):
+            check_range(START, START + timedelta(days=MAX_AVAILABILITY_DAYS + 1))
+
+    def test_slots_grouped_per_interviewer_case_insensitively(self):
+        rows = [
+            {"email": "a@example.com", "start": START, "end": START + timedelta(hours=1)},
+            {"email": "a@example.com", "start": START + timedelta(hours=2), "end": START + timedelta(hours=3)},
+        ]
+        slots = group_slots(["A@example.com", "b@example.com"], rows)
+        self.assertEqual(len(slots["a@example.com"]), 2)
+        self.assertEqual(slots["b@example.com"], [])
+
+    def test_single_query_uses_range_arithmetic(self):
+        self.assertIn("range_agg(slot)", FREE_SLOTS_QUERY)
+        self.assertIn("slot && tstzrange", FREE_SLOTS_QUERY)
+
+
+class InterviewSlotMigrationTest(unittest.TestCase):
+    def test_exclusion_constraint_matches_lookup_expression(self):
+        sql = MIGRATION.read_text()
+        self.assertIn("CREATE EXTENSION IF NOT EXISTS btree_gist", sql)
+        self.assertIn(f"ADD CONSTRAINT {OVERLAP_CONSTRAINT}", sql)
+        self.assertIn("EXCLUDE USING gist (lower(interviewer_email) WITH =, slot WITH &&)", sql)
+
+
+def brisbane(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2025, 3, day, hour, minute, tzinfo=BRISBANE)
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class InterviewSlotDatabaseTest(unittest.TestCase):
+    """The exclusion constraint and availability queries on a real interviews table"""
+
+    def setUp(self):
+        self.schema = f"interview_slots_{uuid.uuid4().hex[:8]}"
+        self.loop = asyncio.new_event_loop()
+        self.connection = self.run_async(asyncpg.connect(TEST_DATABASE_URL))
+        self.run_async(self.connection.execute(f"CREATE SCHEMA {self.schema}"))
+        self.run_async(self.connection.execute(f"SET search_path TO {self.schema}, public"))
+        self.run_async(self.connection.execute(INTERVIEWS_TABLE))
+        migrations = [m for m in discover_migrations() if m.path.name == MIGRATION.name]
+        self.run_async(apply_migrations(self.connection, migrations))
+        # Monday 3 March 2025, 09:00-10:00 Brisbane
+        self.book("Alex@example.com", brisbane(3, 9))
+
+    def tearDown(self):
+        self.run_async(self.connection.execute(f"DROP SCHEMA {self.schema} CASCADE"))
+        self.run_async(self.connection.close())
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def book(self, email, start, minutes=60, status="scheduled"):
+        return self.run_async(self.connection.fetchval('''
+            INSERT INTO interviews (candidate_id, interviewer_email, scheduled_date, duration_minutes, status)
+            VALUES ($1, $2, $3, $4, $5) RETURNING id
+        ''', uuid.uuid4(), email, start, minutes, status))
+
+    def test_double_booking_is_rejected(self):
+        with self.assertRaises(asyncpg.ExclusionViolationError) as raised:
+            self.book("alex@example.com", brisbane(3, 9, 30))
+        self.assertEqual(raised.exception.constraint_name, OVERLAP_CONSTRAINT)
+
+    def test_adjacent_and_cancelled_bookings_are_allowed(self):
+        self.book("alex@example.com", brisbane(3, 10))
+        self.book("alex@example.com", brisbane(3, 9, 30), status="cancelled")
+
+    def test_conflicts_found_and_own_interview_excluded(self):
+        conflicts = self.run_async(find_conflicts(self.connection, "ALEX@example.com", brisbane(3, 8, 30), 60))
+        self.assertEqual([c["start"] for c in conflicts], [brisbane(3, 9)])
+        self.assertEqual(self.run_async(find_conflicts(
+            self.connection, "alex@example.com", brisbane(3, 8, 30), 60, exclude_id=conflicts[0]["id"])), [])
+
+    def test_free_slots_subtract_bookings_within_working_hours(self):
+        slots = self.run_async(free_slots(
+            self.connection, ["alex@example.com", "sam@example.com"], brisbane(3, 0), brisbane(4, 0),
+        ))
+        as_hours = {
+            email: [(slot["start"], slot["end"]) for slot in free] for email, free in slots.items()
+        }
+        self.assertEqual(as_hours["alex@example.com"], [
+            (brisbane(3, 8), brisbane(3, 9)), (brisbane(3, 10), brisbane(3, 17)),
+        ])
+        self.assertEqual(as_hours["sam@example.com"], [(brisbane(3, 8), brisbane(3, 17))])
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from jobs_feed_cache import JobsFeedCache, JobsFeedCacheMiddleware
+
+
+class JobsFeedCacheMiddlewareTest(unittest.TestCase):
+    """Active jobs feed caching, conditional requests and write invalidation"""
+
+    def setUp(self):
+        self.jobs = [{"id": "1", "title": "Childcare Teacher", "status": "active"}]
+        self.feed_reads = 0
+        self.published = 0
+        self.failure = None
+        app = FastAPI()
+
+        @app.get("/api/jobs")
+        async def get_jobs(request: Request, status: str = None):
+            self.feed_reads += 1
+            if self.failure is not None:
+                await asyncio.sleep(0.01)
+                raise HTTPException(status_code=self.failure, detail="feed unavailable")
+            if "authorization" in request.headers:
+                return self.jobs + [{"id": "2", "title": "Draft role", "status": "active"}]
+            return self.jobs
+
+        @app.put("/api/jobs/{job_id}")
+        async def update_job(job_id: str, job: dict):
+            self.jobs = [dict(job, id=job_id)]
+            return self.jobs[0]
+
+        async def on_write():
+            self.published += 1
+
+        self.feed = JobsFeedCache(max_age=60, stale_while_revalidate=600)
+        app.add_middleware(JobsFeedCacheMiddleware, feed=self.feed, on_write=on_write)
+        self.app = app
+        self.client = TestClient(app)
+
+    def test_repeat_reads_hit_cache(self):
+        first = self.client.get("/api/jobs?status=active")
+        second = self.client.get("/api/jobs?status=active")
+        self.assertEqual(first.headers["x-cache"], "MISS")
+        self.assertEqual(second.headers["x-cache"], "HIT")
+        self.assertEqual(second.json(), self.jobs)
+        self.assertIn("stale-while-revalidate=600", second.headers["cache-control"])
+        self.assertEqual(self.feed_reads, 1)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get("/api/jobs?status=active").headers["etag"]
+        response = self.client.get("/api/jobs?status=active", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_other_queries_are_not_cached(self):
+        self.client.get("/api/jobs")
+        self.client.get("/api/jobs")
+        self.assertEqual(self.feed_reads, 2)
+
+    def test_job_update_invalidates_feed(self):
+        etag = self.client.get("/api/jobs?status=active").headers["etag"]
+        self.client.put("/api/jobs/1", json={"title": "Lead Educator", "status": "active"})
+        response = self.client.get("/api/jobs?status=active", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["title"], "Lead Educator")
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertEqual(self.published, 1)
+
+    def test_stale_entry_served_while_refreshing(self):
+        self.client.get("/api/jobs?status=active")
+        self.feed.entry.fetched_at -= 120
+        response = self.client.get("/api/jobs?status=active")
+        self.assertEqual(response.headers["x-cache"], "STALE")
+        self.assertEqual(response.status_code, 200)
+
+    def test_feed_is_rendered_without_credentials(self):
+        authed = self.client.get("/api/jobs?status=active", headers={"Authorization": "Bearer recruiter"})
+        anonymous = self.client.get("/api/jobs?status=active")
+        self.assertEqual(authed.json(), self.jobs)
+        self.assertEqual(anonymous.json(), self.jobs)
+        self.assertEqual(anonymous.headers["x-cache"], "HIT")
+
+    def test_concurrent_misses_get_the_route_error(self):
+        self.failure = 404
+
+        async def run():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.get("/api/jobs?status=active") for _ in range(3)))
+
+        responses = asyncio.run(run())
+        self.assertEqual([r.status_code for r in responses], [404, 404, 404])
+        self.assertEqual(responses[2].json(), {"detail": "feed unavailable"})
+        self.assertEqual(self.feed_reads, 1)
+        self.assertIsNone(self.feed.entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
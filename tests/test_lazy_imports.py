@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from lazy_imports import is_loaded, lazy_import
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+HEAVY_MODULES = ("sendgrid", "PyPDF2", "jinja2", "jose.jwt", "httpx", "openpyxl")
+# Worker import budget in seconds; generous, because CI machines vary. Tighten locally with the env var.
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "2.5"))
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_module_loads_on_first_attribute_access(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_import("colorsys")
+        self.assertFalse(is_loaded("colorsys"))
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(is_loaded("colorsys"))
+
+    def test_already_imported_module_is_returned_as_is(self):
+        self.assertIs(lazy_import("json"), json)
+
+    def test_missing_module_fails_immediately(self):
+        with self.assertRaises(ModuleNotFoundError):
+            lazy_import("no_such_module_for_ats")
+
+
+class ServerImportBudgetTest(unittest.TestCase):
+    """Importing the app in a fresh interpreter stays cheap and loads no heavy libraries."""
+
+    def test_server_import(self):
+        script = (
+            "import json, server\n"
+            "from lazy_imports import is_loaded\n"
+            f"print(json.dumps({{'seconds': server.IMPORT_SECONDS, "
+            f"'loaded': [m for m in {HEAVY_MODULES!r} if is_loaded(m)]}}))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True,
+                                env=dict(os.environ, RUN_MIGRATIONS_ON_STARTUP="false"))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(report["loaded"], [])
+        self.assertLess(report["seconds"], IMPORT_TIME_BUDGET)
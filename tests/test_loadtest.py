@@ -0,0 +1,51 @@
+"""Load test scenario sizing, plus a one-iteration smoke run of every
+scenario when a disposable Postgres is available."""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from loadtest import SCENARIOS, scenario_concurrency  # noqa: E402
+
+LOADTEST_ADMIN_DSN = os.environ.get("LOADTEST_ADMIN_DSN")
+HAS_POSTGRES = bool(LOADTEST_ADMIN_DSN) or bool(shutil.which("initdb") and shutil.which("pg_ctl"))
+
+
+class ScenarioConcurrencyTest(unittest.TestCase):
+    """Scenarios never drive a route class past what it admits or queues"""
+
+    def test_reports_are_capped_at_limit_plus_queue(self):
+        self.assertEqual(scenario_concurrency("/api/compliance/exports/eeo?start_date=x", 16), 5)
+        self.assertEqual(scenario_concurrency("/api/dashboard/stats", 16), 5)
+
+    def test_other_classes_keep_the_requested_concurrency(self):
+        self.assertEqual(scenario_concurrency("/api/candidates/advanced-search", 16), 16)
+        self.assertEqual(scenario_concurrency("/api/candidates", 16), 16)
+
+
+@unittest.skipUnless(HAS_POSTGRES, "needs LOADTEST_ADMIN_DSN or initdb/pg_ctl on PATH")
+class LoadTestSmokeTest(unittest.TestCase):
+    """One iteration of every scenario runs without a single failed request"""
+
+    def test_one_iteration_has_no_errors(self):
+        # A subprocess, because server reads DATABASE_URL when it is imported.
+        baseline = Path(tempfile.mkdtemp()) / "missing.json"
+        result = subprocess.run(
+            [sys.executable, str(BENCHMARKS_DIR / "loadtest.py"), "--candidates", "200",
+             "--requests", "2", "--concurrency", "2", "--baseline", str(baseline)],
+            capture_output=True, text=True, timeout=600,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertNotIn("REGRESSION", result.stdout)
+        for scenario in SCENARIOS:
+            self.assertIn(scenario.name, result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
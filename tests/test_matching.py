@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+import uuid
+from contextlib import asynccontextmanager
+
+from cpu_pool import shutdown_cpu_pool
+from matching import MIN_MATCH_SCORE, MatchEngine, match_score, requirement_coverage, score_pairs
+
+JOB = {
+    "id": uuid.uuid4(),
+    "location": "Mount Isa",
+    "sponsorship_eligible": True,
+    "relocation_support": True,
+    "housing_support": True,
+    "requirements": ["Diploma in Early Childhood Education", "2+ years experience", "First Aid"],
+}
+
+CANDIDATE = {
+    "id": uuid.uuid4(),
+    "location": "Brisbane",
+    "visa_status": "citizen",
+    "sponsorship_needed": False,
+    "experience_years": 3,
+    "relocation_willing": "yes",
+    "housing_needed": True,
+    "skills": ["first aid", "literacy"],
+    "childcare_cert": "Diploma in Early Childhood Education",
+    "score": 8.0,
+}
+
+
+class MatchScoreTest(unittest.TestCase):
+    def test_requirements_met_by_cert_experience_and_skills(self):
+        self.assertEqual(requirement_coverage(JOB, CANDIDATE), 1.0)
+        self.assertAlmostEqual(requirement_coverage(JOB, dict(CANDIDATE, experience_years=1)), 2 / 3)
+
+    def test_local_candidate_outranks_relocating_one(self):
+        local = dict(CANDIDATE, location="Mount Isa")
+        self.assertGreater(match_score(JOB, local), match_score(JOB, CANDIDATE))
+
+    def test_sponsorship_requires_eligible_job(self):
+        sponsored = dict(CANDIDATE, visa_status="needs_sponsorship", sponsorship_needed=True)
+        self.assertGreater(match_score(JOB, sponsored), 0)
+        self.assertEqual(match_score(dict(JOB, sponsorship_eligible=False), sponsored), 0)
+
+    def test_unwilling_to_relocate_is_not_viable(self):
+        self.assertEqual(match_score(JOB, dict(CANDIDATE, relocation_willing="no")), 0)
+
+    def test_only_viable_pairs_are_stored(self):
+        weak = dict(CANDIDATE, id=uuid.uuid4(), relocation_willing="no")
+        pairs = score_pairs([JOB], [CANDIDATE, weak])
+        self.assertEqual([p[1] for p in pairs], [CANDIDATE["id"]])
+        self.assertTrue(all(p[2] >= MIN_MATCH_SCORE for p in pairs))
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, n):
+        batch, self.rows = self.rows[:n], self.rows[n:]
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, queue):
+        self.queue = queue
+        self.transactions = 0
+        self.stored = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        yield
+
+    async def fetch(self, query, *args):
+        if "DELETE FROM match_refresh_queue" in query:
+            entity_type, limit = args
+            claimed, self.queue[entity_type] = self.queue[entity_type][:limit], self.queue[entity_type][limit:]
+            return [{"entity_id": entity_id} for entity_id in claimed]
+        if "FROM jobs" in query:
+            return [JOB]
+        return [CANDIDATE]
+
+    async def cursor(self, query):
+        return FakeCursor([CANDIDATE])
+
+    async def execute(self, query, *args):
+        if "INSERT INTO candidate_job_matches" in query:
+            self.stored.extend(zip(*args))
+
+
+class DrainRefreshQueueTest(unittest.TestCase):
+    """Each transaction rescores one job or one batch of candidates"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_cpu_pool()
+
+    def test_jobs_and_candidates_drain_in_separate_transactions(self):
+        connection = FakeConnection({"job": [JOB["id"]], "candidate": [CANDIDATE["id"]]})
+
+        async def drain():
+            engine = MatchEngine()
+            return [await engine.drain_refresh_queue(connection) for _ in range(3)]
+
+        self.assertEqual(asyncio.run(drain()), [1, 1, 0])
+        self.assertEqual(len(connection.stored), 2)
+        self.assertEqual({(job_id, candidate_id) for job_id, candidate_id, _ in connection.stored},
+                         {(JOB["id"], CANDIDATE["id"])})
+        self.assertEqual(connection.transactions, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from concurrency import ConcurrencyLimitMiddleware, build_limiters
+from metrics import HTTP_LATENCY, HTTP_REQUESTS, WORKER, Counter, Histogram, MetricsMiddleware, Registry
+
+
+class MetricRenderingTest(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, "/a")
+        lines = histogram.render()
+        self.assertIn(f'test_seconds_bucket{{worker="{WORKER}",route="/a",le="0.1"}} 1', lines)
+        self.assertIn(f'test_seconds_bucket{{worker="{WORKER}",route="/a",le="1"}} 3', lines)
+        self.assertIn(f'test_seconds_bucket{{worker="{WORKER}",route="/a",le="+Inf"}} 4', lines)
+        self.assertIn(f'test_seconds_count{{worker="{WORKER}",route="/a"}} 4', lines)
+
+    def test_registry_renders_help_and_type(self):
+        registry = Registry()
+        counter = registry.register(Counter("test_total", "Things.", ("kind",)))
+        counter.inc('say "hi"')
+        text = registry.render()
+        self.assertIn("# TYPE test_total counter", text)
+        self.assertIn('kind="say \\"hi\\""} 1', text)
+
+
+class MetricsMiddlewareTest(unittest.TestCase):
+    def test_requests_are_labelled_by_route_template(self):
+        app = FastAPI()
+
+        @app.get("/api/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+        for item_id in range(3):
+            self.assertEqual(client.get(f"/api/items/{item_id}").status_code, 200)
+        client.get("/nowhere")
+
+        self.assertEqual(HTTP_REQUESTS.values[("GET", "/api/items/{item_id}", "200")], 3)
+        self.assertEqual(HTTP_REQUESTS.values[("GET", "<unmatched>", "404")], 1)
+        self.assertEqual(sum(HTTP_LATENCY.counts[("GET", "/api/items/{item_id}")]), 3)
+
+    def test_responses_sent_before_routing_keep_their_route(self):
+        app = FastAPI()
+
+        @app.get("/api/feed")
+        async def feed():
+            return []
+
+        @app.get("/api/orders/{order_id}")
+        async def get_order(order_id: int):
+            return {"id": order_id}
+
+        class CachedFeed:
+            """Answers /api/feed itself, like the jobs feed cache."""
+
+            def __init__(self, app):
+                self.app = app
+
+            async def __call__(self, scope, receive, send):
+                if scope["type"] == "http" and scope["path"] == "/api/feed":
+                    await send({"type": "http.response.start", "status": 200, "headers": []})
+                    await send({"type": "http.response.body", "body": b"[]"})
+                    return
+                await self.app(scope, receive, send)
+
+        limiters = build_limiters({"crud": (1, 1, 1, 0, 0.01)})
+        limiters["crud"].drain()
+        app.add_middleware(ConcurrencyLimitMiddleware, limiters=limiters)
+        app.add_middleware(CachedFeed)
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+        self.assertEqual(client.get("/api/feed").status_code, 200)
+        self.assertEqual(client.get("/api/orders/7").status_code, 503)
+
+        self.assertEqual(HTTP_REQUESTS.values[("GET", "/api/feed", "200")], 1)
+        self.assertEqual(HTTP_REQUESTS.values[("GET", "/api/orders/{order_id}", "503")], 1)
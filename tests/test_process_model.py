@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from process_model import available_cpus, cgroup_cpu_limit, pool_sizes, worker_count
+
+
+class CgroupLimitTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+
+    def test_cgroup_v2_quota(self):
+        (self.root / "cpu.max").write_text("250000 100000\n")
+        self.assertEqual(cgroup_cpu_limit(self.root), 2.5)
+        self.assertLessEqual(available_cpus(self.root), 3)
+
+    def test_cgroup_v2_unlimited(self):
+        (self.root / "cpu.max").write_text("max 100000\n")
+        self.assertIsNone(cgroup_cpu_limit(self.root))
+
+    def test_cgroup_v1_quota(self):
+        (self.root / "cpu").mkdir()
+        (self.root / "cpu" / "cpu.cfs_quota_us").write_text("100000\n")
+        (self.root / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        self.assertEqual(cgroup_cpu_limit(self.root), 1.0)
+        self.assertEqual(available_cpus(self.root), 1)
+
+    def test_no_cgroup_files(self):
+        self.assertIsNone(cgroup_cpu_limit(self.root))
+        self.assertGreaterEqual(available_cpus(self.root), 1)
+
+
+class SizingTest(unittest.TestCase):
+    def test_worker_count(self):
+        self.assertEqual(worker_count(1), 2)
+        self.assertEqual(worker_count(6), 6)
+        self.assertEqual(worker_count(64), 16)
+        self.assertEqual(worker_count(6, override="3"), 3)
+
+    def test_budget_split_across_workers(self):
+        sizes = pool_sizes(50, 4)
+        self.assertEqual(sizes.max_size, 10)  # 12 per worker, 2 dedicated
+        self.assertEqual(sizes.min_size, 5)
+        self.assertLessEqual(4 * (sizes.max_size + 2), 50)
+
+    def test_budget_too_small(self):
+        with self.assertRaises(ValueError):
+            pool_sizes(10, 4)
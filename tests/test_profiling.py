@@ -0,0 +1,62 @@
+import asyncio
+import sys
+import time
+import unittest
+from collections import Counter
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from profiling import SPAN_DURATION, ProfileRequestMiddleware, SamplingProfiler, fold, profiler, render_folded, span
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class FoldTest(unittest.TestCase):
+    def test_stack_is_root_first(self):
+        stack = fold(sys._getframe())
+        self.assertTrue(stack.split(";")[-1].startswith("test_stack_is_root_first (test_profiling.py:"))
+
+    def test_render_orders_by_sample_count(self):
+        text = render_folded(Counter({"a;b": 2, "a;c": 5}))
+        self.assertEqual(text, "a;c 5\na;b 2\n")
+
+    def test_span_records_duration(self):
+        with span("unit_test_span"):
+            pass
+        self.assertEqual(sum(SPAN_DURATION.counts[("unit_test_span",)]), 1)
+
+
+class SamplingProfilerTest(unittest.TestCase):
+    def test_global_profile_samples_the_loop_thread(self):
+        sampler = SamplingProfiler(interval=0.001)
+
+        async def run():
+            sampler.start()
+            busy(0.1)
+            await asyncio.sleep(0)
+            return sampler.stop()
+
+        folded = asyncio.run(run())
+        self.assertIn("busy (test_profiling.py:", folded)
+
+    def test_request_profile_by_header(self):
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow():
+            busy(0.1)
+            return {}
+
+        app.add_middleware(ProfileRequestMiddleware, enabled=True, token="secret")
+        client = TestClient(app)
+        self.assertNotIn("x-profile-id", client.get("/slow").headers)
+        self.assertNotIn("x-profile-id", client.get("/slow", headers={"x-profile": "wrong"}).headers)
+        response = client.get("/slow", headers={"x-profile": "secret"})
+        profile = profiler.recent[response.headers["x-profile-id"]]
+        self.assertIn("busy (test_profiling.py:", profile.folded())
+        self.assertTrue(profile.folded().startswith("# GET /slow"))
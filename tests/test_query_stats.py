@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from query_stats import (
+    QUERY_STATS, QueryStats, QueryStatsMiddleware, fingerprint, fingerprint_id, record_query, rows_from_status,
+)
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_literals_and_params_collapse_to_one_fingerprint(self):
+        a = fingerprint("SELECT * FROM candidates WHERE id = $1 AND score > 5 -- hot path")
+        b = fingerprint("SELECT *\n  FROM candidates\n WHERE id = 'abc' AND score > 7.5")
+        self.assertEqual(a, b)
+        self.assertEqual(a, "SELECT * FROM candidates WHERE id = ? AND score > ?")
+
+    def test_in_lists_and_identifiers(self):
+        self.assertEqual(fingerprint("SELECT 1 FROM audit_logs_2025_03 WHERE x IN (1, 2, 3)"),
+                         "SELECT ? FROM audit_logs_2025_03 WHERE x IN (...)")
+
+    def test_rows_from_command_tag(self):
+        self.assertEqual(rows_from_status("UPDATE 5"), 5)
+        self.assertEqual(rows_from_status("INSERT 0 3"), 3)
+        self.assertEqual(rows_from_status("CREATE INDEX"), 0)
+
+
+class QueryStatsTest(unittest.TestCase):
+    def test_aggregates_per_fingerprint(self):
+        stats = QueryStats()
+        stats.record("SELECT ?", 0.002, 1)
+        stats.record("SELECT ?", 0.004, 1)
+        (top,) = stats.top()
+        self.assertEqual((top["calls"], top["total_ms"], top["max_ms"], top["rows"]), (2, 6.0, 4.0, 2))
+
+    def test_slow_queries_are_logged(self):
+        with self.assertLogs(level="WARNING") as logs:
+            record_query("SELECT pg_sleep($1)", 5.0, 1)
+        self.assertIn("Slow query", logs.output[0])
+
+
+class QueryStatsMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get("/candidates")
+        async def candidates():
+            for candidate_id in range(12):
+                record_query(f"SELECT * FROM applications WHERE candidate_id = {candidate_id}", 0.0001, 1)
+                await asyncio.sleep(0)
+            return []
+
+        app.add_middleware(QueryStatsMiddleware, debug_headers=True, threshold=10)
+        self.client = TestClient(app)
+        QUERY_STATS.reset()
+
+    def test_debug_headers_and_n_plus_one(self):
+        with self.assertLogs(level="WARNING") as logs:
+            response = self.client.get("/candidates")
+        self.assertEqual(response.headers["x-db-query-count"], "12")
+        repeated = fingerprint("SELECT * FROM applications WHERE candidate_id = ?")
+        self.assertEqual(response.headers["x-db-n-plus-one"], f"{fingerprint_id(repeated)}x12")
+        self.assertIn("Possible N+1", logs.output[0])
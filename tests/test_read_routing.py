@@ -0,0 +1,151 @@
+"""Routing decisions against fake pools, plus an optional check against a
+real primary and replica. To run the second part, set TEST_DATABASE_URL
+and TEST_REPLICA_DATABASE_URL to two local Postgres instances, e.g. a
+primary and a streaming standby made with ``pg_basebackup -R``. A second
+plain instance also works, since lag then reads as 0.
+"""
+import asyncio
+import inspect
+import os
+import unittest
+
+import asyncpg
+
+from read_routing import ReadRouter
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+TEST_REPLICA_DATABASE_URL = os.environ.get("TEST_REPLICA_DATABASE_URL")
+INSTANCE_QUERY = "SELECT pg_postmaster_start_time()"  # tells the two servers apart
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.name = pool.name
+        self.pool = pool
+
+    async def fetchval(self, query):
+        return self.pool.lag
+
+
+class FakePool:
+    def __init__(self, name: str, lag: float = 0.0, down: bool = False):
+        self.name = name
+        self.lag = lag
+        self.down = down
+        self.released = 0
+
+    def acquire(self, timeout=None):
+        return FakeAcquire(self)
+
+    async def release(self, connection):
+        self.released += 1
+
+
+class FakeAcquire:
+    """Like asyncpg's PoolAcquireContext: awaitable and an async context manager."""
+
+    def __init__(self, pool: FakePool):
+        self.pool = pool
+
+    def __await__(self):
+        return self._connect().__await__()
+
+    async def _connect(self):
+        if self.pool.down:
+            raise ConnectionRefusedError("replica down")
+        return FakeConnection(self.pool)
+
+    async def __aenter__(self):
+        return await self._connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.pool.release(None)
+
+
+class ReadRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.primary = FakePool("primary")
+        self.replica = FakePool("replica")
+        self.router = ReadRouter(max_lag=10)
+        self.router.primary, self.router.replica = self.primary, self.replica
+
+    def route(self, func):
+        async def run():
+            async with self.router.acquire() as connection:
+                return connection.name
+        return asyncio.run(func(run)() if func else run())
+
+    def test_unannotated_reads_use_primary(self):
+        self.router.lag = 0.0
+        self.assertEqual(self.route(None), "primary")
+
+    def test_annotated_reads_use_fresh_replica(self):
+        asyncio.run(self.router.check_lag())
+        self.assertEqual(self.router.lag, 0.0)
+        self.assertEqual(self.route(self.router.replica_reads()), "replica")
+        self.assertEqual(self.replica.released, 2)  # lag check + read
+
+    def test_lagging_replica_falls_back_per_caller_limit(self):
+        self.replica.lag = 20.0
+        asyncio.run(self.router.check_lag())
+        self.assertEqual(self.route(self.router.replica_reads()), "primary")
+        self.assertEqual(self.route(self.router.replica_reads(max_lag=60)), "replica")
+
+    def test_replica_not_streaming_uses_primary(self):
+        self.replica.lag = None  # REPLICA_LAG_QUERY gives NULL without a streaming WAL receiver
+        self.router.lag = 0.0
+        self.assertIsNone(asyncio.run(self.router.check_lag()))
+        self.assertEqual(self.route(self.router.replica_reads()), "primary")
+
+    def test_unknown_lag_uses_primary(self):
+        self.assertIsNone(self.router.lag)
+        self.assertEqual(self.route(self.router.replica_reads()), "primary")
+
+    def test_unreachable_replica_falls_back_and_is_marked_unhealthy(self):
+        self.router.lag = 0.0
+        self.replica.down = True
+        self.assertEqual(self.route(self.router.replica_reads()), "primary")
+        self.assertIsNone(self.router.lag)
+        self.assertIn("replica down", self.router.snapshot()["last_error"])
+
+    def test_read_pool_without_replica(self):
+        self.router.replica = None
+        self.assertIs(self.router.read_pool(), self.primary)
+
+    def test_decorator_keeps_signature(self):
+        async def endpoint(limit: int = 10):
+            return limit
+
+        wrapped = self.router.replica_reads()(endpoint)
+        self.assertEqual(inspect.signature(wrapped), inspect.signature(endpoint))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL and TEST_REPLICA_DATABASE_URL,
+                     "TEST_DATABASE_URL and TEST_REPLICA_DATABASE_URL not set")
+class TwoInstanceRoutingTest(unittest.TestCase):
+    def test_reports_read_from_replica(self):
+        async def run():
+            primary = await asyncpg.create_pool(TEST_DATABASE_URL, min_size=1, max_size=2)
+            replica = await asyncpg.create_pool(TEST_REPLICA_DATABASE_URL, min_size=1, max_size=2)
+            router = ReadRouter(max_lag=60)
+            router.start(primary, replica)
+            try:
+                lag = await router.check_lag()
+
+                @router.replica_reads()
+                async def report():
+                    async with router.acquire() as connection:
+                        return await connection.fetchval(INSTANCE_QUERY)
+
+                async with router.acquire() as connection:
+                    on_primary = await connection.fetchval(INSTANCE_QUERY)
+                return lag, on_primary, await report(), await replica.fetchval(INSTANCE_QUERY)
+            finally:
+                await router.stop()
+                await replica.close()
+                await primary.close()
+
+        lag, on_primary, report, replica_instance = asyncio.run(run())
+        self.assertGreaterEqual(lag, 0.0)
+        self.assertEqual(report, replica_instance)
+        self.assertNotEqual(on_primary, replica_instance)
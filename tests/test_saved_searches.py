@@ -0,0 +1,98 @@
+import asyncio
+import os
+import unittest
+import uuid
+
+import asyncpg
+
+from migrate import apply_migrations, discover_migrations
+from saved_searches import SavedSearches, filter_hash, normalize_filters
+from server import AdvancedSearchFilter, VisaStatus
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+MIGRATIONS = {"0001_candidates.sql", "0003_saved_searches.sql", "0010_saved_search_watermarks.sql"}
+
+
+class NormalizeFiltersTest(unittest.TestCase):
+    """Equivalent filter sets share one saved-search hash"""
+
+    def test_order_and_duplicates_do_not_matter(self):
+        first = AdvancedSearchFilter(locations=["Moranbah", "Mount Isa"], sponsorship_needed=True, min_score=7)
+        second = AdvancedSearchFilter(locations=["Mount Isa", "Moranbah", "Mount Isa"], min_score=7.0,
+                                      sponsorship_needed=True, required_skills=[])
+        self.assertEqual(filter_hash(normalize_filters(first)), filter_hash(normalize_filters(second)))
+
+    def test_different_filters_hash_differently(self):
+        first = AdvancedSearchFilter(visa_status=[VisaStatus.NEEDS_SPONSORSHIP])
+        second = AdvancedSearchFilter(visa_status=[VisaStatus.TEMPORARY])
+        self.assertNotEqual(filter_hash(normalize_filters(first)), filter_hash(normalize_filters(second)))
+
+    def test_normalized_filters_round_trip(self):
+        filters = AdvancedSearchFilter(visa_status=[VisaStatus.NEEDS_SPONSORSHIP], search_query="  diploma ")
+        normalized = normalize_filters(filters)
+        self.assertEqual(normalized, {"visa_status": ["needs_sponsorship"], "search_query": "diploma"})
+        self.assertEqual(AdvancedSearchFilter(**normalized).visa_status, [VisaStatus.NEEDS_SPONSORSHIP])
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class SavedSearchDatabaseTest(unittest.TestCase):
+    """Saved searches are per owner and new matches are tracked by match id"""
+
+    def setUp(self):
+        self.schema = f"saved_searches_{uuid.uuid4().hex[:8]}"
+        self.loop = asyncio.new_event_loop()
+        self.connection = self.run_async(asyncpg.connect(TEST_DATABASE_URL))
+        self.run_async(self.connection.execute(f"CREATE SCHEMA {self.schema}"))
+        self.run_async(self.connection.execute(f"SET search_path TO {self.schema}, public"))
+        migrations = [m for m in discover_migrations() if m.path.name in MIGRATIONS]
+        self.run_async(apply_migrations(self.connection, migrations))
+        self.searches = SavedSearches(AdvancedSearchFilter)
+        self.add_candidate("first@example.com")
+        filters = AdvancedSearchFilter(locations=["Mount Isa"])
+        self.saved = self.run_async(self.searches.save(self.connection, "recruiter@example.com", "Mount Isa", filters))
+
+    def tearDown(self):
+        self.run_async(self.connection.execute(f"DROP SCHEMA {self.schema} CASCADE"))
+        self.run_async(self.connection.close())
+        self.loop.close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def add_candidate(self, email: str):
+        return self.run_async(self.connection.fetchval(
+            "INSERT INTO candidates (email, full_name, location) VALUES ($1, $1, 'Mount Isa') RETURNING id", email
+        ))
+
+    def new_emails(self, owner="recruiter@example.com"):
+        delta = self.run_async(self.searches.new_matches(self.connection, owner, self.saved["id"]))
+        return [c["email"] for c in delta["candidates"]]
+
+    def test_new_matches_are_reported_once(self):
+        self.assertEqual(self.new_emails(), ["first@example.com"])
+        self.add_candidate("second@example.com")
+        self.run_async(self.searches.drain_refresh_queue(self.connection))
+        self.assertEqual(self.new_emails(), ["second@example.com"])
+        self.assertEqual(self.new_emails(), [])
+
+    def test_late_committed_match_is_still_new(self):
+        self.new_emails()
+        # A refresh that started before the view stamps matched_at before it.
+        candidate_id = self.add_candidate("late@example.com")
+        self.run_async(self.connection.execute('''
+            INSERT INTO saved_search_matches (saved_search_id, candidate_id, matched_at)
+            VALUES ($1, $2, NOW() - INTERVAL '1 minute')
+        ''', self.saved["id"], candidate_id))
+        self.assertEqual(self.new_emails(), ["late@example.com"])
+
+    def test_searches_are_scoped_to_their_owner(self):
+        other = "other@example.com"
+        self.assertEqual(self.run_async(self.searches.list(self.connection, other)), [])
+        self.assertIsNone(self.run_async(self.searches.results(self.connection, other, self.saved["id"])))
+        self.assertIsNone(self.run_async(self.searches.new_matches(self.connection, other, self.saved["id"])))
+        listed = self.run_async(self.searches.list(self.connection, "recruiter@example.com"))
+        self.assertEqual([s["id"] for s in listed], [self.saved["id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
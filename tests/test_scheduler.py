@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import hmac
+import unittest
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+
+import background_jobs
+from background_jobs import (
+    WEBHOOK_BACKOFF_MAX, reminder_content, retry_webhooks, send_interview_reminders, webhook_backoff,
+    webhook_signature,
+)
+from scheduler import Job, Scheduler
+
+
+async def noop(pool):
+    pass
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetch(self, query, *args):
+        return self.pool.batches.pop(0) if self.pool.batches else []
+
+    async def execute(self, query, *args):
+        self.pool.executed.append((" ".join(query.split()), args))
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    """Counts connections held, so tests can check none is held during network I/O."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.executed = []
+        self.held = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.held += 1
+        try:
+            yield FakeConnection(self)
+        finally:
+            self.held -= 1
+
+
+class SchedulerTest(unittest.TestCase):
+    def test_leader_only_jobs_wait_for_leadership(self):
+        job = Job("stats", 60, noop, leader_only=True)
+        self.assertFalse(job.due(0, is_leader=False))
+        self.assertTrue(job.due(0, is_leader=True))
+        self.assertTrue(Job("reminders", 60, noop, leader_only=False).due(0, is_leader=False))
+
+    def test_job_not_due_while_previous_run_is_active(self):
+        job = Job("slow", 1, noop, leader_only=False)
+
+        async def check():
+            job.task = asyncio.create_task(asyncio.sleep(1))
+            running = job.due(10, is_leader=True)
+            job.task.cancel()
+            return running
+
+        self.assertFalse(asyncio.run(check()))
+
+    def test_every_registers_and_failures_are_counted(self):
+        scheduler = Scheduler("postgresql://unused")
+
+        @scheduler.every(30, leader_only=True)
+        async def broken(pool):
+            raise RuntimeError("boom")
+
+        job = scheduler.jobs[0]
+        self.assertEqual((job.name, job.interval, job.leader_only), ("broken", 30, True))
+        asyncio.run(scheduler._run_job(job, pool=None))
+        self.assertEqual((job.runs, job.failures), (0, 1))
+        self.assertFalse(scheduler.snapshot()["is_leader"])
+
+
+class WebhookRetryTest(unittest.TestCase):
+    def test_backoff_doubles_and_is_capped(self):
+        self.assertEqual(webhook_backoff(2), 2 * webhook_backoff(1))
+        self.assertEqual(webhook_backoff(50), timedelta(seconds=WEBHOOK_BACKOFF_MAX))
+
+    def test_signature_is_hmac_sha256_of_body(self):
+        expected = hmac.new(b"secret", b"{}", hashlib.sha256).hexdigest()
+        self.assertEqual(webhook_signature("secret", b"{}"), expected)
+
+
+class ClaimThenSendTest(unittest.TestCase):
+    """Emails and webhook POSTs happen after the claim commits"""
+
+    def test_reminders_are_sent_without_a_connection_held(self):
+        failed_id = uuid.uuid4()
+        rows = [
+            {"id": uuid.uuid4(), "scheduled_date": datetime(2025, 3, 3, 23, tzinfo=timezone.utc),
+             "interview_type": "video", "email": "ok@example.com", "full_name": "Sam"},
+            {"id": failed_id, "scheduled_date": datetime(2025, 3, 4, 1, tzinfo=timezone.utc),
+             "interview_type": None, "email": "bounce@example.com", "full_name": "Alex"},
+        ]
+        pool = FakePool(rows)
+        held_while_sending = []
+
+        async def send_email(to, subject, content):
+            held_while_sending.append(pool.held)
+            return to == "ok@example.com"
+
+        sent = asyncio.run(send_interview_reminders(pool, send_email))
+        self.assertEqual(sent, 1)
+        self.assertEqual(held_while_sending, [0, 0])
+        query, args = pool.executed[0]
+        self.assertIn("reminder_sent_at = NULL", query)
+        self.assertEqual(args, ([failed_id],))
+
+    def test_reminder_shows_scheduling_timezone(self):
+        row = {"scheduled_date": datetime(2025, 3, 3, 23, tzinfo=timezone.utc), "interview_type": "video",
+               "full_name": "Sam"}
+        # 23:00 UTC is 09:00 the next morning in Brisbane
+        self.assertIn("Tuesday 04 March at 09:00 AM AEST", reminder_content(row))
+
+    def test_webhooks_are_posted_without_a_connection_held(self):
+        rows = [{"id": uuid.uuid4(), "url": f"https://careers.example.com/hook/{i}", "event": "job.updated",
+                 "body": "{}", "attempts": 0} for i in range(2)]
+        pool = FakePool(rows)
+        held_while_posting = []
+
+        def respond(request):
+            held_while_posting.append(pool.held)
+            return httpx.Response(200 if request.url.path.endswith("/0") else 500)
+
+        real_client = httpx.AsyncClient
+
+        def client(**kwargs):
+            return real_client(transport=httpx.MockTransport(respond), **kwargs)
+
+        with mock.patch.object(background_jobs.httpx, "AsyncClient", client):
+            delivered = asyncio.run(retry_webhooks(pool, "secret"))
+        self.assertEqual(delivered, 1)
+        self.assertEqual(held_while_posting, [0, 0])
+        statuses = [args[1] if "SET status = $2" in query else "delivered" for query, args in pool.executed]
+        self.assertEqual(statuses, ["delivered", "pending"])
@@ -0,0 +1,173 @@
+"""EXPLAIN-based regression test for candidate search indexes.
+
+Needs a disposable Postgres: set TEST_DATABASE_URL to run it. Migrations
+are applied into a throwaway schema, candidates are seeded with realistic
+selectivity, and every standard search must avoid a sequential scan. The
+searches are EXPLAINed as prepared statements under
+``plan_cache_mode = force_generic_plan``, the plan a cached statement ends
+up reusing, not with the values substituted in.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+
+from candidate_search import build_search_query
+from migrate import Migration, apply_migrations, concurrent_index_name, discover_migrations, split_statements
+from tests.search_fixtures import ApplicationStatus, VisaStatus, search_filters
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+SEED_ROWS = 50000
+
+
+STANDARD_SEARCHES = {
+    "location_and_visa": search_filters(locations=["Mount Isa"], visa_status=[VisaStatus.NEEDS_SPONSORSHIP]),
+    "sponsorship_rural_high_score": search_filters(sponsorship_needed=True, rural_experience=True, min_score=9.5),
+    "required_skills": search_filters(required_skills=["montessori"]),
+    "open_pipeline_status": search_filters(application_status=[ApplicationStatus.OFFER]),
+    "recent_applicants": search_filters(applied_after=datetime.now(timezone.utc) - timedelta(days=3)),
+    "experience_range": search_filters(min_experience_years=14),
+    "available_soon": search_filters(available_from=datetime.now(timezone.utc) + timedelta(days=350)),
+    "relocation_to_location": search_filters(relocation_willing=["yes"], locations=["Mount Isa"]),
+}
+
+SEED_SQL = f'''
+    INSERT INTO candidates (email, full_name, location, visa_status, sponsorship_needed,
+                            experience_years, rural_experience, relocation_willing, skills,
+                            score, status, resume_text, created_at, availability_start)
+    SELECT 'candidate' || g || '@example.com',
+           'Candidate ' || g,
+           (ARRAY['Brisbane','Townsville','Cairns','Mackay','Rockhampton','Toowoomba','Emerald',
+                  'Moranbah','Longreach','Charleville','Roma','Mount Isa'])[1 + g % 12],
+           (ARRAY['citizen','citizen','citizen','permanent','permanent','temporary','needs_sponsorship'])[1 + g % 7],
+           g % 5 = 0,
+           g % 15,
+           g % 3 = 0,
+           (ARRAY['yes','no','maybe'])[1 + g % 3],
+           CASE WHEN g % 100 = 0 THEN ARRAY['montessori','first aid']
+                ELSE ARRAY['first aid','literacy'] END,
+           (g % 1000) / 100.0,
+           CASE WHEN g % 50 = 0 THEN 'offer' WHEN g % 4 = 0 THEN 'hired' ELSE 'rejected' END,
+           repeat('Experienced early childhood educator. ', 20),
+           NOW() - ((g % 365) || ' days')::interval,
+           NOW() + ((g % 365) || ' days')::interval
+    FROM generate_series(1, {SEED_ROWS}) AS g
+'''
+
+
+def seq_scans(plan):
+    """Yield relation names that the plan reads with a sequential scan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+class MigrationFilesTest(unittest.TestCase):
+    def test_versions_are_ordered_and_unique(self):
+        versions = [m.version for m in discover_migrations()]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_concurrent_indexes_run_outside_transactions(self):
+        for migration in discover_migrations():
+            if "CONCURRENTLY" in migration.sql:
+                self.assertFalse(migration.transactional, migration.name)
+                self.assertTrue(split_statements(migration.sql))
+
+    def test_concurrent_index_names(self):
+        self.assertEqual(
+            concurrent_index_name("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a\n    ON candidates (score)"), "idx_a")
+        self.assertEqual(
+            concurrent_index_name("create unique index concurrently if not exists idx_b on t (x)"), "idx_b")
+        self.assertIsNone(concurrent_index_name("ANALYZE candidates"))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class InvalidIndexRetryTest(unittest.TestCase):
+    """A concurrent build that failed is dropped and rebuilt on the next run"""
+
+    def test_invalid_index_is_rebuilt(self):
+        schema = f"migrate_retry_{uuid.uuid4().hex[:8]}"
+        migration_dir = Path(tempfile.mkdtemp())
+        path = migration_dir / "0001_unique_codes.sql"
+        path.write_text("-- migrate: no-transaction\n"
+                        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_codes_code ON codes (code);\n")
+
+        async def run():
+            connection = await asyncpg.connect(TEST_DATABASE_URL)
+            try:
+                await connection.execute(f"CREATE SCHEMA {schema}")
+                await connection.execute(f"SET search_path TO {schema}")
+                await connection.execute("CREATE TABLE codes (code TEXT)")
+                await connection.execute("INSERT INTO codes VALUES ('a'), ('a')")
+                migrations = [Migration(1, "unique_codes", path)]
+                with self.assertRaises(asyncpg.UniqueViolationError):
+                    await apply_migrations(connection, migrations)
+                await connection.execute("DELETE FROM codes WHERE ctid <> (SELECT min(ctid) FROM codes)")
+                await apply_migrations(connection, migrations)
+                return await connection.fetchval(
+                    "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass('idx_codes_code')")
+            finally:
+                await connection.execute(f"DROP SCHEMA {schema} CASCADE")
+                await connection.close()
+
+        self.assertTrue(asyncio.run(run()))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL not set")
+class SearchIndexPlanTest(unittest.TestCase):
+    """Standard advanced searches must be answered from an index"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = f"search_plan_{uuid.uuid4().hex[:8]}"
+        cls.loop = asyncio.new_event_loop()
+        cls.connection = cls.loop.run_until_complete(asyncpg.connect(TEST_DATABASE_URL))
+        cls.execute(f"CREATE SCHEMA {cls.schema}")
+        cls.execute(f"SET search_path TO {cls.schema}, public")
+        cls.loop.run_until_complete(apply_migrations(cls.connection))
+        cls.execute(SEED_SQL)
+        cls.execute("ANALYZE candidates")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.execute(f"DROP SCHEMA {cls.schema} CASCADE")
+        cls.loop.run_until_complete(cls.connection.close())
+        cls.loop.close()
+
+    @classmethod
+    def execute(cls, sql, *args):
+        return cls.loop.run_until_complete(cls.connection.execute(sql, *args))
+
+    def explain(self, filters):
+        query, values = build_search_query(filters)
+        arguments = ", ".join(f"${i}" for i in range(1, len(values) + 1))
+
+        async def run():
+            async with self.connection.transaction():
+                await self.connection.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+                await self.connection.execute(f"PREPARE search_plan AS {query}")
+                try:
+                    execute = f"EXECUTE search_plan({arguments})" if values else "EXECUTE search_plan"
+                    return await self.connection.fetchval(f"EXPLAIN (FORMAT JSON) {execute}", *values)
+                finally:
+                    await self.connection.execute("DEALLOCATE search_plan")
+
+        plan = self.loop.run_until_complete(run())
+        return json.loads(plan)[0]["Plan"]
+
+    def test_standard_searches_use_indexes(self):
+        for name, filters in STANDARD_SEARCHES.items():
+            with self.subTest(search=name):
+                plan = self.explain(filters)
+                self.assertNotIn("candidates", list(seq_scans(plan)), json.dumps(plan, indent=2))
+
+
+if __name__ == "__main__":
+    unittest.main()